@@ -8,15 +8,29 @@ from tkinter import ttk, messagebox, scrolledtext
 import uuid
 import requests
 import hashlib
+import base64
 import json
 import os
 import datetime
 import platform
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
 
 from iqoptionapi.stable_api import IQ_Option
+from iqoptionapi.pool import IQ_OptionPool
 from colorama import init, Fore, Style
 from collections import defaultdict
 
+try:
+    import numpy as np
+except ImportError: # análise histórica cai no cálculo em Python puro
+    np = None
+
+try:
+    from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PublicKey
+    from cryptography.exceptions import InvalidSignature
+except ImportError: # sem a biblioteca a licença é sempre validada online
+    Ed25519PublicKey = None
+
 # Initialize Colorama for console output
 init(autoreset=True)
 
@@ -44,10 +58,20 @@ DEFAULT_EMA_CURTA = 3
 DEFAULT_EMA_LONGA = 33
 DEFAULT_QTD_VELAS_ANALISE = 400
 DEFAULT_MAX_VELAS_REVERSAO = 5
+DEFAULT_QTD_VELAS_HISTORICO = 1000
+DEFAULT_REQUISICOES_HISTORICO = 8 # Requisições de velas simultâneas na análise histórica
+DEFAULT_WORKERS_HISTORICO = 4
+DEFAULT_CONEXOES_STREAM = 1 # Conexões websocket dos streams; com mais de 1 os ativos são divididos entre elas
+DEFAULT_STREAMS_EM_PARALELO = 8 # Streams de velas semeados ao mesmo tempo, em segundo plano
+DEFAULT_SEGUNDOS_SEM_DADOS = 30 # Sem timeSync do servidor por esse tempo a conexão é dada como caída
+CANDLE_STORE_FILE = 'candles.db' # Arquivo local de velas; só as faixas que faltam são pedidas ao servidor
 
 # --- CONFIGURAÇÃO DO SISTEMA DE LICENÇA ---
 LICENSE_SERVER_URL = "https://server-licenca-app.onrender.com/api/v1/activate"
-LICENSE_SERVER_VALIDATE_URL = "https://server-licenca-app.onrender.com/api/v1/licenses"
+LICENSE_SERVER_VALIDATE_URL = "https://server-licenca-app.onrender.com/api/v1/validate"
+LICENSE_SERVER_REVOKED_URL = "https://server-licenca-app.onrender.com/api/v1/revoked"
+LICENSE_PUBLIC_KEY = "" # CHANGE THIS - chave pública Ed25519 (base64) do LICENSE_SIGNING_KEY do servidor
+TOKEN_RENOVACAO_HORAS = 24 # Renova o token offline quando faltar menos que isso para expirar
 LICENSE_FILE = 'license.dat'
 VALIDATION_PERIOD_MINUTES = 1 # Para teste, mude para 60 * 24 para checar a cada 24h em produção.
 
@@ -76,12 +100,15 @@ class BotConfig:
         # NOVO: Cache de análise histórica de reversões
         self.historico_reversao_cache = defaultdict(list)
         self.media_reversao_cache = defaultdict(int)
+        # Distribuição completa (histograma, percentis) por ativo
+        self.distribuicao_reversao_cache = {}
 
 bot_config = BotConfig()
 
 # Global variables for bot state
 DEBUG_MODE = True
 parar_bot_event = threading.Event()
+nova_vela_event = threading.Event() # Sinalizado pelo stream a cada tick, acorda o ciclo principal
 ativos_sem_velas = defaultdict(int)
 ativos_sem_velas_lock = threading.Lock()
 
@@ -101,6 +128,8 @@ class LicenseManager:
         self.license_key = None
         self.is_active = False
         self.last_validation = None
+        self.token = None
+        self.revoked_etag = None
         self.load_license()
 
     def load_license(self):
@@ -109,6 +138,8 @@ class LicenseManager:
                 data = json.load(f)
                 self.license_key = data.get("key")
                 self.is_active = data.get("active", False)
+                self.token = data.get("token")
+                self.revoked_etag = data.get("revoked_etag")
                 last_val_str = data.get("last_validation")
                 if last_val_str:
                     self.last_validation = datetime.datetime.fromisoformat(last_val_str)
@@ -118,13 +149,17 @@ class LicenseManager:
             self.is_active = False
             return False
 
-    def save_license(self, key):
+    def save_license(self, key, token=None):
         try:
             self.last_validation = datetime.datetime.now()
+            if token:
+                self.token = token
             data = {
                 "key": key, 
                 "active": True, 
-                "last_validation": self.last_validation.isoformat()
+                "last_validation": self.last_validation.isoformat(),
+                "token": self.token,
+                "revoked_etag": self.revoked_etag
             }
             with open(self.filename, 'w') as f:
                 json.dump(data, f)
@@ -139,33 +174,90 @@ class LicenseManager:
             self.license_key = None
             self.is_active = False
             self.last_validation = None
+            self.token = None
+            self.revoked_etag = None
+
+def _b64url_decode(texto):
+    return base64.urlsafe_b64decode(texto + '=' * (-len(texto) % 4))
+
+def verificar_token_licenca(token, license_key, device_id):
+    # Verifica localmente o token assinado pelo servidor; None se ausente, inválido ou expirado
+    if not token or not LICENSE_PUBLIC_KEY or Ed25519PublicKey is None:
+        return None
+    try:
+        payload_b64, assinatura_b64 = token.split('.')
+        payload = _b64url_decode(payload_b64)
+        Ed25519PublicKey.from_public_bytes(base64.b64decode(LICENSE_PUBLIC_KEY)).verify(_b64url_decode(assinatura_b64), payload)
+        dados = json.loads(payload)
+    except (ValueError, InvalidSignature) as e:
+        log(f"Token de licença inválido: {e}", "WARNING")
+        return None
+    if dados.get("key") != license_key or dados.get("device_id") != device_id or dados.get("exp", 0) <= time.time():
+        return None
+    return dados
+
+def licenca_revogada(license_manager):
+    # Lista de revogação com ETag: sem mudanças o servidor responde 304 sem corpo
+    headers = {"If-None-Match": f'"{license_manager.revoked_etag}"'} if license_manager.revoked_etag else {}
+    try:
+        response = requests.get(LICENSE_SERVER_REVOKED_URL, headers=headers, timeout=15)
+        if response.status_code == 304:
+            return False
+        response.raise_for_status()
+        license_manager.revoked_etag = response.headers.get("ETag", "").strip('"') or None
+        return hashlib.sha256(license_manager.license_key.encode()).hexdigest() in response.json().get("revoked", [])
+    except (requests.exceptions.RequestException, ValueError) as e:
+        log(f"Falha ao consultar a lista de revogação: {e}. Mantendo a licença local por enquanto.", "WARNING")
+        return False
+
+def invalidar_licenca(license_manager, message):
+    log(f"Validação periódica falhou: {message}", "ERROR")
+    license_manager.delete_license_file()
+    messagebox.showerror("Licença Inválida", "Sua licença não é mais válida. O programa será encerrado.")
+    os._exit(1)
 
 def validate_license_on_server(license_key, device_id):
     try:
-        response = requests.get(LICENSE_SERVER_VALIDATE_URL, timeout=15)
+        response = requests.post(LICENSE_SERVER_VALIDATE_URL, json={"license_key": license_key, "device_id": device_id}, timeout=15)
+        if response.status_code in (401, 403):
+            # Veredito do servidor: chave inexistente, revogada ou em outro dispositivo
+            return False, response.json().get("message", "Licença inválida, revogada ou ativa em outro dispositivo."), None
         response.raise_for_status()
-        licenses = response.json()
-        
-        for lic in licenses:
-            if lic['key'] == license_key:
-                if lic['revoked'] or lic['status'] != 'active' or lic['device_id'] != device_id:
-                    return False, "Licença inválida, revogada ou ativa em outro dispositivo."
-                return True, "Licença validada com sucesso."
-        
-        return False, "Chave de licença não encontrada no servidor."
+        # Token offline novo: instalações ativadas antes dos tokens passam a validar sem o servidor
+        return True, "Licença validada com sucesso.", response.json().get("token")
         
     except requests.exceptions.RequestException as e:
         log(f"Falha na comunicação com o servidor durante a validação: {e}", "ERROR")
-        return True, "Falha na validação. Mantendo a chave local por enquanto."
+        return True, "Falha na validação. Mantendo a chave local por enquanto.", None
     except Exception as e:
         log(f"Erro inesperado durante a validação da licença: {e}", "ERROR")
-        return True, "Falha na validação. Mantendo a chave local por enquanto."
+        return True, "Falha na validação. Mantendo a chave local por enquanto.", None
 
 def validate_license_periodically():
     license_manager = LicenseManager()
     if not license_manager.is_active:
         return True
 
+    device_id = get_device_id()
+    if not device_id:
+        return False
+
+    token = verificar_token_licenca(license_manager.token, license_manager.license_key, device_id)
+    if token:
+        # Token válido: sem ida ao servidor, exceto a renovação e a lista de revogação
+        if token["exp"] - time.time() < TOKEN_RENOVACAO_HORAS * 3600:
+            log("Token de licença perto de expirar, renovando...", "INFO")
+            renovado, novo_token = activate_license_on_server(license_manager.license_key)
+            if renovado and novo_token:
+                license_manager.save_license(license_manager.license_key, novo_token)
+        minutes_since_last_validation = (datetime.datetime.now() - license_manager.last_validation).total_seconds() / 60
+        if minutes_since_last_validation >= VALIDATION_PERIOD_MINUTES:
+            if licenca_revogada(license_manager):
+                invalidar_licenca(license_manager, "Licença revogada.")
+                return False
+            license_manager.save_license(license_manager.license_key) # Atualiza a data de validacao
+        return True
+
     minutes_since_last_validation = (datetime.datetime.now() - license_manager.last_validation).total_seconds() / 60
     
     if minutes_since_last_validation < VALIDATION_PERIOD_MINUTES:
@@ -173,25 +265,18 @@ def validate_license_periodically():
         return True
 
     log("Tentando revalidar a licença com o servidor...", "INFO")
-    device_id = get_device_id()
-    if not device_id:
-        return False
-
-    is_valid, message = validate_license_on_server(license_manager.license_key, device_id)
+    is_valid, message, token = validate_license_on_server(license_manager.license_key, device_id)
     if is_valid:
-        license_manager.save_license(license_manager.license_key) # Atualiza a data de validacao
+        license_manager.save_license(license_manager.license_key, token) # Atualiza a data de validacao (e o token, se veio)
         return True
     else:
-        log(f"Validação periódica falhou: {message}", "ERROR")
-        license_manager.delete_license_file()
-        messagebox.showerror("Licença Inválida", "Sua licença não é mais válida. O programa será encerrado.")
-        os._exit(1)
+        invalidar_licenca(license_manager, message)
         return False
 
 def activate_license_on_server(license_key):
     device_id = get_device_id()
     if not device_id:
-        return False
+        return False, None
         
     log(f"Tentando ativar a licença... Chave: {license_key}", "INFO")
 
@@ -207,21 +292,22 @@ def activate_license_on_server(license_key):
             result = response.json()
         except json.JSONDecodeError:
             log(f"Erro ao decodificar a resposta do servidor. Resposta: {response.text}", "ERROR")
-            return False
+            return False, None
 
         if response.status_code == 200:
             if result.get("success"):
-                return True
+                # Token offline assinado (None se o servidor não tiver chave de assinatura)
+                return True, result.get("token")
             else:
                 log(f"Falha na ativação: {result.get('message', 'Erro desconhecido')}", "ERROR")
-                return False
+                return False, None
         else:
             log(f"Falha na comunicação com o servidor. Status: {response.status_code}, Resposta: {result.get('message', 'N/A')}", "ERROR")
-            return False
+            return False, None
             
     except requests.exceptions.RequestException as e:
         log(f"Erro de conexão com o servidor de licenças: {e}", "ERROR")
-        return False
+        return False, None
 
 # --- FUNÇÕES PRINCIPAIS DO BOT ---
 
@@ -258,56 +344,211 @@ def check_ema_crossover_signal(velas):
         signal = 'put'
     return signal
 
+class IncrementalEMA:
+    """EMA atualizada em O(1) por vela, igual a calcular_ema sobre a mesma série."""
+    def __init__(self, period):
+        self.period = period
+        self.k = 2 / (period + 1)
+        self.seed = []
+        self.value = None # EMA da última vela fechada
+
+    def close(self, price):
+        if self.value is None:
+            self.seed.append(price)
+            if len(self.seed) == self.period:
+                self.value = sum(self.seed) / self.period
+                self.seed = None
+        else:
+            self.value = (price * self.k) + (self.value * (1 - self.k))
+        return self.value
+
+    def provisional(self, price):
+        # EMA caso a vela atual (ainda aberta) feche em price
+        if self.value is None:
+            if len(self.seed) + 1 == self.period:
+                return (sum(self.seed) + price) / self.period
+            return None
+        return (price * self.k) + (self.value * (1 - self.k))
+
+class EMACrossoverEngine:
+    """Detecta cruzamentos EMA curta/longa de um ativo sem recalcular a série inteira."""
+    def __init__(self, periodo_curto, periodo_longo):
+        self.ema_curta = IncrementalEMA(periodo_curto)
+        self.ema_longa = IncrementalEMA(periodo_longo)
+        self.ultima_vela_fechada = None
+
+    def update(self, velas):
+        # velas em ordem de 'from'; a última é a vela atual (aberta)
+        if len(velas) < 2:
+            return None
+        if self.ultima_vela_fechada is not None and velas[0]['from'] > self.ultima_vela_fechada:
+            # Buraco no histórico (ex.: reconexão): recomeça do zero
+            self.__init__(self.ema_curta.period, self.ema_longa.period)
+        # Só as velas fechadas depois da última processada, procuradas do fim para o começo
+        inicio = len(velas) - 1
+        while inicio > 0 and (self.ultima_vela_fechada is None or velas[inicio - 1]['from'] > self.ultima_vela_fechada):
+            inicio -= 1
+        for vela in velas[inicio:-1]:
+            self.ema_curta.close(vela['close'])
+            self.ema_longa.close(vela['close'])
+            self.ultima_vela_fechada = vela['from']
+        ema_curta_anterior = self.ema_curta.value
+        ema_longa_anterior = self.ema_longa.value
+        ema_curta_atual = self.ema_curta.provisional(velas[-1]['close'])
+        ema_longa_atual = self.ema_longa.provisional(velas[-1]['close'])
+        if ema_curta_anterior is None or ema_longa_anterior is None:
+            return None
+        signal = None
+        if ema_curta_anterior <= ema_longa_anterior and ema_curta_atual > ema_longa_atual:
+            signal = 'call'
+        elif ema_curta_anterior >= ema_longa_anterior and ema_curta_atual < ema_longa_atual:
+            signal = 'put'
+        return signal
+
+def _percentil(valores_ordenados, p):
+    # Interpolação linear, igual ao padrão de numpy.percentile
+    pos = (len(valores_ordenados) - 1) * p / 100
+    base = int(pos)
+    if base + 1 >= len(valores_ordenados):
+        return float(valores_ordenados[base])
+    return valores_ordenados[base] + (valores_ordenados[base + 1] - valores_ordenados[base]) * (pos - base)
+
+def _reversoes_python(closes, opens, ema_curta, ema_longa, inicio, fim, max_velas):
+    reversal_counts = []
+    cruzamentos = 0
+    for i in range(inicio, fim):
+        signal = None
+        if ema_curta[i-1] <= ema_longa[i-1] and ema_curta[i] > ema_longa[i]:
+            signal = 'call'
+        elif ema_curta[i-1] >= ema_longa[i-1] and ema_curta[i] < ema_longa[i]:
+            signal = 'put'
+        if not signal:
+            continue
+        cruzamentos += 1
+        for j in range(i + 1, i + 1 + max_velas):
+            candle_direction = 'call' if closes[j] > opens[j] else 'put'
+            if candle_direction != signal:
+                reversal_counts.append(j - i)
+                break
+    return cruzamentos, reversal_counts
+
+def _reversoes_numpy(closes, opens, ema_curta, ema_longa, inicio, fim, max_velas):
+    closes = np.asarray(closes, dtype=float)
+    opens = np.asarray(opens, dtype=float)
+    ema_curta = np.asarray(ema_curta, dtype=float)
+    ema_longa = np.asarray(ema_longa, dtype=float)
+    i = np.arange(inicio, fim)
+    curta_ant, longa_ant = ema_curta[i - 1], ema_longa[i - 1]
+    curta_atual, longa_atual = ema_curta[i], ema_longa[i]
+    call = (curta_ant <= longa_ant) & (curta_atual > longa_atual)
+    put = ~call & (curta_ant >= longa_ant) & (curta_atual < longa_atual)
+    cruzou = call | put
+    # Velas seguintes a cada cruzamento: j = i + 1 ... i + max_velas
+    j = i[cruzou, None] + np.arange(1, max_velas + 1)
+    vela_call = (closes > opens)[j]
+    oposta = np.where(call[cruzou, None], ~vela_call, vela_call)
+    reverteu = oposta.any(axis=1)
+    reversal_counts = oposta.argmax(axis=1)[reverteu] + 1
+    return int(cruzou.sum()), reversal_counts.tolist()
+
+def calcular_distribuicao_reversao(velas, ema_curta_periodo, ema_longa_periodo, max_velas):
+    """Cruzamentos EMA em velas e quantas velas até a primeira vela contrária (até max_velas)."""
+    closes = [v['close'] for v in velas]
+    opens = [v['open'] for v in velas]
+    ema_curta_valores = calcular_ema(closes, ema_curta_periodo)
+    ema_longa_valores = calcular_ema(closes, ema_longa_periodo)
+    if not ema_curta_valores or not ema_longa_valores:
+        return None
+    # Alinha as EMAs pelo índice da vela (None antes do período ser atingido)
+    ema_curta = [None] * (ema_curta_periodo - 1) + ema_curta_valores
+    ema_longa = [None] * (ema_longa_periodo - 1) + ema_longa_valores
+    inicio = ema_longa_periodo + 1
+    fim = len(velas) - max_velas
+    if fim <= inicio:
+        return None
+    if np is not None:
+        cruzamentos, reversal_counts = _reversoes_numpy(closes, opens, ema_curta, ema_longa, inicio, fim, max_velas)
+    else:
+        cruzamentos, reversal_counts = _reversoes_python(closes, opens, ema_curta, ema_longa, inicio, fim, max_velas)
+    histograma = {n: 0 for n in range(1, max_velas + 1)}
+    for n in reversal_counts:
+        histograma[n] += 1
+    ordenados = sorted(reversal_counts)
+    return {
+        "cruzamentos": cruzamentos,
+        "sem_reversao": cruzamentos - len(reversal_counts),
+        "histograma": histograma,
+        "media": sum(reversal_counts) / len(reversal_counts) if reversal_counts else None,
+        "percentis": {p: _percentil(ordenados, p) for p in (25, 50, 75, 90)} if ordenados else {},
+    }
+
+def _analisar_reversoes_do_ativo(ativo, velas_api):
+    if not velas_api or len(velas_api) < bot_config.ema_longa + bot_config.max_velas_reversao + 1:
+        return
+    distribuicao = calcular_distribuicao_reversao(velas_api, bot_config.ema_curta, bot_config.ema_longa, bot_config.max_velas_reversao)
+    if not distribuicao:
+        return
+    bot_config.distribuicao_reversao_cache[ativo] = distribuicao
+
+    if distribuicao["media"] is not None:
+        media_reversao = round(distribuicao["media"])
+        bot_config.media_reversao_cache[ativo] = media_reversao
+        log(f"[{ativo}] Média de reversão calculada: {media_reversao} vela(s) após o cruzamento (mediana {distribuicao['percentis'][50]:g}, {distribuicao['sem_reversao']}/{distribuicao['cruzamentos']} sem reversão).", "INFO")
+    else:
+        bot_config.media_reversao_cache[ativo] = 0
+
 # NOVO: Função para analisar o histórico de reversões
 def analyze_historical_reversals(api):
     log("Iniciando análise histórica de reversões...", "INFO")
-    for ativo in bot_config.ativos_para_analise:
-        try:
-            velas_api = api.get_candles(ativo, bot_config.timeframe, 1000, time.time())
-            if not velas_api or len(velas_api) < bot_config.ema_longa + bot_config.max_velas_reversao + 1:
-                continue
-
-            reversal_counts = []
-            closes = [v['close'] for v in velas_api]
-            ema_curta_valores = calcular_ema(closes, bot_config.ema_curta)
-            ema_longa_valores = calcular_ema(closes, bot_config.ema_longa)
-
-            if not ema_curta_valores or not ema_longa_valores:
-                continue
-
-            for i in range(bot_config.ema_longa + 1, len(velas_api) - bot_config.max_velas_reversao):
-                ema_curta_ant = ema_curta_valores[i-1]
-                ema_longa_ant = ema_longa_valores[i-1]
-                ema_curta_atual = ema_curta_valores[i]
-                ema_longa_atual = ema_longa_valores[i]
-
-                signal = None
-                if ema_curta_ant <= ema_longa_ant and ema_curta_atual > ema_longa_atual:
-                    signal = 'call'
-                elif ema_curta_ant >= ema_longa_ant and ema_curta_atual < ema_longa_atual:
-                    signal = 'put'
-
-                if signal:
-                    for j in range(i + 1, i + 1 + bot_config.max_velas_reversao):
-                        if j >= len(velas_api):
-                            break
-                        candle_direction = 'call' if velas_api[j]['close'] > velas_api[j]['open'] else 'put'
-                        if (signal == 'call' and candle_direction == 'put') or (signal == 'put' and candle_direction == 'call'):
-                            reversal_counts.append(j - i)
-                            break
-            
-            if reversal_counts:
-                media_reversao = round(sum(reversal_counts) / len(reversal_counts))
-                bot_config.media_reversao_cache[ativo] = media_reversao
-                log(f"[{ativo}] Média de reversão calculada: {media_reversao} vela(s) após o cruzamento.", "INFO")
-            else:
-                bot_config.media_reversao_cache[ativo] = 0
-
-        except Exception as e:
-            log(f"Erro ao analisar histórico para {ativo}: {e}", "ERROR")
+    ativos = list(bot_config.ativos_para_analise)
+    total = len(ativos)
+    feitos = 0
+    inicio = time.time()
+    pendentes = {}
+
+    def reportar_progresso(concluidos):
+        nonlocal feitos
+        for futuro in concluidos:
+            ativo = pendentes.pop(futuro)
+            try:
+                futuro.result()
+            except Exception as e:
+                log(f"Erro ao analisar histórico para {ativo}: {e}", "ERROR")
+            feitos += 1
+        decorrido = time.time() - inicio
+        eta = decorrido / feitos * (total - feitos) if feitos else None
+        update_queue.put(("historical_analysis_progress", {"feitos": feitos, "total": total, "eta": eta}))
+
+    update_queue.put(("historical_analysis_progress", {"feitos": 0, "total": total, "eta": None}))
+    # Busca em lotes com várias requisições em voo enquanto o pool processa o lote anterior
+    with ThreadPoolExecutor(max_workers=DEFAULT_WORKERS_HISTORICO) as executor:
+        for n in range(0, total, DEFAULT_REQUISICOES_HISTORICO):
+            if parar_bot_event.is_set():
+                break
+            lote = ativos[n:n + DEFAULT_REQUISICOES_HISTORICO]
+            try:
+                velas_por_ativo = api.get_candles_many(lote, bot_config.timeframe, DEFAULT_QTD_VELAS_HISTORICO, time.time(), from_store=True)
+            except Exception as e:
+                log(f"Erro ao buscar histórico para {', '.join(lote)}: {e}", "ERROR")
+                velas_por_ativo = {}
+            for ativo in lote:
+                pendentes[executor.submit(_analisar_reversoes_do_ativo, ativo, velas_por_ativo.get(ativo))] = ativo
+            concluidos = [futuro for futuro in pendentes if futuro.done()]
+            if concluidos:
+                reportar_progresso(concluidos)
+        while pendentes and not parar_bot_event.is_set():
+            concluidos, _ = wait(list(pendentes), timeout=1, return_when=FIRST_COMPLETED)
+            if concluidos:
+                reportar_progresso(concluidos)
+        if parar_bot_event.is_set():
+            for futuro in pendentes:
+                futuro.cancel()
+            log(f"Análise histórica cancelada ({feitos}/{total} ativos).", "WARNING")
+            update_queue.put(("historical_analysis_done", {"feitos": feitos, "total": total, "cancelada": True}))
+            return
 
     log("Análise histórica concluída.", "SUCCESS")
-    update_queue.put(("historical_analysis_done", None))
+    update_queue.put(("historical_analysis_done", {"feitos": feitos, "total": total, "cancelada": False}))
 
 def adicionar_reversao_ao_historico(ativo, direcao_cruzamento, timestamp_cruzamento, timestamp_reversao, velas_para_reverter):
     global bot_config
@@ -324,9 +565,73 @@ def adicionar_reversao_ao_historico(ativo, direcao_cruzamento, timestamp_cruzame
     log(f"REVERSÃO REGISTRADA: [{ativo}] Cruzamento {direcao_cruzamento.upper()} em {time.strftime('%H:%M:%S', time.localtime(timestamp_cruzamento))} -> Reverteu em {velas_para_reverter} vela(s)", "SUCCESS")
     update_queue.put(("new_reversal_record", reversao_data))
 
+def iniciar_streams_de_velas(api, streams_de_velas, executor):
+    # Semeia cada (ativo, timeframe) uma única vez com get_candles e depois
+    # mantém as velas atualizadas pelo stream "candle-generated" da API.
+    # A semeadura roda no executor para não travar o ciclo nem os comandos da GUI.
+    for ativo in bot_config.ativos_para_analise:
+        chave = (ativo, bot_config.timeframe)
+        if chave in streams_de_velas or bot_config.timeframe not in api.size:
+            continue
+        streams_de_velas[chave] = executor.submit(semear_stream_de_velas, api, ativo, bot_config.timeframe, bot_config.qtd_velas_analise)
+
+def semear_stream_de_velas(api, ativo, timeframe, qtd_velas):
+    try:
+        api.start_candles_stream(ativo, timeframe, qtd_velas)
+        api.on_candle(ativo, timeframe, sinalizar_nova_vela)
+    except Exception as e:
+        # Fica marcado mesmo assim; obter_velas_do_stream cai no get_candles_many
+        log(f"[{ativo}] Falha ao iniciar o stream de velas: {e}", "WARNING")
+
+def stream_em_semeadura(ativo, streams_de_velas):
+    semeadura = streams_de_velas.get((ativo, bot_config.timeframe))
+    return semeadura is not None and not semeadura.done()
+
+def conexao_caida(api, ultimo_sinal):
+    # check_connect só vê o fechamento do websocket; uma conexão pendurada
+    # para de receber o timeSync do servidor, que chega a cada segundo
+    if not api.check_connect():
+        return True
+    timestamp = api.get_server_timestamp()
+    if timestamp != ultimo_sinal[0]:
+        ultimo_sinal[:] = [timestamp, time.time()]
+        return False
+    return time.time() - ultimo_sinal[1] > DEFAULT_SEGUNDOS_SEM_DADOS
+
+def reconectar(api, streams_de_velas):
+    log("Conexão com a IQ Option perdida. Reconectando...", "WARNING")
+    update_queue.put(("connection_status", "Reconectando..."))
+    check, reason = api.connect()
+    if not check:
+        log(f"Falha ao reconectar: {reason}. Nova tentativa em seguida.", "ERROR")
+        return False
+    if api.change_balance(bot_config.account_type):
+        log(f"Reconectado na conta {bot_config.account_type}.", "SUCCESS")
+    update_queue.put(("connection_status", "Conectado"))
+    # Os buffers ficaram com um buraco enquanto a conexão estava caída: semeia de novo
+    streams_de_velas.clear()
+    return True
+
+def sinalizar_nova_vela(ativo, timeframe, vela):
+    nova_vela_event.set()
+
+def obter_velas_do_stream(api, ativo, streams_de_velas):
+    semeadura = streams_de_velas.get((ativo, bot_config.timeframe))
+    if semeadura is None or not semeadura.done():
+        return None
+    velas = api.get_realtime_candles(ativo, bot_config.timeframe)
+    if not velas:
+        return None
+    # snapshot() já vem ordenado e é seguro contra a thread do websocket
+    return velas.snapshot(bot_config.qtd_velas_analise)
+
 def ciclo_principal_alerta_simples(api):
     global ativos_sem_velas
     ultimo_ping_tempo = time.time()
+    streams_de_velas = {} # (ativo, timeframe) -> Future da semeadura
+    motores_ema = {}
+    executor_streams = ThreadPoolExecutor(max_workers=DEFAULT_STREAMS_EM_PARALELO)
+    ultimo_sinal = [None, time.time()] # último timestamp do servidor e quando mudou
     
     log("Thread principal de alertas (cruzamentos EMA) iniciada.", "INFO")
     update_queue.put(("bot_status", "Rodando (Cruzamentos EMA)"))
@@ -362,8 +667,21 @@ def ciclo_principal_alerta_simples(api):
             if current_time - ultimo_ping_tempo >= 10:
                 log(f"Bot de alertas ativo... Checando cruzamentos e reversões.", "INFO")
                 ultimo_ping_tempo = current_time
-            for ativo in bot_config.ativos_para_analise:
-                velas_api = api.get_candles(ativo, bot_config.timeframe, bot_config.qtd_velas_analise, current_time)
+            if conexao_caida(api, ultimo_sinal):
+                if not reconectar(api, streams_de_velas):
+                    parar_bot_event.wait(5)
+                    continue
+                ultimo_sinal[:] = [api.get_server_timestamp(), time.time()]
+            iniciar_streams_de_velas(api, streams_de_velas, executor_streams)
+            # Ativos ainda semeando ficam de fora deste ciclo
+            ativos_prontos = [ativo for ativo in bot_config.ativos_para_analise if not stream_em_semeadura(ativo, streams_de_velas)]
+            velas_por_ativo = {ativo: obter_velas_do_stream(api, ativo, streams_de_velas) for ativo in ativos_prontos}
+            sem_stream = [ativo for ativo, velas in velas_por_ativo.items() if not velas]
+            if sem_stream:
+                # Timeframe sem stream: busca as velas de uma vez (um único round trip)
+                velas_por_ativo.update(api.get_candles_many(sem_stream, bot_config.timeframe, bot_config.qtd_velas_analise, current_time))
+            for ativo in ativos_prontos:
+                velas_api = velas_por_ativo.get(ativo)
                 min_candles_required_for_ema = bot_config.ema_longa + 1
                 if not velas_api or len(velas_api) < min_candles_required_for_ema:
                     log(f"[{ativo}] Não foi possível obter velas suficientes ({min_candles_required_for_ema} mínimas) para checar cruzamento. Obtidas: {len(velas_api) if velas_api else 0}.", "WARNING")
@@ -371,7 +689,10 @@ def ciclo_principal_alerta_simples(api):
                         ativos_sem_velas[ativo] += 1
                     continue
                 current_candle_start_time = velas_api[-1]['from']
-                sinal_cruzamento = check_ema_crossover_signal(velas_api)
+                chave_motor = (ativo, bot_config.timeframe, bot_config.ema_curta, bot_config.ema_longa)
+                if chave_motor not in motores_ema:
+                    motores_ema[chave_motor] = EMACrossoverEngine(bot_config.ema_curta, bot_config.ema_longa)
+                sinal_cruzamento = motores_ema[chave_motor].update(velas_api)
                 if sinal_cruzamento:
                     if bot_config.last_cross_time[ativo] != current_candle_start_time:
                         media_reversao = bot_config.media_reversao_cache.get(ativo, 0)
@@ -436,7 +757,9 @@ def ciclo_principal_alerta_simples(api):
                         )
                         del bot_config.monitorando_reversao[ativo]
 
-            time.sleep(0.5)
+            # Reage ao próximo tick do stream; o timeout mantém os comandos da GUI atendidos
+            nova_vela_event.wait(0.5)
+            nova_vela_event.clear()
 
         except Exception as e:
             log(f"Exceção CRÍTICA no ciclo principal de alerta: {e}", "ERROR")
@@ -444,6 +767,7 @@ def ciclo_principal_alerta_simples(api):
             log(traceback.format_exc(), "ERROR")
             time.sleep(5)
 
+    executor_streams.shutdown(wait=False)
     log("Bot de alertas (cruzamentos EMA) finalizado (thread principal).", "INFO")
     update_queue.put(("bot_status", "Parado"))
 
@@ -454,7 +778,14 @@ def iniciar_bot_thread_alerta_simples():
         return
 
     log("Tentando iniciar a thread do bot de alertas...", "INFO")
-    api = IQ_Option(bot_config.user, bot_config.password)
+    if DEFAULT_CONEXOES_STREAM > 1:
+        api = IQ_OptionPool(bot_config.user, bot_config.password, DEFAULT_CONEXOES_STREAM)
+    else:
+        api = IQ_Option(bot_config.user, bot_config.password)
+    try:
+        api.set_candle_store(CANDLE_STORE_FILE)
+    except Exception as e:
+        log(f"Arquivo de velas indisponível ({e}), a análise histórica usará só o servidor.", "WARNING")
     log("Conectando à IQ Option...", "INFO")
     check, reason = api.connect()
 
@@ -576,8 +907,9 @@ class TradingBotGUI:
         self.license_key_entry.config(state=tk.DISABLED)
         self.license_status_label.config(text="Status: Ativando, aguarde...", foreground="blue")
         self.master.update_idletasks()
-        if activate_license_on_server(license_key):
-            self.license_manager.save_license(license_key)
+        ativada, token = activate_license_on_server(license_key)
+        if ativada:
+            self.license_manager.save_license(license_key, token)
             self.check_license_status()
             messagebox.showinfo("Sucesso", "Licença ativada com sucesso! Você já pode iniciar o bot.")
         else:
@@ -622,6 +954,8 @@ class TradingBotGUI:
         self.bot_status_label.grid(row=0, column=0, padx=5, pady=2, sticky="w")
         self.current_time_label = ttk.Label(status_frame, text="Hora Atual: N/A")
         self.current_time_label.grid(row=1, column=0, padx=5, pady=2, sticky="w")
+        self.historical_progress_label = ttk.Label(status_frame, text="Análise Histórica: N/A")
+        self.historical_progress_label.grid(row=2, column=0, padx=5, pady=2, sticky="w")
 
     def create_alert_log_section(self, parent_frame):
         alert_log_frame = ttk.LabelFrame(parent_frame, text="Alertas de Cruzamento EMA (Tempo Real)")
@@ -737,6 +1071,10 @@ class TradingBotGUI:
                     self._add_new_alert_to_treeview(data)
                 elif update_type == "new_reversal_record":
                     self._add_new_reversal_record_to_treeview(data)
+                elif update_type == "historical_analysis_progress":
+                    self.update_historical_progress(data)
+                elif update_type == "historical_analysis_done":
+                    self.update_historical_done(data)
                 self.master.update_idletasks()
         except queue.Empty:
             pass
@@ -758,6 +1096,8 @@ class TradingBotGUI:
             self.disconnect_button.config(state=tk.NORMAL)
             self.real_radio.config(state=tk.NORMAL)
             self.practice_radio.config(state=tk.NORMAL)
+        elif status == "Reconectando...":
+            self.connection_status_label.config(foreground="orange")
         elif status == "Falha na conexão":
             self.connection_status_label.config(foreground="red")
             self.connect_button.config(state=tk.NORMAL)
@@ -787,6 +1127,16 @@ class TradingBotGUI:
             self.practice_radio.config(state=tk.DISABLED)
             self.check_license_status()
 
+    def update_historical_progress(self, progress):
+        eta_txt = f", ~{int(progress['eta'])}s restantes" if progress['eta'] is not None else ""
+        self.historical_progress_label.config(text=f"Análise Histórica: {progress['feitos']}/{progress['total']} ativos{eta_txt}")
+
+    def update_historical_done(self, result):
+        if result['cancelada']:
+            self.historical_progress_label.config(text=f"Análise Histórica: cancelada ({result['feitos']}/{result['total']})")
+        else:
+            self.historical_progress_label.config(text=f"Análise Histórica: concluída ({result['total']} ativos)")
+
     def update_account_type_display(self, account_type):
         self.account_type_var.set(account_type)
         messagebox.showinfo("Conta Alterada", f"A conta foi alterada para {account_type} com sucesso!")
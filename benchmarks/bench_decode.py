@@ -0,0 +1,63 @@
+"""Frame decode cost of WebsocketClient.on_message, before and after.
+
+Compares the old path (json.loads(str(frame)) on every frame) with the
+installed decoder (WebsocketClient.decode) and with the frame_name
+prefilter, which skips the decode of frames nobody listens to. The
+alert bot only listens to the candle streams and timeSync.
+
+    python -m benchmarks.bench_decode [--frames capture.txt] [--rounds 5]
+"""
+
+import argparse
+import json
+import time
+
+from iqoptionapi.ws.client import WebsocketClient, frame_name
+from benchmarks.frames import load_frames
+
+LISTENED = ("candle-generated", "timeSync")
+
+
+def stdlib(frame):
+    return json.loads(str(frame))
+
+
+def prefiltered(frame):
+    name = frame_name(frame)
+    if name is not None and name not in LISTENED:
+        return None
+    return WebsocketClient.decode(frame)
+
+
+def best_time(decode, frames, rounds):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for frame in frames:
+            decode(frame)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", help="recorded frames, one per line")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames)
+    decoder = WebsocketClient.decode
+    skipped = sum(1 for frame in frames if frame_name(frame) not in LISTENED + (None,))
+    baseline = best_time(stdlib, frames, args.rounds)
+    print("frames:         %d (%d not listened to)" % (len(frames), skipped))
+    print("decoder:        %s.%s" % (decoder.__module__, decoder.__name__))
+    for label, decode in (("json.loads(str)", stdlib), ("decoder", decoder),
+                          ("prefilter", prefiltered)):
+        elapsed = baseline if decode is stdlib else best_time(decode, frames, args.rounds)
+        print("%-15s %8.2f us/frame  (x%.1f)" % (
+            label + ":", elapsed / len(frames) * 1e6, baseline / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""Frames/sec of WebsocketClient.on_message, name table vs. linear dispatch.
+
+The linear run is the old on_message: a full json.loads(str(frame)) and
+every handler called on every frame, each one comparing the name.
+
+    python -m benchmarks.bench_dispatch [--frames capture.txt] [--rounds 5]
+"""
+
+import argparse
+import json
+import time
+
+from iqoptionapi.api import IQOptionAPI
+from iqoptionapi.ws.client import WebsocketClient
+from benchmarks.frames import load_frames
+
+
+def linear_dispatch(client):
+    handlers = [handler for name_handlers in client.handlers.values() for handler in name_handlers]
+
+    def on_message(message):
+        message = json.loads(str(message))
+        for handler in handlers:
+            handler(client.api, message)
+    return on_message
+
+
+def frames_per_sec(on_message, frames, rounds):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for frame in frames:
+            on_message(frame)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(frames) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", help="recorded frames, one per line")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    frames = load_frames(args.frames)
+    client = WebsocketClient(IQOptionAPI("iqoption.com", "bench", "bench"))
+    linear = frames_per_sec(linear_dispatch(client), frames, args.rounds)
+    table = frames_per_sec(client.on_message, frames, args.rounds)
+    print("frames:         %d" % len(frames))
+    print("linear:         %10.0f frames/s" % linear)
+    print("name table:     %10.0f frames/s  (x%.1f)" % (table, table / linear))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""Incremental EMA crossover engine vs. batch check_ema_crossover_signal.
+
+Replays assets x candles the way the alert loop sees them: a sliding
+qtd_velas_analise window whose last candle is still open, with a few
+intra-candle ticks per candle. The batch path is timed on --batch-assets
+assets only (it is O(window) per tick), signals are compared on those.
+
+    python -m benchmarks.bench_ema [--assets 40] [--candles 10000]
+"""
+
+import argparse
+import random
+import time
+
+import alertafinal
+from alertafinal import EMACrossoverEngine, bot_config, check_ema_crossover_signal
+
+
+def candles(count, seed):
+    random.seed(seed)
+    price = 1.1
+    series = []
+    for i in range(count):
+        open_ = price
+        price = round(price + random.gauss(0, 0.0005), 6)
+        series.append({"from": 1700000000 + i * 60, "open": open_, "close": price})
+    return series
+
+
+def ticks(series, window, per_candle):
+    # the open candle moves towards its close over per_candle ticks
+    for end in range(window, len(series) + 1):
+        velas = series[end - window:end]
+        aberta = velas[-1]
+        for step in range(1, per_candle + 1):
+            close = aberta["open"] + (aberta["close"] - aberta["open"]) * step / per_candle
+            yield velas[:-1] + [dict(aberta, close=close)]
+
+
+def run(series_by_asset, window, per_candle, signal):
+    signals = []
+    updates = 0
+    start = time.perf_counter()
+    for series in series_by_asset:
+        engine = EMACrossoverEngine(bot_config.ema_curta, bot_config.ema_longa)
+        for velas in ticks(series, window, per_candle):
+            signals.append(signal(engine, velas))
+            updates += 1
+    return signals, updates, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--assets", type=int, default=40)
+    parser.add_argument("--candles", type=int, default=10000)
+    parser.add_argument("--ticks", type=int, default=3, help="ticks per candle")
+    parser.add_argument("--batch-assets", type=int, default=2)
+    args = parser.parse_args()
+
+    window = alertafinal.DEFAULT_QTD_VELAS_ANALISE
+    series_by_asset = [candles(args.candles, seed) for seed in range(args.assets)]
+
+    incremental, updates, elapsed = run(series_by_asset, window, args.ticks,
+                                        lambda engine, velas: engine.update(velas))
+    batch, batch_updates, batch_elapsed = run(series_by_asset[:args.batch_assets], window, args.ticks,
+                                              lambda engine, velas: check_ema_crossover_signal(velas))
+    mismatches = sum(1 for a, b in zip(incremental, batch) if a != b)
+    crossings = sum(1 for signal in batch if signal)
+
+    print("assets x candles:  %d x %d, window %d, %d ticks/candle" % (
+        args.assets, args.candles, window, args.ticks))
+    print("incremental:       %8.2f us/update, %.2f s for %d updates" % (
+        elapsed / updates * 1e6, elapsed, updates))
+    print("batch:             %8.2f us/update (on %d assets, x%.0f)" % (
+        batch_elapsed / batch_updates * 1e6, args.batch_assets,
+        (batch_elapsed / batch_updates) / (elapsed / updates)))
+    print("signal mismatches: %d of %d updates (%d crossover ticks)" % (
+        mismatches, batch_updates, crossings))
+
+
+if __name__ == "__main__":
+    main()
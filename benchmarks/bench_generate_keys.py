@@ -0,0 +1,48 @@
+"""Keys/sec of /api/v1/generate_keys vs. one /api/v1/generate_key per key.
+
+Runs the Flask app in process with its test client against DATABASE_URL,
+a throwaway SQLite file when it is not set. Point DATABASE_URL at a
+scratch Postgres to measure the real batched inserts: the generated keys
+are left in the licenses table.
+
+    python -m benchmarks.bench_generate_keys [--count 20000] [--single 1000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=20000, help="keys of the bulk request")
+    parser.add_argument("--single", type=int, default=1000, help="single key requests")
+    args = parser.parse_args()
+
+    if not os.environ.get("DATABASE_URL"):
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        os.environ["DATABASE_URL"] = "sqlite:///" + path
+    # server reads DATABASE_URL on import
+    import server
+    client = server.app.test_client()
+
+    start = time.perf_counter()
+    for _ in range(args.single):
+        assert client.post("/api/v1/generate_key").status_code == 200
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    response = client.post("/api/v1/generate_keys?count=%d" % args.count)
+    keys = response.get_data(as_text=True).split()
+    bulk = time.perf_counter() - start
+    assert response.status_code == 200 and len(keys) == args.count
+
+    print("database:       %s" % server.engine.url.render_as_string(hide_password=True))
+    print("generate_key:   %10.0f keys/s (%d requests)" % (args.single / single, args.single))
+    print("generate_keys:  %10.0f keys/s (%d keys, x%.0f)" % (
+        args.count / bulk, args.count, (args.count / bulk) / (args.single / single)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Frame corpus shared by the websocket benchmarks.
+
+A recorded capture (one raw frame per line, e.g. dumped from
+WebsocketClient.on_message) can be passed to the benchmarks with
+--frames, otherwise a synthetic mix shaped like the alert bot traffic is
+used: candle streams of 40 actives, traders mood, time sync and frames
+nobody listens to.
+"""
+
+import json
+import random
+
+import iqoptionapi.constants as OP_code
+
+ACTIVES = [active for active in OP_code.ACTIVES if not active.endswith("-OTC")][:40]
+
+
+def candle_generated(active_id, now):
+    open_ = round(random.uniform(1.0, 1.5), 6)
+    close = round(open_ + random.uniform(-0.001, 0.001), 6)
+    return {"name": "candle-generated", "microserviceName": "quotes", "msg": {
+        "active_id": active_id, "size": 60, "at": now * 1000000000,
+        "from": now - now % 60, "to": now - now % 60 + 60, "id": now // 60,
+        "open": open_, "close": close, "min": min(open_, close), "max": max(open_, close),
+        "ask": close, "bid": close, "volume": 0, "phase": "T"}}
+
+
+def synthetic_frames(count=20000, seed=1):
+    random.seed(seed)
+    now = 1700000000
+    frames = []
+    for i in range(count):
+        roll = random.random()
+        if roll < 0.70:
+            frame = candle_generated(OP_code.ACTIVES[random.choice(ACTIVES)], now + i // 40)
+        elif roll < 0.80:
+            frame = {"name": "traders-mood-changed", "msg": {
+                "asset_id": OP_code.ACTIVES[random.choice(ACTIVES)], "value": random.random()}}
+        elif roll < 0.85:
+            frame = {"name": "timeSync", "msg": (now + i) * 1000}
+        else:
+            frame = {"name": random.choice(["client-buyback-generated", "spot-buyback-quote-generated"]),
+                     "microserviceName": "buyback", "msg": {"asset_id": 1, "quotes": [
+                         {"price": random.random(), "symbols": ["doEURUSD201811111204PT1MC11350481"]}] * 8}}
+        frames.append(json.dumps(frame))
+    return frames
+
+
+def load_frames(path=None, count=20000):
+    if path is None:
+        return synthetic_frames(count)
+    with open(path) as f:
+        return [line.rstrip("\n") for line in f if line.strip()]
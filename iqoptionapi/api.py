@@ -7,6 +7,8 @@ import threading
 import requests
 import ssl
 import atexit
+import itertools
+from functools import partial
 from collections import deque
 from iqoptionapi.http.login import Login
 from iqoptionapi.http.loginv2 import Loginv2
@@ -23,6 +25,11 @@ from iqoptionapi.http.buyback import Buyback
 from iqoptionapi.http.changebalance import Changebalance
 from iqoptionapi.http.events import Events
 from iqoptionapi.ws.client import WebsocketClient
+from iqoptionapi.ws.pending import PendingRequests
+from iqoptionapi.ws.sender import WebsocketSender
+from iqoptionapi.candle_buffer import CandleBuffer
+from iqoptionapi.callback_executor import CallbackExecutor
+from iqoptionapi.latency import OrderLatency
 from iqoptionapi.ws.chanels.get_balances import *
 
 from iqoptionapi.ws.chanels.ssid import Ssid
@@ -66,7 +73,6 @@ from iqoptionapi.ws.objects.profile import Profile
 from iqoptionapi.ws.objects.candles import Candles
 from iqoptionapi.ws.objects.listinfodata import ListInfoData
 from iqoptionapi.ws.objects.betinfo import Game_betinfo_data
-import iqoptionapi.global_value as global_value
 from collections import defaultdict
 
 
@@ -87,72 +93,22 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
     """Class for communication with IQ Option API."""
 
     # pylint: disable=too-many-public-methods
-    socket_option_opened = {}
-    socket_option_closed = {}
-    timesync = TimeSync()
-    profile = Profile()
-    candles = Candles()
-    listinfodata = ListInfoData()
-    api_option_init_all_result = []
-    api_option_init_all_result_v2 = []
-    # for digital
-    underlying_list_data = None
-    position_changed = None
-    instrument_quites_generated_data = nested_dict(2, dict)
-    instrument_quotes_generated_raw_data = nested_dict(2, dict)
-    instrument_quites_generated_timestamp = nested_dict(2, dict)
-    strike_list = None
-    leaderboard_deals_client = None
-    #position_changed_data = nested_dict(2, dict)
-    # microserviceName_binary_options_name_option=nested_dict(2,dict)
-    order_async = nested_dict(2, dict)
-    order_binary = {}
-    game_betinfo = Game_betinfo_data()
-    instruments = None
-    financial_information = None
-    buy_id = None
-    buy_order_id = None
-    traders_mood = {}  # get hight(put) %
-    technical_indicators = {}
-    order_data = None
-    positions = None
-    position = None
-    deferred_orders = None
-    position_history = None
-    position_history_v2 = None
-    available_leverages = None
-    order_canceled = None
-    close_position_data = None
-    overnight_fee = None
-    # ---for real time
-    digital_option_placed_id = {}
-    live_deal_data = nested_dict(3, deque)
-
-    subscribe_commission_changed_data = nested_dict(2, dict)
-    real_time_candles = nested_dict(3, dict)
-    real_time_candles_maxdict_table = nested_dict(2, dict)
-    candle_generated_check = nested_dict(2, dict)
-    candle_generated_all_size_check = nested_dict(1, dict)
-    # ---for api_game_getoptions_result
-    api_game_getoptions_result = None
-    sold_options_respond = None
-    sold_digital_options_respond = None
-    tpsl_changed_respond = None
-    auto_margin_call_changed_respond = None
-    top_assets_updated_data = {}
-    get_options_v2_data = None
-    # --for binary option multi buy
-    buy_multi_result = None
-    buy_multi_option = {}
-    #
-    result = None
-    training_balance_reset_request = None
-    balances_raw = None
-    user_profile_client = None
-    leaderboard_userinfo_deals_client = None
-    users_availability = None
-    # ------------------
-    digital_payout = None
+    # request names coalesced in the send queue
+    coalesced_requests = ("subscribeMessage", "unsubscribeMessage")
+    # state kept from the previous instance when IQ_Option reconnects, the
+    # streams are subscribed again on the new connection
+    reconnect_state = ("SSID", "balance_id",
+                       "real_time_candles", "real_time_candles_maxdict_table",
+                       "live_deal_data", "traders_mood", "order_async",
+                       "instrument_quites_generated_data",
+                       "instrument_quotes_generated_raw_data",
+                       "instrument_quites_generated_timestamp",
+                       "subscribe_commission_changed_data",
+                       "socket_option_opened", "socket_option_closed",
+                       "callback_executor", "live_deal_cb",
+                       "digital_live_deal_cb", "binary_live_deal_cb",
+                       "candle_callbacks", "candle_close_callbacks",
+                       "order_latency", "extra_handlers")
 
     def __init__(self, host, username, password, proxies=None):
         """
@@ -178,6 +134,101 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
         # If it is true, the last buy order was successful
         self.buy_successful = None
         self.__active_account_type = None
+        # replies are matched to their request by request_id
+        self.pending_requests = PendingRequests()
+        # notified by the handlers of pushed frames getters wait for
+        # (option-closed, instrument-quotes-generated)
+        self.pushed_event = threading.Condition()
+        # stage timings of the orders, see iqoptionapi.latency
+        self.order_latency = OrderLatency()
+        # start from the epoch in ms so ids never repeat across reconnects
+        # nor collide with small explicit ids such as buy_multi's indexes
+        self.__request_ids = itertools.count(int(time.time() * 1000))
+        self.profile_request = None
+        # connection state, per instance so several connections can run
+        # side by side in one process
+        self.SSID = None
+        self.balance_id = None
+        self.check_websocket_if_connect = None
+        self.check_websocket_if_error = False
+        self.websocket_error_reason = None
+        # replies and streams of this connection
+        self.socket_option_opened = {}
+        self.socket_option_closed = {}
+        self.timesync = TimeSync()
+        self.profile = Profile()
+        self.candles = Candles()
+        self.listinfodata = ListInfoData()
+        self.api_option_init_all_result = []
+        self.api_option_init_all_result_v2 = []
+        # for digital
+        self.underlying_list_data = None
+        self.position_changed = None
+        self.instrument_quites_generated_data = nested_dict(2, dict)
+        self.instrument_quotes_generated_raw_data = nested_dict(2, dict)
+        self.instrument_quites_generated_timestamp = nested_dict(2, dict)
+        self.strike_list = None
+        self.leaderboard_deals_client = None
+        #position_changed_data = nested_dict(2, dict)
+        # microserviceName_binary_options_name_option=nested_dict(2,dict)
+        self.order_async = nested_dict(2, dict)
+        self.order_binary = {}
+        self.game_betinfo = Game_betinfo_data()
+        self.instruments = None
+        self.financial_information = None
+        self.buy_id = None
+        self.buy_order_id = None
+        self.traders_mood = {}  # get hight(put) %
+        self.technical_indicators = {}
+        self.order_data = None
+        self.positions = None
+        self.position = None
+        self.deferred_orders = None
+        self.position_history = None
+        self.position_history_v2 = None
+        self.available_leverages = None
+        self.order_canceled = None
+        self.close_position_data = None
+        self.overnight_fee = None
+        # ---for real time
+        self.digital_option_placed_id = {}
+        self.live_deal_data = nested_dict(3, deque)
+        # user callbacks, run on callback_executor
+        self.callback_executor = CallbackExecutor()
+        self.live_deal_cb = None
+        self.digital_live_deal_cb = None
+        self.binary_live_deal_cb = None
+        # (active, size) -> callbacks of the realtime candle stream
+        self.candle_callbacks = {}
+        self.candle_close_callbacks = {}
+        # name -> handlers added with register_handler, registered again
+        # on every new WebsocketClient
+        self.extra_handlers = {}
+        self.subscribe_commission_changed_data = nested_dict(2, dict)
+        self.real_time_candles = nested_dict(2, CandleBuffer)
+        self.real_time_candles_maxdict_table = nested_dict(2, dict)
+        self.candle_generated_check = nested_dict(2, dict)
+        self.candle_generated_all_size_check = nested_dict(1, dict)
+        # ---for api_game_getoptions_result
+        self.api_game_getoptions_result = None
+        self.sold_options_respond = None
+        self.sold_digital_options_respond = None
+        self.tpsl_changed_respond = None
+        self.auto_margin_call_changed_respond = None
+        self.top_assets_updated_data = {}
+        self.get_options_v2_data = None
+        # --for binary option multi buy
+        self.buy_multi_result = None
+        self.buy_multi_option = {}
+        #
+        self.result = None
+        self.training_balance_reset_request = None
+        self.balances_raw = None
+        self.user_profile_client = None
+        self.leaderboard_userinfo_deals_client = None
+        self.users_availability = None
+        # ------------------
+        self.digital_payout = None
 
     def prepare_http_url(self, resource):
         """Construct http url from resource url.
@@ -259,24 +310,63 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
         """
         return self.websocket_client.wss
 
-    def send_websocket_request(self, name, msg, request_id="", no_force_send=True):
+    def new_request_id(self):
+        """Get a unique request_id for a websocket request.
+
+        :returns: The request_id as int.
+        """
+        return next(self.__request_ids)
+
+    def send_websocket_request(self, name, msg, request_id="", expect=None):
         """Send websocket request to IQ Option server.
 
+        The frame is queued for the single writer of the connection, see
+        :class:`WebsocketSender <iqoptionapi.ws.sender.WebsocketSender>`.
+
         :param str name: The websocket request name.
         :param dict msg: The websocket request msg.
-        """
-
-        logger = logging.getLogger(__name__)
+        :param str request_id: (optional) The websocket request id.
+        :param tuple expect: (optional) The reply names the request waits
+            for, see :class:`RequestFuture <iqoptionapi.ws.pending.RequestFuture>`.
 
+        :returns: The instance of :class:`RequestFuture
+            <iqoptionapi.ws.pending.RequestFuture>` completed by the reply,
+            None if the request was sent without request_id or coalesced.
+        """
         data = json.dumps(dict(name=name,
                                msg=msg, request_id=request_id))
+        future = None
+        if request_id != "":
+            future = self.pending_requests.register(request_id, expect)
+
+        on_sent = None
+        trace = self.order_latency.take()
+        if trace is not None and future is not None:
+            trace.mark("enqueue")
+            on_sent = partial(trace.mark, "write")
+            future.add_done_callback(
+                lambda future: self.order_latency.acked(trace, future.result))
+
+        key = None
+        if name in self.coalesced_requests:
+            # the same (un)subscribe of a stream still waiting in the queue
+            # is enough, unless the opposite one was queued after it
+            key = (json.dumps(msg, sort_keys=True), name)
+        try:
+            sent = self.websocket_sender.send(data, key, on_sent)
+        except:
+            if future is not None:
+                self.pending_requests.discard(future.request_id)
+            raise
+        if not sent:
+            if future is not None:
+                self.pending_requests.discard(future.request_id)
+            return None
+        return future
 
-        while (global_value.ssl_Mutual_exclusion or global_value.ssl_Mutual_exclusion_write) and no_force_send:
-            pass
-        global_value.ssl_Mutual_exclusion_write = True
-        self.websocket.send(data)
-        logger.debug(data)
-        global_value.ssl_Mutual_exclusion_write = False
+    def send_latency_percentiles(self, percentiles=(50, 99, 99.9)):
+        """Get the send queue latency percentiles of the connection, in seconds."""
+        return self.websocket_sender.latency_percentiles(percentiles)
 
     @property
     def logout(self):
@@ -371,8 +461,9 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
         # sendResults True/False
         # {"name":"sendMessage","request_id":"142","msg":{"name":"reset-training-balance","version":"2.0"}}
 
-        self.send_websocket_request(name="sendMessage", msg={"name": "reset-training-balance",
-                                                             "version": "2.0"})
+        return self.send_websocket_request(name="sendMessage", msg={"name": "reset-training-balance",
+                                                                    "version": "2.0"},
+                                           request_id=self.new_request_id())
 
     @property
     def changebalance(self):
@@ -629,7 +720,8 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
                "version": "3.0",
                "body": {}
                }
-        self.send_websocket_request(name="sendMessage", msg=msg)
+        return self.send_websocket_request(name="sendMessage", msg=msg,
+                                           request_id=self.new_request_id())
 # -------------get information-------------
 
     @property
@@ -771,12 +863,34 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
         self.session.cookies.clear_session_cookies()
         requests.utils.add_dict_to_cookiejar(self.session.cookies, cookies)
 
+    def register_handler(self, name, handler):
+        """Register a websocket message handler that outlives reconnects.
+
+        See :meth:`WebsocketClient.register_handler
+        <iqoptionapi.ws.client.WebsocketClient.register_handler>`.
+        """
+        handlers = self.extra_handlers.setdefault(name, [])
+        if handler not in handlers:
+            handlers.append(handler)
+        if self.websocket_client is not None:
+            self.websocket_client.register_handler(name, handler)
+
+    def unregister_handler(self, name, handler):
+        """Remove a handler added with :meth:`register_handler`."""
+        try:
+            self.extra_handlers.get(name, []).remove(handler)
+        except ValueError:
+            pass
+        if self.websocket_client is not None:
+            self.websocket_client.unregister_handler(name, handler)
+
     def start_websocket(self):
-        global_value.check_websocket_if_connect = None
-        global_value.check_websocket_if_error = False
-        global_value.websocket_error_reason = None
+        self.check_websocket_if_connect = None
+        self.check_websocket_if_error = False
+        self.websocket_error_reason = None
 
         self.websocket_client = WebsocketClient(self)
+        self.websocket_sender = WebsocketSender(self.websocket)
 
         self.websocket_thread = threading.Thread(target=self.websocket.run_forever, kwargs={'sslopt': {
                                                  "check_hostname": False, "cert_reqs": ssl.CERT_NONE, "ca_certs": "cacert.pem"}})  # for fix pyinstall error: cafile, capath and cadata cannot be all omitted
@@ -784,11 +898,11 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
         self.websocket_thread.start()
         while True:
             try:
-                if global_value.check_websocket_if_error:
-                    return False, global_value.websocket_error_reason
-                if global_value.check_websocket_if_connect == 0:
+                if self.check_websocket_if_error:
+                    return False, self.websocket_error_reason
+                if self.check_websocket_if_connect == 0:
                     return False, "Websocket connection closed."
-                elif global_value.check_websocket_if_connect == 1:
+                elif self.check_websocket_if_connect == 1:
                     return True, None
             except:
                 pass
@@ -822,9 +936,9 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
 
     def send_ssid(self):
         self.profile.msg = None
-        self.ssid(global_value.SSID)  # pylint: disable=not-callable
+        self.profile_request = self.ssid(self.SSID)  # pylint: disable=not-callable
         while self.profile.msg == None:
-            pass
+            self.profile_request.wait(0.1)
         if self.profile.msg == False:
             return False
         else:
@@ -832,8 +946,6 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
 
     def connect(self):
 
-        global_value.ssl_Mutual_exclusion = False
-        global_value.ssl_Mutual_exclusion_write = False
         """Method for connection to IQ Option API."""
         try:
             self.close()
@@ -845,7 +957,7 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
             return check_websocket, websocket_reason
 
         # doing temp ssid reconnect for speed up
-        if global_value.SSID != None:
+        if self.SSID != None:
 
             check_ssid = self.send_ssid()
 
@@ -853,18 +965,26 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
                 # ssdi time out need reget,if sent error ssid,the weksocket will close by iqoption server
                 response = self.get_ssid()
                 try:
-                    global_value.SSID = response.cookies["ssid"]
+                    self.SSID = response.cookies["ssid"]
                 except:
                     return False, response.text
                 atexit.register(self.logout)
-                self.start_websocket()
+                # the server closes the socket of a rejected ssid, stop its
+                # writer and reader before opening the new one
+                try:
+                    self.close()
+                except:
+                    pass
+                check_websocket, websocket_reason = self.start_websocket()
+                if check_websocket == False:
+                    return check_websocket, websocket_reason
                 self.send_ssid()
 
         # the ssid is None need get ssid
         else:
             response = self.get_ssid()
             try:
-                global_value.SSID = response.cookies["ssid"]
+                self.SSID = response.cookies["ssid"]
             except:
                 self.close()
                 return False, response.text
@@ -873,7 +993,7 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
 
         # set ssis cookie
         requests.utils.add_dict_to_cookiejar(
-            self.session.cookies, {"ssid": global_value.SSID})
+            self.session.cookies, {"ssid": self.SSID})
 
         self.timesync.server_timestamp = None
         while True:
@@ -897,6 +1017,7 @@ class IQOptionAPI(object):  # pylint: disable=too-many-instance-attributes
         return True, None
 
     def close(self):
+        self.websocket_sender.stop()
         self.websocket.close()
         self.websocket_thread.join()
 
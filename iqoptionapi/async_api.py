@@ -0,0 +1,130 @@
+"""Module for the asyncio IQ Option API."""
+
+import asyncio
+import logging
+import iqoptionapi.constants as OP_code
+from iqoptionapi.stable_api import IQ_Option
+
+
+def _set_result(future, result):
+    if not future.done():
+        future.set_result(result)
+
+
+class AsyncIQOption(object):
+    """Class for awaiting IQ Option requests from an asyncio event loop.
+
+    Requests are built by the ws/chanels and parsed by the ws/received
+    handlers of the wrapped :class:`IQ_Option
+    <iqoptionapi.stable_api.IQ_Option>`. Their replies complete asyncio
+    futures from the websocket thread, so concurrent requests cost no
+    thread each. Only connect and the stream subscribes, which block on
+    the server acknowledge, run in the loop executor.
+    """
+
+    def __init__(self, email, password, active_account_type="PRACTICE"):
+        self.iq = IQ_Option(email, password, active_account_type)
+
+    @property
+    def api(self):
+        return self.iq.api
+
+    async def connect(self):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.iq.connect)
+
+    async def wait_request(self, request, name, timeout=None):
+        """Await the reply of a websocket request.
+
+        :param request: The :class:`RequestFuture
+            <iqoptionapi.ws.pending.RequestFuture>` returned by a chanel.
+
+        :returns: The reply message, None on timeout.
+        :raises ConnectionError: The chanel did not send the request.
+        """
+        if request is None:
+            raise ConnectionError(name + " request was not sent")
+        if timeout is None:
+            timeout = self.iq.request_timeout
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        request.add_done_callback(
+            lambda request: loop.call_soon_threadsafe(_set_result, future, request.result))
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            logging.error('**warning** ' + name + ' late ' + str(timeout) + ' sec')
+            return None
+        finally:
+            self.api.pending_requests.discard(request.request_id)
+
+    async def get_candles(self, ACTIVES, interval, count, endtime):
+        if ACTIVES not in OP_code.ACTIVES:
+            print('Asset {} not found on consts'.format(ACTIVES))
+            return None
+        request = self.api.getcandles(
+            OP_code.ACTIVES[ACTIVES], interval, count, endtime)
+        reply = await self.wait_request(request, "get_candles")
+        if reply is None:
+            return None
+        return reply["msg"].get("candles")
+
+    async def get_candles_many(self, ACTIVES, interval, count, endtime):
+        candles = await asyncio.gather(
+            *[self.get_candles(active, interval, count, endtime) for active in ACTIVES])
+        return dict(zip(ACTIVES, candles))
+
+    async def buy(self, price, ACTIVES, ACTION, expirations):
+        req_id = self.api.new_request_id()
+        request = self.api.buyv3(
+            float(price), OP_code.ACTIVES[ACTIVES], str(ACTION), int(expirations), req_id)
+        reply = await self.wait_request(request, "buy", 5)
+        if reply is None:
+            return False, None
+        if "message" in reply["msg"]:
+            return False, reply["msg"]["message"]
+        return True, reply["msg"].get("id")
+
+    # -----------------------------STREAMS---------------------------------
+
+    async def __stream(self, name, match, subscribe, unsubscribe):
+        loop = asyncio.get_running_loop()
+        messages = asyncio.Queue()
+
+        def on_message(api, message):
+            if match(message["msg"]):
+                loop.call_soon_threadsafe(messages.put_nowait, message["msg"])
+
+        # kept on the api, so it moves to the new connection on reconnect
+        self.api.register_handler(name, on_message)
+        try:
+            await loop.run_in_executor(None, subscribe)
+            while True:
+                yield await messages.get()
+        finally:
+            self.api.unregister_handler(name, on_message)
+            await loop.run_in_executor(None, unsubscribe)
+
+    def candles_stream(self, ACTIVE, size, maxdict=100):
+        """Async iterator over the candle updates of an active.
+
+        Usage::
+
+            async for candle in iq.candles_stream("EURUSD", 60):
+                ...
+        """
+        active_id = OP_code.ACTIVES[ACTIVE]
+        return self.__stream(
+            "candle-generated",
+            lambda msg: msg["active_id"] == active_id and int(msg["size"]) == int(size),
+            lambda: self.iq.start_candles_stream(ACTIVE, size, maxdict),
+            lambda: self.iq.stop_candles_stream(ACTIVE, size))
+
+    def mood_stream(self, ACTIVES, instrument="turbo-option"):
+        """Async iterator over the traders mood (put %) of an active."""
+        active_id = OP_code.ACTIVES[ACTIVES]
+        return self.__stream(
+            "traders-mood-changed",
+            lambda msg: msg["asset_id"] == active_id,
+            lambda: self.iq.start_mood_stream(ACTIVES, instrument),
+            lambda: self.iq.stop_mood_stream(ACTIVES, instrument))
@@ -0,0 +1,136 @@
+"""Module for running user callbacks off the websocket thread."""
+
+import logging
+import threading
+import time
+import zlib
+from collections import deque
+
+
+class CallbackExecutor(object):
+    """Class for a bounded pool running user callbacks.
+
+    Each worker owns a queue and callbacks are routed by key (the active),
+    so the callbacks of one active run one at a time in arrival order.
+    """
+
+    # what submit does when the queue of the worker is full
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEW = "drop_new"
+    BLOCK = "block"
+
+    def __init__(self, workers=4, queue_size=1000, overflow=DROP_OLDEST, late_after=1.0):
+        """
+        :param int workers: (optional) Number of worker threads.
+        :param int queue_size: (optional) Max callbacks waiting per worker.
+        :param str overflow: (optional) DROP_OLDEST, DROP_NEW or BLOCK, BLOCK
+            stalls the websocket thread until the worker catches up.
+        :param float late_after: (optional) Seconds in queue after which a
+            callback is counted as late.
+        """
+        if overflow not in (self.DROP_OLDEST, self.DROP_NEW, self.BLOCK):
+            raise ValueError("unknown overflow policy: {}".format(overflow))
+        self.workers = max(1, int(workers))
+        self.queue_size = max(1, int(queue_size))
+        self.overflow = overflow
+        self.late_after = late_after
+        self.submitted = 0
+        self.dropped = 0
+        self.late = 0
+        self.failed = 0
+        self.__lock = threading.Lock()
+        self.__queues = [deque() for _ in range(self.workers)]
+        self.__conditions = [threading.Condition(self.__lock) for _ in range(self.workers)]
+        self.__threads = None
+        self.__shutdown = False
+
+    def submit(self, key, callback, *args, **kwargs):
+        """Queue callback(*args, **kwargs) behind the callbacks of the same key.
+
+        :returns: False if the callback was dropped.
+        """
+        index = zlib.crc32(str(key).encode()) % self.workers
+        tasks = self.__queues[index]
+        condition = self.__conditions[index]
+        with self.__lock:
+            if self.__shutdown:
+                self.dropped += 1
+                return False
+            if self.__threads is None:
+                self.__start()
+            self.submitted += 1
+            while len(tasks) >= self.queue_size:
+                if self.overflow == self.DROP_NEW:
+                    self.dropped += 1
+                    return False
+                if self.overflow == self.DROP_OLDEST:
+                    tasks.popleft()
+                    self.dropped += 1
+                    break
+                condition.wait()
+                if self.__shutdown:
+                    # woken by shutdown(), nobody would run it
+                    self.dropped += 1
+                    return False
+            tasks.append((time.time(), callback, args, kwargs))
+            condition.notify_all()
+        return True
+
+    def shutdown(self, wait=True):
+        """Stop the workers once the callbacks already queued have run.
+
+        Callbacks submitted afterwards are dropped.
+
+        :param bool wait: (optional) Block until the workers have exited.
+        """
+        with self.__lock:
+            self.__shutdown = True
+            for condition in self.__conditions:
+                condition.notify_all()
+            threads = self.__threads or []
+        if wait:
+            for thread in threads:
+                if thread is not threading.current_thread():
+                    thread.join()
+
+    def stats(self):
+        """Get the callback counters.
+
+        :returns: dict with submitted, dropped, late, failed and queued.
+        """
+        with self.__lock:
+            return {"submitted": self.submitted,
+                    "dropped": self.dropped,
+                    "late": self.late,
+                    "failed": self.failed,
+                    "queued": sum(len(tasks) for tasks in self.__queues)}
+
+    def __start(self):
+        self.__threads = []
+        for index in range(self.workers):
+            thread = threading.Thread(target=self.__run, args=(index,))
+            thread.daemon = True
+            thread.start()
+            self.__threads.append(thread)
+
+    def __run(self, index):
+        logger = logging.getLogger(__name__)
+        tasks = self.__queues[index]
+        condition = self.__conditions[index]
+        while True:
+            with self.__lock:
+                while not tasks:
+                    if self.__shutdown:
+                        return
+                    condition.wait()
+                queued_at, callback, args, kwargs = tasks.popleft()
+                # wake a submit blocked on the full queue
+                condition.notify_all()
+                if time.time() - queued_at > self.late_after:
+                    self.late += 1
+            try:
+                callback(*args, **kwargs)
+            except Exception as error:
+                logger.error(error)
+                with self.__lock:
+                    self.failed += 1
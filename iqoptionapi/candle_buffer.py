@@ -0,0 +1,78 @@
+"""Module for the IQ Option realtime candle buffer."""
+
+import threading
+from collections import deque
+from itertools import islice
+
+
+class CandleBuffer(dict):
+    """Class for the realtime candles of one (active, size), keyed by "from".
+
+    Still a dict for readers of real_time_candles, the keys are also kept
+    ascending in a deque so the oldest candle is evicted in O(1) and
+    snapshot() needs no sort.
+    """
+
+    def __init__(self, maxlen=None):
+        """
+        :param int maxlen: (optional) Max candles kept, None keeps all.
+        """
+        super(CandleBuffer, self).__init__()
+        self.maxlen = maxlen
+        self.__keys = deque()
+        self.__lock = threading.Lock()
+
+    def __setitem__(self, key, value):
+        with self.__lock:
+            if not dict.__contains__(self, key):
+                if self.__keys and key < self.__keys[-1]:
+                    # late candle, rare enough to rebuild the order
+                    self.__keys = deque(sorted(list(self.__keys) + [key]))
+                else:
+                    self.__keys.append(key)
+            dict.__setitem__(self, key, value)
+            if self.maxlen:
+                while len(self.__keys) > self.maxlen:
+                    dict.__delitem__(self, self.__keys.popleft())
+
+    def __delitem__(self, key):
+        with self.__lock:
+            dict.__delitem__(self, key)
+            self.__keys.remove(key)
+
+    def clear(self):
+        with self.__lock:
+            dict.clear(self)
+            self.__keys.clear()
+
+    def add(self, key, value, maxlen=None):
+        """Add a candle or update the current one.
+
+        :param key: The candle "from".
+        :param value: The candle dict.
+        :param int maxlen: (optional) New max candles kept.
+        """
+        if isinstance(maxlen, int):
+            self.maxlen = maxlen
+        self[key] = value
+
+    def last(self):
+        """Get the newest candle, None if the buffer is empty."""
+        with self.__lock:
+            if not self.__keys:
+                return None
+            return dict.__getitem__(self, self.__keys[-1])
+
+    def snapshot(self, count=None):
+        """Get the candles ordered by "from", oldest first.
+
+        :param int count: (optional) Only the newest count candles.
+
+        :returns: list of candle dicts.
+        """
+        with self.__lock:
+            if count is None:
+                keys = list(self.__keys)
+            else:
+                keys = list(islice(reversed(self.__keys), count))[::-1]
+            return [dict.__getitem__(self, key) for key in keys]
@@ -0,0 +1,100 @@
+"""Module for the local IQ Option candle archive."""
+
+import sqlite3
+import threading
+
+
+class CandleStore(object):
+    """Class for a single-file SQLite archive of candles keyed by (active, size).
+
+    Candles are clustered by (active, size, from) so a range read is one
+    index scan. The coverage table records the ranges already synced with
+    the server, holes inside them (market closed) are not asked for again.
+    """
+
+    fields = ("id", "from", "to", "open", "close", "min", "max", "volume")
+
+    def __init__(self, path):
+        """
+        :param str path: The archive file, created if missing.
+        """
+        self.path = path
+        self.__lock = threading.Lock()
+        self.__db = sqlite3.connect(path, check_same_thread=False)
+        with self.__lock, self.__db:
+            self.__db.execute(
+                'CREATE TABLE IF NOT EXISTS candles ('
+                'active TEXT NOT NULL, size INTEGER NOT NULL, "from" INTEGER NOT NULL, '
+                '"to" INTEGER, id INTEGER, open REAL, close REAL, min REAL, max REAL, volume REAL, '
+                'PRIMARY KEY (active, size, "from")) WITHOUT ROWID')
+            self.__db.execute(
+                'CREATE TABLE IF NOT EXISTS coverage ('
+                'active TEXT NOT NULL, size INTEGER NOT NULL, start INTEGER NOT NULL, "end" INTEGER NOT NULL, '
+                'PRIMARY KEY (active, size, start)) WITHOUT ROWID')
+
+    def get(self, active, size, start, end):
+        """Get the archived candles with start <= from <= end.
+
+        :returns: list of candle dicts ordered by "from".
+        """
+        with self.__lock:
+            rows = self.__db.execute(
+                'SELECT id, "from", "to", open, close, min, max, volume FROM candles '
+                'WHERE active = ? AND size = ? AND "from" BETWEEN ? AND ? ORDER BY "from"',
+                (active, size, start, end)).fetchall()
+        return [dict(zip(self.fields, row)) for row in rows]
+
+    def missing(self, active, size, start, end):
+        """Get the candle ranges of [start, end] not synced yet.
+
+        :returns: list of (start, end) candle "from" ranges, both inclusive.
+        """
+        with self.__lock:
+            covered = self.__db.execute(
+                'SELECT start, "end" FROM coverage WHERE active = ? AND size = ? '
+                'AND start <= ? AND "end" >= ? ORDER BY start',
+                (active, size, end, start)).fetchall()
+        ranges = []
+        for covered_start, covered_end in covered:
+            if covered_start > start:
+                ranges.append((start, covered_start - size))
+            start = max(start, covered_end + size)
+        if start <= end:
+            ranges.append((start, end))
+        return ranges
+
+    def put(self, active, size, candles, covered_start=None, covered_end=None):
+        """Archive candles and mark [covered_start, covered_end] as synced.
+
+        :param list candles: Candle dicts as sent by the "candles" message.
+        :param covered_start: (optional) First candle "from" of the synced range.
+        :param covered_end: (optional) Last candle "from" of the synced range,
+            candles still open must be left out of it.
+        """
+        rows = [(active, size, candle["from"], candle.get("to"), candle.get("id"),
+                 candle.get("open"), candle.get("close"), candle.get("min"),
+                 candle.get("max"), candle.get("volume")) for candle in candles]
+        with self.__lock, self.__db:
+            self.__db.executemany(
+                'INSERT OR REPLACE INTO candles (active, size, "from", "to", id, open, close, min, max, volume) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', rows)
+            if covered_start is None or covered_end is None or covered_start > covered_end:
+                return
+            # merge with the overlapping or adjacent synced ranges
+            merged = self.__db.execute(
+                'SELECT start, "end" FROM coverage WHERE active = ? AND size = ? '
+                'AND start <= ? AND "end" >= ?',
+                (active, size, covered_end + size, covered_start - size)).fetchall()
+            for merged_start, merged_end in merged:
+                covered_start = min(covered_start, merged_start)
+                covered_end = max(covered_end, merged_end)
+            self.__db.executemany(
+                'DELETE FROM coverage WHERE active = ? AND size = ? AND start = ?',
+                [(active, size, merged_start) for merged_start, _ in merged])
+            self.__db.execute(
+                'INSERT INTO coverage (active, size, start, "end") VALUES (?, ?, ?, ?)',
+                (active, size, covered_start, covered_end))
+
+    def close(self):
+        with self.__lock:
+            self.__db.close()
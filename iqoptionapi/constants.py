@@ -183,3 +183,33 @@ ACTIVES = {
     "EXPD:US": 426,
     "EXR:US": 428,
 }
+
+
+# active_id -> name reverse index of ACTIVES, kept in sync by
+# update_actives_name() (see IQ_Option.update_ACTIVES_OPCODE).
+ACTIVES_NAME = {}
+
+
+def update_actives_name():
+    """Rebuild the active_id -> name reverse index from ACTIVES.
+
+    Call it after changing ACTIVES, as IQ_Option.update_ACTIVES_OPCODE does.
+    """
+    global ACTIVES_NAME
+    names = {}
+    for name, active_id in ACTIVES.items():
+        # keep the first name for an id, like list(values).index() did
+        names.setdefault(active_id, name)
+    ACTIVES_NAME = names
+
+
+def get_active_name(active_id, default=None):
+    """Get the ACTIVES name of an active_id.
+
+    :param active_id: The active/asset identifier.
+    :param default: (optional) Returned when the id is not in ACTIVES.
+    """
+    return ACTIVES_NAME.get(active_id, default)
+
+
+update_actives_name()
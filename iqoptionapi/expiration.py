@@ -1,6 +1,6 @@
 # python
 import time
-from datetime import datetime, timedelta
+from functools import lru_cache
 
 # https://docs.python.org/3/library/datetime.html
 # If optional argument tz is None or not specified, the timestamp is converted to the platform's local date and time, and the returned datetime object is naive.
@@ -12,69 +12,41 @@ def date_to_timestamp(dt):
     return time.mktime(dt.timetuple())
 
 
-def get_expiration_time(timestamp, duration):
-    #
-    now_date = datetime.fromtimestamp(timestamp)
-    exp_date = now_date.replace(second=0, microsecond=0)
-    if (int(date_to_timestamp(exp_date+timedelta(minutes=1)))-timestamp) > 30:
-        exp_date = exp_date+timedelta(minutes=1)
-
-    else:
-        exp_date = exp_date+timedelta(minutes=2)
-    exp = []
-    for _ in range(5):
-        exp.append(date_to_timestamp(exp_date))
-        exp_date = exp_date+timedelta(minutes=1)
+@lru_cache(maxsize=32)
+def _expirations(minute, next_minute, count):
+    # Integer version of the datetime walk: expirations only depend on the
+    # minute of the timestamp and on whether 30s of it are left. Every
+    # timezone in use is offset by a multiple of 15 minutes, so local
+    # minutes and quarters start where they do in epoch seconds.
+    first = minute + (60 if next_minute else 120)
+    exp = [first + 60 * i for i in range(5)]
+    # first quarter more than 5 minutes after the timestamp
+    quarter = (minute + 360 + 899) // 900 * 900
+    exp.extend(quarter + 900 * i for i in range(count))
+    return tuple(exp)
 
-    idx = 50
-    index = 0
-    now_date = datetime.fromtimestamp(timestamp)
-    exp_date = now_date.replace(second=0, microsecond=0)
-    while index < idx:
-        if int(exp_date.strftime("%M")) % 15 == 0 and (int(date_to_timestamp(exp_date))-int(timestamp)) > 60*5:
-            exp.append(date_to_timestamp(exp_date))
-            index = index+1
-        exp_date = exp_date+timedelta(minutes=1)
-
-    remaning = []
 
-    for t in exp:
-        remaning.append(int(t)-int(time.time()))
+def _timestamp_expirations(timestamp, count):
+    minute = int(timestamp) // 60 * 60
+    return _expirations(minute, minute + 60 - timestamp > 30, count)
 
-    close = [abs(x-60*duration) for x in remaning]
 
-    return int(exp[close.index(min(close))]), int(close.index(min(close)))
+def get_expiration_time(timestamp, duration):
+    exp = _timestamp_expirations(timestamp, 50)
+    now = int(time.time())
+    close = [abs(t - now - 60 * duration) for t in exp]
+    index = close.index(min(close))
+    return exp[index], index
 
 
 def get_remaning_time(timestamp):
-    now_date = datetime.fromtimestamp(timestamp)
-    exp_date = now_date.replace(second=0, microsecond=0)
-    if (int(date_to_timestamp(exp_date+timedelta(minutes=1)))-timestamp) > 30:
-        exp_date = exp_date+timedelta(minutes=1)
-
-    else:
-        exp_date = exp_date+timedelta(minutes=2)
-    exp = []
-    for _ in range(5):
-        exp.append(date_to_timestamp(exp_date))
-        exp_date = exp_date+timedelta(minutes=1)
-    idx = 11
-    index = 0
-    now_date = datetime.fromtimestamp(timestamp)
-    exp_date = now_date.replace(second=0, microsecond=0)
-    while index < idx:
-        if int(exp_date.strftime("%M")) % 15 == 0 and (int(date_to_timestamp(exp_date))-int(timestamp)) > 60*5:
-            exp.append(date_to_timestamp(exp_date))
-            index = index+1
-        exp_date = exp_date+timedelta(minutes=1)
-
+    now = int(time.time())
     remaning = []
-
-    for idx, t in enumerate(exp):
+    for idx, t in enumerate(_timestamp_expirations(timestamp, 11)):
         if idx >= 5:
             dr = 15*(idx-4)
         else:
             dr = idx+1
-        remaning.append((dr, int(t)-int(time.time())))
+        remaning.append((dr, t-now))
 
     return remaning
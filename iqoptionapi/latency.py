@@ -0,0 +1,163 @@
+"""Module for order placement latency instrumentation."""
+
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+
+
+class LatencyHistogram(object):
+    """Class for an HDR-style latency histogram.
+
+    Values are counted in microseconds, exactly below 128us and above in
+    64 linear sub-buckets per power of two (about 1.6% error), so memory
+    stays small whatever the number of samples.
+    """
+
+    sub_buckets = 64
+
+    def __init__(self):
+        self.counts = defaultdict(int)
+        self.count = 0
+        self.max = 0
+
+    @classmethod
+    def _index(cls, value):
+        if value < 2 * cls.sub_buckets:
+            return value
+        shift = value.bit_length() - 7
+        return (shift << 6) + (value >> shift)
+
+    @classmethod
+    def _value(cls, index):
+        if index < 2 * cls.sub_buckets:
+            return index
+        shift = (index >> 6) - 1
+        top = index - (shift << 6)
+        # middle of the bucket
+        return (top << shift) + (1 << shift) // 2
+
+    def record(self, seconds):
+        value = max(0, int(seconds * 1000000))
+        self.counts[self._index(value)] += 1
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def percentile(self, percentile):
+        """Get a percentile in seconds, None if nothing was recorded."""
+        if not self.count:
+            return None
+        rank = max(1, int(percentile / 100.0 * self.count + 0.5))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._value(index), self.max) / 1000000.0
+        return self.max / 1000000.0
+
+
+class OrderTrace(object):
+    """Class for the stage timestamps of one order."""
+
+    def __init__(self, latency, order_type, active):
+        self.latency = latency
+        self.order_type = order_type
+        self.active = active
+        self.times = {"start": time.perf_counter()}
+
+    def mark(self, stage):
+        self.times[stage] = time.perf_counter()
+
+
+class OrderLatency(object):
+    """Class for the latency histograms of order placement.
+
+    Stages recorded per (order type, active):
+        build: buy call until the request is queued.
+        queue: queued until written to the socket.
+        server_ack: written until the option/digital-option-placed/
+            order-placed-temp reply.
+        position_changed: reply until the position-changed of the order.
+        ack_total, position_total: buy call until the reply/position-changed.
+    """
+
+    # orders waiting for their position-changed
+    max_pending = 1000
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__local = threading.local()
+        self.__histograms = defaultdict(LatencyHistogram)
+        self.__positions = OrderedDict()
+
+    def start(self, order_type, active):
+        """Start tracing the next websocket request sent by this thread."""
+        trace = OrderTrace(self, order_type, str(active))
+        self.__local.trace = trace
+        return trace
+
+    @contextmanager
+    def tracing(self, order_type, active):
+        """Trace the websocket request sent by this thread inside the block.
+
+        The trace is cleared on exit, so a block that fails before sending
+        does not leave it to the next request of the thread.
+        """
+        try:
+            yield self.start(order_type, active)
+        finally:
+            self.__local.trace = None
+
+    def take(self):
+        """Get and clear the trace started by this thread, called on send."""
+        trace = getattr(self.__local, "trace", None)
+        self.__local.trace = None
+        return trace
+
+    def acked(self, trace, reply):
+        """Record the reply of a traced request, runs on the websocket thread."""
+        trace.mark("ack")
+        self.__record(trace, "build", "start", "enqueue")
+        self.__record(trace, "queue", "enqueue", "write")
+        self.__record(trace, "server_ack", "write", "ack")
+        self.__record(trace, "ack_total", "start", "ack")
+        try:
+            order_id = int(reply["msg"]["id"])
+        except (KeyError, TypeError, ValueError):
+            return
+        with self.__lock:
+            self.__positions[order_id] = trace
+            while len(self.__positions) > self.max_pending:
+                self.__positions.popitem(last=False)
+
+    def position_changed(self, order_id):
+        """Record the position-changed of a traced order."""
+        with self.__lock:
+            trace = self.__positions.pop(order_id, None)
+        if trace is None:
+            return
+        trace.mark("position")
+        self.__record(trace, "position_changed", "ack", "position")
+        self.__record(trace, "position_total", "start", "position")
+
+    def percentiles(self, percentiles=(50, 99, 99.9)):
+        """Get the latency percentiles in seconds.
+
+        :returns: dict (order type, active) -> stage -> dict with count,
+            max and one key per percentile.
+        """
+        result = defaultdict(dict)
+        with self.__lock:
+            for (order_type, active, stage), histogram in self.__histograms.items():
+                stats = {"count": histogram.count, "max": histogram.max / 1000000.0}
+                for percentile in percentiles:
+                    stats[percentile] = histogram.percentile(percentile)
+                result[(order_type, active)][stage] = stats
+        return dict(result)
+
+    def __record(self, trace, stage, begin, end):
+        if begin not in trace.times or end not in trace.times:
+            return
+        with self.__lock:
+            self.__histograms[(trace.order_type, trace.active, stage)].record(
+                trace.times[end] - trace.times[begin])
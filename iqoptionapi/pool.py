@@ -0,0 +1,127 @@
+"""Module for IQ Option API with subscriptions spread over several connections."""
+
+import zlib
+from iqoptionapi.stable_api import IQ_Option
+
+
+class IQ_OptionPool(object):
+    """Class for K IQ_Option connections of one account.
+
+    Streams of an active (candles, strike list, traders mood) always go to
+    the same connection, chosen by a hash of the active name, so each
+    connection decodes and dispatches only its share of the frames on its
+    own receive thread. Realtime reads are merged over the connections and
+    account settings are applied to all of them, every other call goes to
+    the first connection.
+    """
+
+    def __init__(self, email, password, connections=2, active_account_type="PRACTICE"):
+        """
+        :param str email: The IQ Option account email.
+        :param str password: The IQ Option account password.
+        :param int connections: (optional) The number of websocket connections.
+        """
+        self.shards = [IQ_Option(email, password, active_account_type)
+                       for _ in range(max(1, int(connections)))]
+
+    def __getattr__(self, name):
+        # orders, balances, history... use the first connection
+        return getattr(self.shards[0], name)
+
+    def shard(self, ACTIVE):
+        """Get the IQ_Option connection serving the streams of an active."""
+        return self.shards[zlib.crc32(str(ACTIVE).encode()) % len(self.shards)]
+
+    def connect(self):
+        for shard in self.shards:
+            check, reason = shard.connect()
+            if not check:
+                return check, reason
+        return True, None
+
+    def check_connect(self):
+        return all(shard.check_connect() for shard in self.shards)
+
+    # ---------------------------ACCOUNT SETTINGS---------------------------
+
+    def set_session(self, header, cookie):
+        for shard in self.shards:
+            shard.set_session(header, cookie)
+
+    def set_candle_store(self, path):
+        for shard in self.shards:
+            shard.set_candle_store(path)
+
+    def change_balance(self, Balance_MODE):
+        for shard in self.shards:
+            shard.change_balance(Balance_MODE)
+
+    def set_callback_executor(self, workers=4, queue_size=1000, overflow="drop_oldest", late_after=1.0):
+        # one executor per connection, each runs the callbacks of its streams
+        for shard in self.shards:
+            shard.set_callback_executor(workers, queue_size, overflow, late_after)
+
+    def get_callback_stats(self):
+        stats = {}
+        for shard in self.shards:
+            for name, value in shard.get_callback_stats().items():
+                stats[name] = stats.get(name, 0) + value
+        return stats
+
+    # ---------------------------REAL TIME CANDLE---------------------------
+
+    def start_candles_stream(self, ACTIVE, size, maxdict):
+        return self.shard(ACTIVE).start_candles_stream(ACTIVE, size, maxdict)
+
+    def stop_candles_stream(self, ACTIVE, size):
+        return self.shard(ACTIVE).stop_candles_stream(ACTIVE, size)
+
+    def get_realtime_candles(self, ACTIVE, size):
+        return self.shard(ACTIVE).get_realtime_candles(ACTIVE, size)
+
+    def on_candle(self, ACTIVE, size, callback):
+        return self.shard(ACTIVE).on_candle(ACTIVE, size, callback)
+
+    def on_candle_close(self, ACTIVE, size, callback):
+        return self.shard(ACTIVE).on_candle_close(ACTIVE, size, callback)
+
+    def remove_candle_callback(self, ACTIVE, size, callback):
+        return self.shard(ACTIVE).remove_candle_callback(ACTIVE, size, callback)
+
+    def get_all_realtime_candles(self):
+        # merged view, the buffers are the live ones of each connection
+        candles = {}
+        for shard in self.shards:
+            candles.update(shard.get_all_realtime_candles())
+        return candles
+
+    # ------------------------------STRIKE LIST-----------------------------
+
+    def subscribe_strike_list(self, ACTIVE, expiration_period):
+        return self.shard(ACTIVE).subscribe_strike_list(ACTIVE, expiration_period)
+
+    def unsubscribe_strike_list(self, ACTIVE, expiration_period):
+        return self.shard(ACTIVE).unsubscribe_strike_list(ACTIVE, expiration_period)
+
+    def get_instrument_quites_generated_data(self, ACTIVE, duration):
+        return self.shard(ACTIVE).get_instrument_quites_generated_data(ACTIVE, duration)
+
+    def get_realtime_strike_list(self, ACTIVE, duration):
+        return self.shard(ACTIVE).get_realtime_strike_list(ACTIVE, duration)
+
+    # ------------------------------TRADERS MOOD----------------------------
+
+    def start_mood_stream(self, ACTIVES, instrument="turbo-option"):
+        return self.shard(ACTIVES).start_mood_stream(ACTIVES, instrument)
+
+    def stop_mood_stream(self, ACTIVES, instrument="turbo-option"):
+        return self.shard(ACTIVES).stop_mood_stream(ACTIVES, instrument)
+
+    def get_traders_mood(self, ACTIVES):
+        return self.shard(ACTIVES).get_traders_mood(ACTIVES)
+
+    def get_all_traders_mood(self):
+        mood = {}
+        for shard in self.shards:
+            mood.update(shard.get_all_traders_mood())
+        return mood
@@ -1,5 +1,7 @@
 # python
 from iqoptionapi.api import IQOptionAPI
+from iqoptionapi.candle_store import CandleStore
+from iqoptionapi.callback_executor import CallbackExecutor
 import iqoptionapi.constants as OP_code
 import iqoptionapi.country_id as Country
 import threading
@@ -7,7 +9,6 @@ import time
 import json
 import logging
 import operator
-import iqoptionapi.global_value as global_value
 from collections import defaultdict
 from collections import deque
 from iqoptionapi.expiration import get_expiration_time, get_remaning_time
@@ -32,6 +33,10 @@ class IQ_Option:
         self.email = email
         self.password = password
         self.suspend = 0.5
+        # seconds a getter blocks on the reply of its websocket request
+        self.request_timeout = 30
+        # local candle archive, see set_candle_store
+        self.candle_store = None
         self.thread = None
         self.subscribe_candle = []
         self.subscribe_candle_all_size = []
@@ -54,6 +59,34 @@ class IQ_Option:
     def get_server_timestamp(self):
         return self.api.timesync.server_timestamp
 
+    def get_send_latency(self, percentiles=(50, 99, 99.9)):
+        # seconds a websocket request waits in the send queue
+        return self.api.send_latency_percentiles(percentiles)
+
+    def wait_request(self, request, name, timeout=None):
+        # block on the reply of a websocket request (see
+        # iqoptionapi.ws.pending) instead of spinning on an api attribute
+        if timeout is None:
+            timeout = self.request_timeout
+        if self.api.pending_requests.wait(request, timeout):
+            return True
+        logging.error('**warning** ' + name + ' late ' + str(timeout) + ' sec')
+        return False
+
+    def wait_pushed(self, ready, timeout=None):
+        # block until ready() holds on a pushed frame nobody requested; the
+        # handlers notify api.pushed_event, the short waits re-read self.api
+        # so a reconnect does not leave us on the old connection
+        deadline = None if timeout is None else time.time() + timeout
+        while not ready():
+            if deadline is not None and time.time() >= deadline:
+                return False
+            api = self.api
+            with api.pushed_event:
+                if not ready():
+                    api.pushed_event.wait(1)
+        return True
+
     def re_subscribe_stream(self):
         try:
             for ac in self.subscribe_candle:
@@ -78,7 +111,17 @@ class IQ_Option:
         self.SESSION_HEADER = header
         self.SESSION_COOKIE = cookie
 
+    def set_candle_store(self, path):
+        """Open the local candle archive used by get_candles(from_store=True).
+
+        :param str path: The SQLite file, created if missing, None closes the archive.
+        """
+        if self.candle_store != None:
+            self.candle_store.close()
+        self.candle_store = CandleStore(path) if path != None else None
+
     def connect(self, sms_code=None):
+        old_api = getattr(self, "api", None)
         try:
             self.api.close()
         except:
@@ -87,6 +130,9 @@ class IQ_Option:
 
         self.api = IQOptionAPI(
             "iqoption.com", self.email, self.password)
+        if old_api != None:
+            for name in IQOptionAPI.reconnect_state:
+                setattr(self.api, name, getattr(old_api, name))
         check = None
 
         # 2FA--
@@ -107,11 +153,11 @@ class IQ_Option:
             self.re_subscribe_stream()
 
             # ---------for async get name: "position-changed", microserviceName
-            while global_value.balance_id == None:
+            while self.api.balance_id == None:
                 pass
 
             self.position_change_all(
-                "subscribeMessage", global_value.balance_id)
+                "subscribeMessage", self.api.balance_id)
 
             self.order_changed_all("subscribeMessage")
             self.api.setOptions(1, True)
@@ -159,7 +205,7 @@ class IQ_Option:
         # True/False
         # if not connected, sometimes it's None, sometimes its '0', so
         # both will fall on this first case
-        if not global_value.check_websocket_if_connect:
+        if getattr(self, "api", None) == None or not self.api.check_websocket_if_connect:
             return False
         else:
             return True
@@ -178,6 +224,7 @@ class IQ_Option:
         for lis in sorted(OP_code.ACTIVES.items(), key=operator.itemgetter(1)):
             dicc[lis[0]] = lis[1]
         OP_code.ACTIVES = dicc
+        OP_code.update_actives_name()
 
     def get_name_by_activeId(self, activeId):
         info = self.get_financial_information(activeId)
@@ -188,20 +235,18 @@ class IQ_Option:
 
     def get_financial_information(self, activeId):
         self.api.financial_information = None
-        self.api.get_financial_information(activeId)
-        while self.api.financial_information == None:
-            pass
+        request = self.api.get_financial_information(activeId)
+        self.wait_request(request, "get_financial_information")
         return self.api.financial_information
 
     def get_leader_board(self, country, from_position, to_position, near_traders_count, user_country_id=0, near_traders_country_count=0, top_country_count=0, top_count=0, top_type=2):
         self.api.leaderboard_deals_client = None
 
         country_id = Country.ID[country]
-        self.api.Get_Leader_Board(country_id, user_country_id, from_position, to_position,
-                                  near_traders_country_count, near_traders_count, top_country_count, top_count, top_type)
+        request = self.api.Get_Leader_Board(country_id, user_country_id, from_position, to_position,
+                                            near_traders_country_count, near_traders_count, top_country_count, top_count, top_type)
 
-        while self.api.leaderboard_deals_client == None:
-            pass
+        self.wait_request(request, "get_leader_board")
         return self.api.leaderboard_deals_client
 
     def get_instruments(self, type):
@@ -210,10 +255,8 @@ class IQ_Option:
         self.api.instruments = None
         while self.api.instruments == None:
             try:
-                self.api.get_instruments(type)
-                start = time.time()
-                while self.api.instruments == None and time.time() - start < 10:
-                    pass
+                request = self.api.get_instruments(type)
+                self.api.pending_requests.wait(request, 10)
             except:
                 logging.error('**error** api.get_instruments need reconnect')
                 self.connect()
@@ -223,6 +266,7 @@ class IQ_Option:
         instruments = self.get_instruments(type)
         for ins in instruments["instruments"]:
             OP_code.ACTIVES[ins["id"]] = ins["active_id"]
+        OP_code.update_actives_name()
 
     def instruments_input_all_in_ACTIVES(self):
         self.instruments_input_to_ACTIVES("crypto")
@@ -235,6 +279,7 @@ class IQ_Option:
             for i in init_info["result"][dirr]["actives"]:
                 OP_code.ACTIVES[(init_info["result"][dirr]
                                  ["actives"][i]["name"]).split(".")[1]] = int(i)
+        OP_code.update_actives_name()
 
     # _________________________self.api.get_api_option_init_all() wss______________________
     def get_all_init(self):
@@ -271,12 +316,9 @@ class IQ_Option:
         if self.check_connect() == False:
             self.connect()
 
-        self.api.get_api_option_init_all_v2()
-        start_t = time.time()
-        while self.api.api_option_init_all_result_v2 == None:
-            if time.time() - start_t >= 30:
-                logging.error('**warning** get_all_init_v2 late 30 sec')
-                return None
+        request = self.api.get_api_option_init_all_v2()
+        if not self.wait_request(request, "get_all_init_v2"):
+            return None
         return self.api.api_option_init_all_result_v2
 
         # return OP_code.ACTIVES
@@ -383,7 +425,7 @@ class IQ_Option:
 
     def get_profile_ansyc(self):
         while self.api.profile.msg == None:
-            pass
+            self.api.profile_request.wait(0.1)
         return self.api.profile.msg
 
     """def get_profile(self):
@@ -402,11 +444,11 @@ class IQ_Option:
     def get_currency(self):
         balances_raw = self.get_balances()
         for balance in balances_raw["msg"]:
-            if balance["id"] == global_value.balance_id:
+            if balance["id"] == self.api.balance_id:
                 return balance["currency"]
 
     def get_balance_id(self):
-        return global_value.balance_id
+        return self.api.balance_id
 
     """ def get_balance(self):
         self.api.profile.balance = None
@@ -425,21 +467,20 @@ class IQ_Option:
 
         balances_raw = self.get_balances()
         for balance in balances_raw["msg"]:
-            if balance["id"] == global_value.balance_id:
+            if balance["id"] == self.api.balance_id:
                 return balance["amount"]
 
     def get_balances(self):
         self.api.balances_raw = None
-        self.api.get_balances()
-        while self.api.balances_raw == None:
-            pass
+        request = self.api.get_balances()
+        self.wait_request(request, "get_balances")
         return self.api.balances_raw
 
     def get_balance_mode(self):
         # self.api.profile.balance_type=None
         profile = self.get_profile_ansyc()
         for balance in profile.get("balances"):
-            if balance["id"] == global_value.balance_id:
+            if balance["id"] == self.api.balance_id:
                 if balance["type"] == 1:
                     return "REAL"
                 elif balance["type"] == 4:
@@ -450,9 +491,8 @@ class IQ_Option:
 
     def reset_practice_balance(self):
         self.api.training_balance_reset_request = None
-        self.api.reset_training_balance()
-        while self.api.training_balance_reset_request == None:
-            pass
+        request = self.api.reset_training_balance()
+        self.wait_request(request, "reset_practice_balance")
         return self.api.training_balance_reset_request
 
     def position_change_all(self, Main_Name, user_balance_id):
@@ -471,11 +511,11 @@ class IQ_Option:
 
     def change_balance(self, Balance_MODE):
         def set_id(b_id):
-            if global_value.balance_id != None:
+            if self.api.balance_id != None:
                 self.position_change_all(
-                    "unsubscribeMessage", global_value.balance_id)
+                    "unsubscribeMessage", self.api.balance_id)
 
-            global_value.balance_id = b_id
+            self.api.balance_id = b_id
 
             self.position_change_all("subscribeMessage", b_id)
 
@@ -509,24 +549,151 @@ class IQ_Option:
     # _______________________        CANDLE      _____________________________
     # ________________________self.api.getcandles() wss________________________
 
-    def get_candles(self, ACTIVES, interval, count, endtime):
+    def get_candles(self, ACTIVES, interval, count, endtime, from_store=False):
+        if from_store and self.candle_store != None and interval <= 86400:
+            return self.__get_candles_from_store([ACTIVES], interval, count, endtime)[ACTIVES]
         self.api.candles.candles_data = None
+        candles = None
         while True:
             try:
                 if ACTIVES not in OP_code.ACTIVES:
                     print('Asset {} not found on consts'.format(ACTIVES))
                     break
-                self.api.getcandles(
+                request = self.api.getcandles(
                     OP_code.ACTIVES[ACTIVES], interval, count, endtime)
-                while self.check_connect and self.api.candles.candles_data == None:
-                    pass
-                if self.api.candles.candles_data != None:
+                if self.wait_request(request, "get_candles"):
+                    # read the reply of this request, candles_data is shared
+                    # by every request in flight
+                    candles = request.result["msg"].get("candles")
+                if candles != None:
                     break
             except:
                 logging.error('**error** get_candles need reconnect')
                 self.connect()
 
-        return self.api.candles.candles_data
+        return candles
+
+    def get_candles_many(self, ACTIVES, interval, count, endtime, from_store=False):
+        """Get candles of several actives in one round trip.
+
+        All requests are sent before waiting, replies are matched by request_id.
+
+        :param list ACTIVES: The active names, keys of constants.ACTIVES.
+        :param bool from_store: (optional) Serve from the candle archive and
+            only ask the server for the ranges it misses, see set_candle_store.
+
+        :returns: dict active name -> list of candles, None for actives
+            without reply in request_timeout or not found on consts.
+        """
+        if from_store and self.candle_store != None and interval <= 86400:
+            return self.__get_candles_from_store(ACTIVES, interval, count, endtime)
+        while True:
+            requests = {}
+            try:
+                for active in ACTIVES:
+                    if active not in OP_code.ACTIVES:
+                        print('Asset {} not found on consts'.format(active))
+                        continue
+                    requests[active] = self.api.getcandles(
+                        OP_code.ACTIVES[active], interval, count, endtime)
+                break
+            except:
+                # the futures sent so far belong to the replaced connection,
+                # ask again for every active on the new one
+                logging.error('**error** get_candles_many need reconnect')
+                self.connect()
+
+        candles = dict.fromkeys(ACTIVES)
+        deadline = time.time() + self.request_timeout
+        for active, request in requests.items():
+            if self.wait_request(request, "get_candles_many", max(0, deadline - time.time())):
+                candles[active] = request.result["msg"].get("candles")
+        return candles
+
+    def __get_candles_from_store(self, ACTIVES, interval, count, endtime):
+        # candles up to a day long start on multiples of their size, so the
+        # wanted "from" range is known without asking the server
+        last = int(endtime) - int(endtime) % interval
+        first = last - (count - 1) * interval
+        now = int(self.api.timesync.server_timestamp or time.time())
+        # the open candle is archived but never marked synced, so it is
+        # asked for again on the next call
+        closed = now - now % interval - interval
+
+        requests = []
+        for active in ACTIVES:
+            if active not in OP_code.ACTIVES:
+                print('Asset {} not found on consts'.format(active))
+                continue
+            for start, end in self.candle_store.missing(active, interval, first, last):
+                while start <= end:
+                    # the server answers at most 1000 candles per request
+                    chunk_end = min(end, start + 999 * interval)
+                    try:
+                        request = self.api.getcandles(
+                            OP_code.ACTIVES[active], interval,
+                            (chunk_end - start) // interval + 1, chunk_end)
+                    except:
+                        logging.error('**error** get_candles need reconnect')
+                        self.connect()
+                        break
+                    requests.append((active, start, chunk_end, request))
+                    start = chunk_end + interval
+
+        deadline = time.time() + self.request_timeout
+        for active, start, end, request in requests:
+            if self.wait_request(request, "get_candles", max(0, deadline - time.time())):
+                candles = request.result["msg"].get("candles")
+                if candles != None:
+                    self.candle_store.put(
+                        active, interval, candles, start, min(end, closed))
+
+        # like get_candles, answer the last count candles the server has up
+        # to endtime: a window spanning a market closure holds fewer, so
+        # step back over the candles still missing until there are count
+        candles = dict.fromkeys(ACTIVES)
+        starts = dict((active, first) for active in ACTIVES if active in OP_code.ACTIVES)
+        while starts:
+            requests = []
+            for active, start in list(starts.items()):
+                stored = self.candle_store.get(active, interval, start, last)
+                candles[active] = stored[-count:] or None
+                if len(stored) >= count:
+                    del starts[active]
+                    continue
+                need = count - len(stored)
+                end = start - interval
+                begin = end - (need - 1) * interval
+                if not self.candle_store.missing(active, interval, begin, end):
+                    # synced already, its holes are closures too
+                    starts[active] = begin
+                    continue
+                try:
+                    request = self.api.getcandles(
+                        OP_code.ACTIVES[active], interval, need, end)
+                except:
+                    logging.error('**error** get_candles need reconnect')
+                    self.connect()
+                    del starts[active]
+                    continue
+                requests.append((active, end, request))
+
+            deadline = time.time() + self.request_timeout
+            for active, end, request in requests:
+                older = None
+                if self.wait_request(request, "get_candles", max(0, deadline - time.time())):
+                    older = request.result["msg"].get("candles")
+                if not older:
+                    # no reply, or nothing older on the server
+                    del starts[active]
+                    continue
+                # the server skips closures: everything from its first candle
+                # to end is synced
+                begin = min(candle["from"] for candle in older)
+                self.candle_store.put(
+                    active, interval, older, begin, min(end, closed))
+                starts[active] = begin
+        return candles
 
     #######################################################
     # ______________________________________________________
@@ -581,6 +748,28 @@ class IQ_Option:
     def get_all_realtime_candles(self):
         return self.api.real_time_candles
 
+    def on_candle(self, ACTIVE, size, callback):
+        """Call callback(active, size, candle) on every update of a candle stream.
+
+        Callbacks run on the callback pool, in order per active.
+        """
+        callbacks = self.api.candle_callbacks.setdefault((str(ACTIVE), int(size)), [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+
+    def on_candle_close(self, ACTIVE, size, callback):
+        """Call callback(active, size, candle) with the last update of each closed candle."""
+        callbacks = self.api.candle_close_callbacks.setdefault((str(ACTIVE), int(size)), [])
+        if callback not in callbacks:
+            callbacks.append(callback)
+
+    def remove_candle_callback(self, ACTIVE, size, callback):
+        for table in (self.api.candle_callbacks, self.api.candle_close_callbacks):
+            try:
+                table[(str(ACTIVE), int(size))].remove(callback)
+            except (KeyError, ValueError):
+                pass
+
     ################################################
     # ---------REAL TIME CANDLE Subset Function---------
     ################################################
@@ -591,7 +780,7 @@ class IQ_Option:
             ACTIVE, size, maxdict, self.api.timesync.server_timestamp)
         for can in candles:
             self.api.real_time_candles[str(
-                ACTIVE)][int(size)][can["from"]] = can
+                ACTIVE)][int(size)].add(can["from"], can, maxdict)
 
     # ------------------------Subscribe ONE SIZE-----------------------
     def start_candles_one_stream(self, ACTIVE, size):
@@ -731,9 +920,8 @@ class IQ_Option:
     def get_technical_indicators(self, ACTIVES):
         request_id = self.api.get_Technical_indicators(
             OP_code.ACTIVES[ACTIVES])
-        while self.api.technical_indicators.get(request_id) == None:
-            pass
-        return self.api.technical_indicators[request_id]
+        self.wait_request(request_id, "get_technical_indicators")
+        return self.api.technical_indicators.get(request_id)
 
 ##############################################################################################
 
@@ -741,8 +929,7 @@ class IQ_Option:
 ##############################################################################################
 
     def check_binary_order(self, order_id):
-        while order_id not in self.api.order_binary:
-            pass
+        self.wait_pushed(lambda: order_id in self.api.order_binary)
         your_order = self.api.order_binary[order_id]
         del self.api.order_binary[order_id]
         return your_order
@@ -821,17 +1008,15 @@ class IQ_Option:
 
     def get_optioninfo(self, limit):
         self.api.api_game_getoptions_result = None
-        self.api.get_options(limit)
-        while self.api.api_game_getoptions_result == None:
-            pass
+        request = self.api.get_options(limit)
+        self.wait_request(request, "get_optioninfo")
 
         return self.api.api_game_getoptions_result
 
     def get_optioninfo_v2(self, limit):
         self.api.get_options_v2_data = None
-        self.api.get_options_v2(limit, "binary,turbo")
-        while self.api.get_options_v2_data == None:
-            pass
+        request = self.api.get_options_v2(limit, "binary,turbo")
+        self.wait_request(request, "get_optioninfo_v2")
 
         return self.api.get_options_v2_data
 
@@ -843,11 +1028,13 @@ class IQ_Option:
         self.api.buy_multi_option = {}
         if len(price) == len(ACTIVES) == len(ACTION) == len(expirations):
             buy_len = len(price)
+            requests = []
             for idx in range(buy_len):
-                self.api.buyv3(
-                    price[idx], OP_code.ACTIVES[ACTIVES[idx]], ACTION[idx], expirations[idx], idx)
-            while len(self.api.buy_multi_option) < buy_len:
-                pass
+                with self.api.order_latency.tracing("binary", ACTIVES[idx]):
+                    requests.append(self.api.buyv3(
+                        price[idx], OP_code.ACTIVES[ACTIVES[idx]], ACTION[idx], expirations[idx], idx))
+            for request in requests:
+                self.wait_request(request, "buy_multi")
             buy_id = []
             for key in sorted(self.api.buy_multi_option.keys()):
                 try:
@@ -860,6 +1047,13 @@ class IQ_Option:
         else:
             logging.error('buy_multi error please input all same len')
 
+    def get_order_latency(self, percentiles=(50, 99, 99.9)):
+        """Get the order placement latency per stage, see iqoptionapi.latency.
+
+        :returns: dict (order type, active) -> stage -> percentiles in seconds.
+        """
+        return self.api.order_latency.percentiles(percentiles)
+
     def get_remaning(self, duration):
         for remaning in get_remaning_time(self.api.timesync.server_timestamp):
             if remaning[0] == duration:
@@ -876,28 +1070,18 @@ class IQ_Option:
             self.api.buy_multi_option[req_id]["id"] = None
         except:
             pass
-        self.api.buyv3_by_raw_expired(
-            price, OP_code.ACTIVES[active], direction, option, expired, request_id=req_id)
-        start_t = time.time()
-        id = None
         self.api.result = None
-        while self.api.result == None or id == None:
-            try:
-                if "message" in self.api.buy_multi_option[req_id].keys():
-                    logging.error(
-                        '**warning** buy' + str(self.api.buy_multi_option[req_id]["message"]))
-                    return False, self.api.buy_multi_option[req_id]["message"]
-            except:
-                pass
-            try:
-                id = self.api.buy_multi_option[req_id]["id"]
-            except:
-                pass
-            if time.time() - start_t >= 5:
-                logging.error('**warning** buy late 5 sec')
-                return False, None
+        with self.api.order_latency.tracing("binary", active):
+            request = self.api.buyv3_by_raw_expired(
+                price, OP_code.ACTIVES[active], direction, option, expired, request_id=req_id)
+        if not self.wait_request(request, "buy", 5):
+            return False, None
+        if "message" in self.api.buy_multi_option[req_id].keys():
+            logging.error(
+                '**warning** buy' + str(self.api.buy_multi_option[req_id]["message"]))
+            return False, self.api.buy_multi_option[req_id]["message"]
 
-        return self.api.result, self.api.buy_multi_option[req_id]["id"]
+        return self.api.result, self.api.buy_multi_option[req_id].get("id")
 
     def buy(self, price, ACTIVES, ACTION, expirations):
         self.api.buy_multi_option = {}
@@ -908,39 +1092,27 @@ class IQ_Option:
             self.api.buy_multi_option[req_id]["id"] = None
         except:
             pass
-        self.api.buyv3(
-            float(price), OP_code.ACTIVES[ACTIVES], str(ACTION), int(expirations), req_id)
-        start_t = time.time()
-        id = None
         self.api.result = None
-        while self.api.result == None or id == None:
-            try:
-                if "message" in self.api.buy_multi_option[req_id].keys():
-                    return False, self.api.buy_multi_option[req_id]["message"]
-            except:
-                pass
-            try:
-                id = self.api.buy_multi_option[req_id]["id"]
-            except:
-                pass
-            if time.time() - start_t >= 5:
-                logging.error('**warning** buy late 5 sec')
-                return False, None
+        with self.api.order_latency.tracing("binary", ACTIVES):
+            request = self.api.buyv3(
+                float(price), OP_code.ACTIVES[ACTIVES], str(ACTION), int(expirations), req_id)
+        if not self.wait_request(request, "buy", 5):
+            return False, None
+        if "message" in self.api.buy_multi_option[req_id].keys():
+            return False, self.api.buy_multi_option[req_id]["message"]
 
-        return self.api.result, self.api.buy_multi_option[req_id]["id"]
+        return self.api.result, self.api.buy_multi_option[req_id].get("id")
 
     def sell_option(self, options_ids):
-        self.api.sell_option(options_ids)
         self.api.sold_options_respond = None
-        while self.api.sold_options_respond == None:
-            pass
+        request = self.api.sell_option(options_ids)
+        self.wait_request(request, "sell_option")
         return self.api.sold_options_respond
 
     def sell_digital_option(self, options_ids):
-        self.api.sell_digital_option(options_ids)
         self.api.sold_digital_options_respond = None
-        while self.api.sold_digital_options_respond == None:
-            pass
+        request = self.api.sell_digital_option(options_ids)
+        self.wait_request(request, "sell_digital_option")
         return self.api.sold_digital_options_respond
 # __________________for Digital___________________
 
@@ -958,10 +1130,9 @@ class IQ_Option:
 
     def get_strike_list(self, ACTIVES, duration):
         self.api.strike_list = None
-        self.api.get_strike_list(ACTIVES, duration)
+        request = self.api.get_strike_list(ACTIVES, duration)
         ans = {}
-        while self.api.strike_list == None:
-            pass
+        self.wait_request(request, "get_strike_list")
         try:
             for data in self.api.strike_list["msg"]["strike"]:
                 temp = {}
@@ -983,8 +1154,8 @@ class IQ_Option:
             ACTIVE, expiration_period)
 
     def get_instrument_quites_generated_data(self, ACTIVE, duration):
-        while self.api.instrument_quotes_generated_raw_data[ACTIVE][duration * 60] == {}:
-            pass
+        self.wait_pushed(
+            lambda: self.api.instrument_quotes_generated_raw_data[ACTIVE][duration * 60] != {})
         return self.api.instrument_quotes_generated_raw_data[ACTIVE][duration * 60]
 
     def get_realtime_strike_list(self, ACTIVE, duration):
@@ -1046,29 +1217,29 @@ class IQ_Option:
         else:
             logging.error('buy_digital_spot active error')
             return -1, None
-        # doEURUSD201907191250PT5MPSPT
-        timestamp = int(self.api.timesync.server_timestamp)
-        if duration == 1:
-            exp, _ = get_expiration_time(timestamp, duration)
-        else:
-            now_date = datetime.fromtimestamp(
-                timestamp) + timedelta(minutes=1, seconds=30)
-            while True:
-                if now_date.minute % duration == 0 and time.mktime(now_date.timetuple()) - timestamp > 30:
-                    break
-                now_date = now_date + timedelta(minutes=1)
-            exp = time.mktime(now_date.timetuple())
+        with self.api.order_latency.tracing("digital", active):
+            # doEURUSD201907191250PT5MPSPT
+            timestamp = int(self.api.timesync.server_timestamp)
+            if duration == 1:
+                exp, _ = get_expiration_time(timestamp, duration)
+            else:
+                now_date = datetime.fromtimestamp(
+                    timestamp) + timedelta(minutes=1, seconds=30)
+                while True:
+                    if now_date.minute % duration == 0 and time.mktime(now_date.timetuple()) - timestamp > 30:
+                        break
+                    now_date = now_date + timedelta(minutes=1)
+                exp = time.mktime(now_date.timetuple())
 
-        dateFormated = str(datetime.utcfromtimestamp(
-            exp).strftime("%Y%m%d%H%M"))
-        instrument_id = "do" + active + dateFormated + \
-                        "PT" + str(duration) + "M" + action + "SPT"
-        # self.api.digital_option_placed_id = None
+            dateFormated = str(datetime.utcfromtimestamp(
+                exp).strftime("%Y%m%d%H%M"))
+            instrument_id = "do" + active + dateFormated + \
+                            "PT" + str(duration) + "M" + action + "SPT"
+            # self.api.digital_option_placed_id = None
 
-        request_id = self.api.place_digital_option(instrument_id, amount)
+            request_id = self.api.place_digital_option(instrument_id, amount)
 
-        while self.api.digital_option_placed_id.get(request_id) == None:
-            pass
+        self.wait_request(request_id, "buy_digital_spot")
         digital_order_id = self.api.digital_option_placed_id.get(request_id)
         if isinstance(digital_order_id, int):
             return True, digital_order_id
@@ -1176,14 +1347,10 @@ class IQ_Option:
             return None
 
     def buy_digital(self, amount, instrument_id):
-        self.api.digital_option_placed_id = None
-        self.api.place_digital_option(instrument_id, amount)
-        start_t = time.time()
-        while self.api.digital_option_placed_id == None:
-            if time.time() - start_t > 30:
-                logging.error('buy_digital loss digital_option_placed_id')
-                return False, None
-        return True, self.api.digital_option_placed_id
+        request_id = self.api.place_digital_option(instrument_id, amount)
+        if not self.wait_request(request_id, "buy_digital"):
+            return False, None
+        return True, self.api.digital_option_placed_id.get(request_id)
 
     def close_digital_option(self, position_id):
         self.api.result = None
@@ -1191,9 +1358,8 @@ class IQ_Option:
             pass
         position_changed = self.get_async_order(
             position_id)["position-changed"]["msg"]
-        self.api.close_digital_option(position_changed["external_id"])
-        while self.api.result == None:
-            pass
+        request = self.api.close_digital_option(position_changed["external_id"])
+        self.wait_request(request, "close_digital_option")
         return self.api.result
 
     def check_win_digital(self, buy_order_id, polling_time):
@@ -1238,18 +1404,19 @@ class IQ_Option:
                   use_trail_stop=False, auto_margin_call=False,
                   use_token_for_commission=False):
         self.api.buy_order_id = None
-        self.api.buy_order(
-            instrument_type=instrument_type, instrument_id=instrument_id,
-            side=side, amount=amount, leverage=leverage,
-            type=type, limit_price=limit_price, stop_price=stop_price,
-            stop_lose_value=stop_lose_value, stop_lose_kind=stop_lose_kind,
-            take_profit_value=take_profit_value, take_profit_kind=take_profit_kind,
-            use_trail_stop=use_trail_stop, auto_margin_call=auto_margin_call,
-            use_token_for_commission=use_token_for_commission
-        )
-
-        while self.api.buy_order_id == None:
-            pass
+        with self.api.order_latency.tracing(instrument_type, instrument_id):
+            request = self.api.buy_order(
+                instrument_type=instrument_type, instrument_id=instrument_id,
+                side=side, amount=amount, leverage=leverage,
+                type=type, limit_price=limit_price, stop_price=stop_price,
+                stop_lose_value=stop_lose_value, stop_lose_kind=stop_lose_kind,
+                take_profit_value=take_profit_value, take_profit_kind=take_profit_kind,
+                use_trail_stop=use_trail_stop, auto_margin_call=auto_margin_call,
+                use_token_for_commission=use_token_for_commission
+            )
+
+        if not self.wait_request(request, "buy_order"):
+            return False, None
         check, data = self.get_order(self.api.buy_order_id)
         while data["status"] == "pending_new":
             check, data = self.get_order(self.api.buy_order_id)
@@ -1266,9 +1433,9 @@ class IQ_Option:
 
     def change_auto_margin_call(self, ID_Name, ID, auto_margin_call):
         self.api.auto_margin_call_changed_respond = None
-        self.api.change_auto_margin_call(ID_Name, ID, auto_margin_call)
-        while self.api.auto_margin_call_changed_respond == None:
-            pass
+        request = self.api.change_auto_margin_call(ID_Name, ID, auto_margin_call)
+        if not self.wait_request(request, "change_auto_margin_call"):
+            return False, None
         if self.api.auto_margin_call_changed_respond["status"] == 2000:
             return True, self.api.auto_margin_call_changed_respond
         else:
@@ -1290,15 +1457,15 @@ class IQ_Option:
 
         if check:
             self.api.tpsl_changed_respond = None
-            self.api.change_order(
+            request = self.api.change_order(
                 ID_Name=ID_Name, ID=ID,
                 stop_lose_kind=stop_lose_kind, stop_lose_value=stop_lose_value,
                 take_profit_kind=take_profit_kind, take_profit_value=take_profit_value,
                 use_trail_stop=use_trail_stop)
             self.change_auto_margin_call(
                 ID_Name=ID_Name, ID=ID, auto_margin_call=auto_margin_call)
-            while self.api.tpsl_changed_respond == None:
-                pass
+            if not self.wait_request(request, "change_order"):
+                return False, None
             if self.api.tpsl_changed_respond["status"] == 2000:
                 return True, self.api.tpsl_changed_respond["msg"]
             else:
@@ -1318,9 +1485,9 @@ class IQ_Option:
         # filled:this order is ok now
         # new
         self.api.order_data = None
-        self.api.get_order(buy_order_id)
-        while self.api.order_data == None:
-            pass
+        request = self.api.get_order(buy_order_id)
+        if not self.wait_request(request, "get_order"):
+            return False, None
         if self.api.order_data["status"] == 2000:
             return True, self.api.order_data["msg"]
         else:
@@ -1328,9 +1495,9 @@ class IQ_Option:
 
     def get_pending(self, instrument_type):
         self.api.deferred_orders = None
-        self.api.get_pending(instrument_type)
-        while self.api.deferred_orders == None:
-            pass
+        request = self.api.get_pending(instrument_type)
+        if not self.wait_request(request, "get_pending"):
+            return False, None
         if self.api.deferred_orders["status"] == 2000:
             return True, self.api.deferred_orders["msg"]
         else:
@@ -1339,9 +1506,9 @@ class IQ_Option:
     # this function is heavy
     def get_positions(self, instrument_type):
         self.api.positions = None
-        self.api.get_positions(instrument_type)
-        while self.api.positions == None:
-            pass
+        request = self.api.get_positions(instrument_type)
+        if not self.wait_request(request, "get_positions"):
+            return False, None
         if self.api.positions["status"] == 2000:
             return True, self.api.positions["msg"]
         else:
@@ -1351,9 +1518,9 @@ class IQ_Option:
         self.api.position = None
         check, order_data = self.get_order(buy_order_id)
         position_id = order_data["position_id"]
-        self.api.get_position(position_id)
-        while self.api.position == None:
-            pass
+        request = self.api.get_position(position_id)
+        if not self.wait_request(request, "get_position"):
+            return False, None
         if self.api.position["status"] == 2000:
             return True, self.api.position["msg"]
         else:
@@ -1363,9 +1530,8 @@ class IQ_Option:
 
     def get_digital_position_by_position_id(self, position_id):
         self.api.position = None
-        self.api.get_digital_position(position_id)
-        while self.api.position == None:
-            pass
+        request = self.api.get_digital_position(position_id)
+        self.wait_request(request, "get_digital_position_by_position_id")
         return self.api.position
 
     def get_digital_position(self, order_id):
@@ -1374,16 +1540,15 @@ class IQ_Option:
             pass
         position_id = self.get_async_order(
             order_id)["position-changed"]["msg"]["external_id"]
-        self.api.get_digital_position(position_id)
-        while self.api.position == None:
-            pass
+        request = self.api.get_digital_position(position_id)
+        self.wait_request(request, "get_digital_position")
         return self.api.position
 
     def get_position_history(self, instrument_type):
         self.api.position_history = None
-        self.api.get_position_history(instrument_type)
-        while self.api.position_history == None:
-            pass
+        request = self.api.get_position_history(instrument_type)
+        if not self.wait_request(request, "get_position_history"):
+            return False, None
 
         if self.api.position_history["status"] == 2000:
             return True, self.api.position_history["msg"]
@@ -1393,10 +1558,10 @@ class IQ_Option:
     def get_position_history_v2(self, instrument_type, limit, offset, start, end):
         # instrument_type=crypto forex fx-option multi-option cfd digital-option turbo-option
         self.api.position_history_v2 = None
-        self.api.get_position_history_v2(
+        request = self.api.get_position_history_v2(
             instrument_type, limit, offset, start, end)
-        while self.api.position_history_v2 == None:
-            pass
+        if not self.wait_request(request, "get_position_history_v2"):
+            return False, None
 
         if self.api.position_history_v2["status"] == 2000:
             return True, self.api.position_history_v2["msg"]
@@ -1406,12 +1571,12 @@ class IQ_Option:
     def get_available_leverages(self, instrument_type, actives=""):
         self.api.available_leverages = None
         if actives == "":
-            self.api.get_available_leverages(instrument_type, "")
+            request = self.api.get_available_leverages(instrument_type, "")
         else:
-            self.api.get_available_leverages(
+            request = self.api.get_available_leverages(
                 instrument_type, OP_code.ACTIVES[actives])
-        while self.api.available_leverages == None:
-            pass
+        if not self.wait_request(request, "get_available_leverages"):
+            return False, None
         if self.api.available_leverages["status"] == 2000:
             return True, self.api.available_leverages["msg"]
         else:
@@ -1419,9 +1584,9 @@ class IQ_Option:
 
     def cancel_order(self, buy_order_id):
         self.api.order_canceled = None
-        self.api.cancel_order(buy_order_id)
-        while self.api.order_canceled == None:
-            pass
+        request = self.api.cancel_order(buy_order_id)
+        if not self.wait_request(request, "cancel_order"):
+            return False
         if self.api.order_canceled["status"] == 2000:
             return True
         else:
@@ -1431,9 +1596,9 @@ class IQ_Option:
         check, data = self.get_order(position_id)
         if data["position_id"] != None:
             self.api.close_position_data = None
-            self.api.close_position(data["position_id"])
-            while self.api.close_position_data == None:
-                pass
+            request = self.api.close_position(data["position_id"])
+            if not self.wait_request(request, "close_position"):
+                return False
             if self.api.close_position_data["status"] == 2000:
                 return True
             else:
@@ -1445,9 +1610,10 @@ class IQ_Option:
         while self.get_async_order(position_id) == None:
             pass
         position_changed = self.get_async_order(position_id)
-        self.api.close_position(position_changed["id"])
-        while self.api.close_position_data == None:
-            pass
+        self.api.close_position_data = None
+        request = self.api.close_position(position_changed["id"])
+        if not self.wait_request(request, "close_position_v2"):
+            return False
         if self.api.close_position_data["status"] == 2000:
             return True
         else:
@@ -1455,9 +1621,9 @@ class IQ_Option:
 
     def get_overnight_fee(self, instrument_type, active):
         self.api.overnight_fee = None
-        self.api.get_overnight_fee(instrument_type, OP_code.ACTIVES[active])
-        while self.api.overnight_fee == None:
-            pass
+        request = self.api.get_overnight_fee(instrument_type, OP_code.ACTIVES[active])
+        if not self.wait_request(request, "get_overnight_fee"):
+            return False, None
         if self.api.overnight_fee["status"] == 2000:
             return True, self.api.overnight_fee["msg"]
         else:
@@ -1472,7 +1638,7 @@ class IQ_Option:
     # -----------------------------------------------------------------
 
     def opcode_to_name(self, opcode):
-        return list(OP_code.ACTIVES.keys())[list(OP_code.ACTIVES.values()).index(opcode)]
+        return OP_code.get_active_name(opcode)
 
     # name:
     # "live-deal-binary-option-placed"
@@ -1500,12 +1666,26 @@ class IQ_Option:
             time.sleep(1)
         """
 
+    def set_live_deal_cb(self, cb):
+        self.api.live_deal_cb = cb
+
     def set_digital_live_deal_cb(self, cb):
         self.api.digital_live_deal_cb = cb
 
     def set_binary_live_deal_cb(self, cb):
         self.api.binary_live_deal_cb = cb
 
+    def set_callback_executor(self, workers=4, queue_size=1000, overflow="drop_oldest", late_after=1.0):
+        # pool running the live deal callbacks, see iqoptionapi.callback_executor
+        previous = self.api.callback_executor
+        self.api.callback_executor = CallbackExecutor(
+            workers, queue_size, overflow, late_after)
+        # its workers finish the callbacks already queued, then exit
+        previous.shutdown(wait=False)
+
+    def get_callback_stats(self):
+        return self.api.callback_executor.stats()
+
     def get_live_deal(self, name, active, _type):
         return self.api.live_deal_data[name][active][_type]
 
@@ -1518,9 +1698,8 @@ class IQ_Option:
 
     def get_user_profile_client(self, user_id):
         self.api.user_profile_client = None
-        self.api.Get_User_Profile_Client(user_id)
-        while self.api.user_profile_client == None:
-            pass
+        request = self.api.Get_User_Profile_Client(user_id)
+        self.wait_request(request, "get_user_profile_client")
 
         return self.api.user_profile_client
 
@@ -1575,33 +1754,32 @@ class IQ_Option:
         else:
             logging.error('buy_digital_spot_v2 active error')
             return -1, None
+        with self.api.order_latency.tracing("digital", active):
+            timestamp = int(self.api.timesync.server_timestamp)
 
-        timestamp = int(self.api.timesync.server_timestamp)
-
-        if duration == 1:
-            exp, _ = get_expiration_time(timestamp, duration)
-        else:
-            now_date = datetime.fromtimestamp(
-                timestamp) + timedelta(minutes=1, seconds=30)
+            if duration == 1:
+                exp, _ = get_expiration_time(timestamp, duration)
+            else:
+                now_date = datetime.fromtimestamp(
+                    timestamp) + timedelta(minutes=1, seconds=30)
 
-            while True:
-                if now_date.minute % duration == 0 and time.mktime(now_date.timetuple()) - timestamp > 30:
-                    break
-                now_date = now_date + timedelta(minutes=1)
+                while True:
+                    if now_date.minute % duration == 0 and time.mktime(now_date.timetuple()) - timestamp > 30:
+                        break
+                    now_date = now_date + timedelta(minutes=1)
 
-            exp = time.mktime(now_date.timetuple())
+                exp = time.mktime(now_date.timetuple())
 
-        date_formated = str(datetime.utcfromtimestamp(exp).strftime("%Y%m%d%H%M"))
-        active_id = str(OP_code.ACTIVES[active])
-        instrument_id = "do" + active_id + "A" + \
-            date_formated[:8] + "D" + date_formated[8:] + \
-            "00T" + str(duration) + "M" + action + "SPT"
-        logger = logging.getLogger(__name__)
-        logger.info(instrument_id)
-        request_id = self.api.place_digital_option_v2(instrument_id, active_id, amount)
+            date_formated = str(datetime.utcfromtimestamp(exp).strftime("%Y%m%d%H%M"))
+            active_id = str(OP_code.ACTIVES[active])
+            instrument_id = "do" + active_id + "A" + \
+                date_formated[:8] + "D" + date_formated[8:] + \
+                "00T" + str(duration) + "M" + action + "SPT"
+            logger = logging.getLogger(__name__)
+            logger.info(instrument_id)
+            request_id = self.api.place_digital_option_v2(instrument_id, active_id, amount)
 
-        while self.api.digital_option_placed_id.get(request_id) is None:
-            pass
+        self.wait_request(request_id, "buy_digital_spot_v2")
 
         digital_order_id = self.api.digital_option_placed_id.get(request_id)
         if isinstance(digital_order_id, int):
@@ -13,4 +13,4 @@ class Game_betinfo(Base):
             logging.error('**error** Game_betinfo can not input None type,please input buy id')
         else :
               data["id[0]"]=int(id_number_list)   
-        self.send_websocket_request(self.name, data)
\ No newline at end of file
+        return self.send_websocket_request(self.name, data)
\ No newline at end of file
@@ -12,14 +12,15 @@ class Base(object):
         """
         self.api = api
 
-    def send_websocket_request(self, name, msg,request_id=""):
+    def send_websocket_request(self, name, msg,request_id="", expect=None):
         """Send request to IQ Option server websocket.
 
         :param str name: The websocket chanel name.
         :param dict msg: The websocket chanel msg.
+        :param tuple expect: (optional) The reply names the request waits for.
 
         :returns: The instance of :class:`requests.Response`.
         """
         if request_id == '':
-            request_id = int(str(time.time()).split('.')[1])
-        return self.api.send_websocket_request(name, msg,request_id)
+            request_id = self.api.new_request_id()
+        return self.api.send_websocket_request(name, msg,request_id, expect)
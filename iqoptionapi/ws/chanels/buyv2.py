@@ -1,6 +1,5 @@
 """Module for IQ Option buyV2 websocket chanel."""
 from datetime import datetime, timedelta
-import iqoptionapi.global_value as global_value
 from iqoptionapi.ws.chanels.base import Base
 from iqoptionapi.expiration import get_expiration_time
 
@@ -32,8 +31,8 @@ class Buyv2(Base):
             "exp": int(exp),
             "type": option,
             "direction": direction.lower(),
-            "user_balance_id": int(global_value.balance_id),
+            "user_balance_id": int(self.api.balance_id),
             "time": self.api.timesync.server_timestamp
         }
 
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
@@ -2,7 +2,6 @@ import datetime
 import time
 from iqoptionapi.ws.chanels.base import Base
 import logging
-import iqoptionapi.global_value as global_value
 from iqoptionapi.expiration import get_expiration_time
 
 
@@ -26,12 +25,13 @@ class Buyv3(Base):
                      "expired": int(exp),
                      "direction": direction.lower(),
                      "option_type_id": option,
-                     "user_balance_id": int(global_value.balance_id)
+                     "user_balance_id": int(self.api.balance_id)
                      },
             "name": "binary-options.open-option",
             "version": "1.0"
         }
-        self.send_websocket_request(self.name, data, str(request_id))
+        # answered by a "result" and an "option" frame with the same request_id
+        return self.send_websocket_request(self.name, data, str(request_id), expect=("option", "result"))
 
 
 class Buyv3_by_raw_expired(Base):
@@ -53,12 +53,13 @@ class Buyv3_by_raw_expired(Base):
                      "expired": int(expired),
                      "direction": direction.lower(),
                      "option_type_id": option_id,
-                     "user_balance_id": int(global_value.balance_id)
+                     "user_balance_id": int(self.api.balance_id)
                      },
             "name": "binary-options.open-option",
             "version": "1.0"
         }
-        self.send_websocket_request(self.name, data, str(request_id))
+        # answered by a "result" and an "option" frame with the same request_id
+        return self.send_websocket_request(self.name, data, str(request_id), expect=("option", "result"))
 
 
 """
@@ -13,5 +13,5 @@ class Cancel_order(Base):
                 "order_id":order_id
                 }
         }
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
  
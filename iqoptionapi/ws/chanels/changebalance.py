@@ -22,4 +22,4 @@ class Changebalance(Base):
             "balance_id":balance_id
         }
 
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
@@ -13,5 +13,5 @@ class Close_position(Base):
                 "position_id":position_id
                 }
         }
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
  
@@ -3,7 +3,6 @@
 import datetime
 import time
 from iqoptionapi.ws.chanels.base import Base
-import iqoptionapi.global_value as global_value
 from random import randint
 # work for forex digit cfd(stock)
 
@@ -19,7 +18,7 @@ class Digital_options_place_digital_option(Base):
             "name": "digital-options.place-digital-option",
             "version": "1.0",
             "body": {
-                "user_balance_id": int(global_value.balance_id),
+                "user_balance_id": int(self.api.balance_id),
                 "instrument_id": str(instrument_id),
                 "amount": str(amount)
             }
@@ -40,7 +39,7 @@ class Digital_options_close_position(Base):
                 "position_id": int(position_id)
             }
         }
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data, expect=("result",))
 
 
 class DigitalOptionsPlaceDigitalOptionV2(Base):
@@ -55,7 +54,7 @@ class DigitalOptionsPlaceDigitalOptionV2(Base):
                 "asset_id": int(asset_id),
                 "instrument_id": instrument_id,
                 "instrument_index": 0,
-                "user_balance_id": int(global_value.balance_id)
+                "user_balance_id": int(self.api.balance_id)
             }
         }
 
@@ -13,6 +13,6 @@ class GetFinancialInformation(Base):
                 }
             }
         }
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
  
  
\ No newline at end of file
@@ -12,7 +12,7 @@ class Get_order(Base):
                 "order_id":int(order_id)
                 }
         }
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
  
 
 
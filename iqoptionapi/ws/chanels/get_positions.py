@@ -1,7 +1,6 @@
 import datetime
 import time
 from iqoptionapi.ws.chanels.base import Base
-import iqoptionapi.global_value as global_value
 
 class Get_positions(Base):
     name = "sendMessage"
@@ -16,10 +15,10 @@ class Get_positions(Base):
             "name":name ,
             "body":{
                 "instrument_type":instrument_type,
-                "user_balance_id":int(global_value.balance_id)
+                "user_balance_id":int(self.api.balance_id)
                 }
         }
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
 class Get_position(Base):
     name = "sendMessage"
     def __call__(self,position_id):
@@ -29,7 +28,7 @@ class Get_position(Base):
                 "position_id":position_id,
                 }
         }
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
 
 class Get_position_history(Base):
     name = "sendMessage"
@@ -38,10 +37,10 @@ class Get_position_history(Base):
             "name":"get-position-history",
             "body":{
                 "instrument_type":instrument_type,
-                "user_balance_id":int(global_value.balance_id)
+                "user_balance_id":int(self.api.balance_id)
                 }
         }
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
  
 class Get_position_history_v2(Base):
     name = "sendMessage"
@@ -54,10 +53,10 @@ class Get_position_history_v2(Base):
                 "offset":offset,
                 "start":start,
                 "end":end,
-                "user_balance_id":int(global_value.balance_id)
+                "user_balance_id":int(self.api.balance_id)
                 }
         }
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
 
 class Get_digital_position(Base):
     name = "sendMessage"
@@ -68,4 +67,4 @@ class Get_digital_position(Base):
                 "position_id":position_id,
                 }
         }
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
@@ -18,4 +18,4 @@ class Get_instruments(Base):
         "body":{"type":types}
         }
 
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
@@ -27,4 +27,4 @@ class Sell_Digital_Option(Base):
                                 }
                         }
         request_id = int(str(time.time()).split('.')[1])
-        self.send_websocket_request(self.name, data, request_id)
+        return self.send_websocket_request(self.name, data, request_id)
@@ -14,4 +14,4 @@ class Ssid(Base):
 
         :param ssid: The session identifier.
         """
-        self.send_websocket_request(self.name, ssid)
+        return self.send_websocket_request(self.name, ssid)
@@ -23,7 +23,7 @@ class Subscribe(Base):
                 }
                 }
 
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
 
 
 class Subscribe_candles(Base):
@@ -42,7 +42,7 @@ class Subscribe_candles(Base):
                 }
                 }
 
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
 
 
 class Subscribe_Instrument_Quites_Generated(Base):
@@ -61,7 +61,7 @@ class Subscribe_Instrument_Quites_Generated(Base):
             },
             "version": "1.0"
         }
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
 
     def get_digital_expiration_time(self, duration):
         exp = int(self.api.timesync.server_timestamp)
@@ -90,7 +90,7 @@ class Subscribe_top_assets_updated(Base):
                 },
                 "version": "1.2"
                 }
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
 
 
 """
@@ -111,7 +111,7 @@ class Subscribe_commission_changed(Base):
                 },
                 "version": "1.0"
                 }
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
 
 
 class Subscribe_live_deal(Base):
@@ -139,7 +139,7 @@ class Subscribe_live_deal(Base):
                 },
                 "version": "2.0"
                 }
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
 
 
 class SubscribeDigitalPriceSplitter(Base):
@@ -157,4 +157,4 @@ class SubscribeDigitalPriceSplitter(Base):
             }
         }
 
-        self.send_websocket_request(self.name, msg=data)
+        return self.send_websocket_request(self.name, msg=data)
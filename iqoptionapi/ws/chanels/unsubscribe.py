@@ -22,7 +22,7 @@ class Unsubscribe(Base):
                 }
                 }
 
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
 
 
 class Unsubscribe_candles(Base):
@@ -41,7 +41,7 @@ class Unsubscribe_candles(Base):
                 }
                 }
 
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
 
 
 class Unsubscribe_Instrument_Quites_Generated(Base):
@@ -59,7 +59,7 @@ class Unsubscribe_Instrument_Quites_Generated(Base):
             },
             "version": "1.0"
         }
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
 
     def get_digital_expiration_time(self, duration):
         exp = int(self.api.timesync.server_timestamp)
@@ -88,7 +88,7 @@ class Unsubscribe_top_assets_updated(Base):
                 },
                 "version": "1.2"
                 }
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
 
 
 class Unsubscribe_commission_changed(Base):
@@ -103,7 +103,7 @@ class Unsubscribe_commission_changed(Base):
                 },
                 "version": "1.0"
                 }
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
 
 
 class Unscribe_live_deal(Base):
@@ -129,7 +129,7 @@ class Unscribe_live_deal(Base):
         },
             "version": "2.0"
         }
-        self.send_websocket_request(self.name, data)
+        return self.send_websocket_request(self.name, data)
 
 
 class UnsubscribeDigitalPriceSplitter(Base):
@@ -147,4 +147,4 @@ class UnsubscribeDigitalPriceSplitter(Base):
             }
         }
 
-        self.send_websocket_request(self.name, msg=data)
+        return self.send_websocket_request(self.name, msg=data)
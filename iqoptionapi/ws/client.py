@@ -4,7 +4,8 @@ import json
 import logging
 import websocket
 import iqoptionapi.constants as OP_code
-import iqoptionapi.global_value as global_value
+from collections import defaultdict
+from functools import partial
 from threading import Thread
 from iqoptionapi.ws.received.technical_indicators import technical_indicators
 from iqoptionapi.ws.received.time_sync import time_sync
@@ -15,6 +16,7 @@ from iqoptionapi.ws.received.balance_changed import balance_changed
 from iqoptionapi.ws.received.candles import candles
 from iqoptionapi.ws.received.buy_complete import buy_complete
 from iqoptionapi.ws.received.option import option
+from iqoptionapi.ws.received.options import options
 from iqoptionapi.ws.received.position_history import position_history
 from iqoptionapi.ws.received.list_info_data import list_info_data
 from iqoptionapi.ws.received.candle_generated import candle_generated_realtime
@@ -62,9 +64,48 @@ from iqoptionapi.ws.received.client_price_generated import client_price_generate
 from iqoptionapi.ws.received.users_availability import users_availability
 
 
+# fastest decoder installed, stdlib json as fallback
+try:
+    from orjson import loads as json_loads
+    # orjson decodes a whole frame faster than frame_name reads its name
+    # (benchmarks/bench_decode.py), skipping frames would cost more
+    PREFILTER = False
+except ImportError:
+    try:
+        from ujson import loads as json_loads
+    except ImportError:
+        json_loads = json.loads
+    PREFILTER = True
+
+
+def frame_name(message):
+    """Read the top-level "name" of a frame without decoding it.
+
+    :returns: The name, None when it can not be told cheaply (the frame is
+        then decoded in full).
+    """
+    start = message.find('"name"')
+    # an object or array opened before the key may hold another "name"
+    nested = message.find('{', 1)
+    if start < 0 or (0 < nested < start) or 0 < message.find('[', 1) < start:
+        return None
+    start = message.find('"', start + 6)
+    if start < 0 or message[start - 1] not in ': ':
+        return None
+    end = message.find('"', start + 1)
+    if end < 0:
+        return None
+    return message[start + 1:end]
+
+
 class WebsocketClient(object):
     """Class for work with IQ option websocket."""
 
+    # pluggable frame decoder, str -> dict
+    decode = staticmethod(json_loads)
+    # skip frames nobody listens to with frame_name before decoding them
+    prefilter = PREFILTER
+
     def __init__(self, api):
         """
         :param api: The instance of :class:`IQOptionAPI
@@ -75,23 +116,16 @@ class WebsocketClient(object):
             self.api.wss_url, on_message=self.on_message,
             on_error=self.on_error, on_close=self.on_close,
             on_open=self.on_open)
+        # message name -> handlers, so every frame is dispatched once
+        self.handlers = defaultdict(list)
+        self._register_default_handlers()
+        for name, handlers in api.extra_handlers.items():
+            for handler in handlers:
+                self.register_handler(name, handler)
 
     def dict_queue_add(self, dict, maxdict, key1, key2, key3, value):
-        if key3 in dict[key1][key2]:
-            dict[key1][key2][key3] = value
-        else:
-            while True:
-                try:
-                    dic_size = len(dict[key1][key2])
-                except:
-                    dic_size = 0
-                if dic_size < maxdict:
-                    dict[key1][key2][key3] = value
-                    break
-                else:
-                    # del mini key
-                    del dict[key1][key2][sorted(
-                        dict[key1][key2].keys(), reverse=False)[0]]
+        # dict[key1][key2] is a CandleBuffer, it evicts the oldest candle itself
+        dict[key1][key2].add(key3, value, maxdict)
 
     def api_dict_clean(self, obj):
         if len(obj) > 5000:
@@ -99,92 +133,118 @@ class WebsocketClient(object):
                 del obj[k]
                 break
 
+    def register_handler(self, name, handler):
+        """Register a handler for websocket messages with the given name.
+
+        :param str name: The websocket message name, e.g. "candle-generated".
+        :param handler: Callable invoked as ``handler(api, message)``.
+        """
+        if handler not in self.handlers[name]:
+            self.handlers[name].append(handler)
+
+    def unregister_handler(self, name, handler):
+        """Remove a handler previously added with :meth:`register_handler`."""
+        try:
+            self.handlers[name].remove(handler)
+        except ValueError:
+            pass
+
+    def _register_default_handlers(self):
+        self.register_handler("technical-indicators", partial(
+            technical_indicators, api_dict_clean=self.api_dict_clean))
+        self.register_handler("timeSync", time_sync)
+        self.register_handler("heartbeat", heartbeat)
+        self.register_handler("balances", balances)
+        self.register_handler("profile", profile)
+        self.register_handler("balance-changed", balance_changed)
+        self.register_handler("candles", candles)
+        self.register_handler("buyComplete", buy_complete)
+        self.register_handler("option", option)
+        self.register_handler("options", options)
+        self.register_handler("position-history", position_history)
+        self.register_handler("listInfoData", list_info_data)
+        self.register_handler("candle-generated", partial(
+            candle_generated_realtime, dict_queue_add=self.dict_queue_add))
+        self.register_handler("candles-generated", partial(
+            candle_generated_v2, dict_queue_add=self.dict_queue_add))
+        self.register_handler("commission-changed", commission_changed)
+        self.register_handler("socket-option-opened", socket_option_opened)
+        self.register_handler("api_option_init_all_result", api_option_init_all_result)
+        self.register_handler("initialization-data", initialization_data)
+        self.register_handler("underlying-list", underlying_list)
+        self.register_handler("instruments", instruments)
+        self.register_handler("financial-information", financial_information)
+        self.register_handler("position-changed", position_changed)
+        self.register_handler("option-opened", option_opened)
+        self.register_handler("option-closed", option_closed)
+        self.register_handler("top-assets-updated", top_assets_updated)
+        self.register_handler("strike-list", strike_list)
+        self.register_handler("api_game_betinfo_result", api_game_betinfo_result)
+        self.register_handler("traders-mood-changed", traders_mood_changed)
+        # ------for forex&cfd&crypto..
+        self.register_handler("order-placed-temp", order_placed_temp)
+        self.register_handler("order", order)
+        self.register_handler("position", position)
+        self.register_handler("positions", positions)
+        self.register_handler("deferred-orders", deferred_orders)
+        self.register_handler("history-positions", history_positions)
+        self.register_handler("available-leverages", available_leverages)
+        self.register_handler("order-canceled", order_canceled)
+        self.register_handler("position-closed", position_closed)
+        self.register_handler("overnight-fee", overnight_fee)
+        self.register_handler("api_game_getoptions_result", api_game_getoptions_result)
+        self.register_handler("sold-options", sold_options)
+        self.register_handler("tpsl-changed", tpsl_changed)
+        self.register_handler("auto-margin-call-changed", auto_margin_call_changed)
+        self.register_handler("digital-option-placed", partial(
+            digital_option_placed, api_dict_clean=self.api_dict_clean))
+        self.register_handler("result", result)
+        self.register_handler("instrument-quotes-generated", instrument_quotes_generated)
+        self.register_handler("training-balance-reset", training_balance_reset)
+        self.register_handler("socket-option-closed", socket_option_closed)
+        self.register_handler("live-deal-binary-option-placed", live_deal_binary_option_placed)
+        self.register_handler("live-deal-digital-option", live_deal_digital_option)
+        self.register_handler("leaderboard-deals-client", leaderboard_deals_client)
+        self.register_handler("live-deal", live_deal)
+        self.register_handler("user-profile-client", user_profile_client)
+        self.register_handler("leaderboard-userinfo-deals-client", leaderboard_userinfo_deals_client)
+        self.register_handler("users-availability", users_availability)
+        self.register_handler("client-price-generated", client_price_generated)
+
     def on_message(self, message):  # pylint: disable=unused-argument
         """Method to process websocket messages."""
-        global_value.ssl_Mutual_exclusion = True
         logger = logging.getLogger(__name__)
-        logger.debug(message)
-
-        message = json.loads(str(message))
-
-
-        technical_indicators(self.api, message, self.api_dict_clean)
-        time_sync(self.api, message)
-        heartbeat(self.api, message)
-        balances(self.api, message)
-        profile(self.api, message)
-        balance_changed(self.api, message)
-        candles(self.api, message)
-        buy_complete(self.api, message)
-        option(self.api, message)
-        position_history(self.api, message)
-        list_info_data(self.api, message)
-        candle_generated_realtime(self.api, message, self.dict_queue_add)
-        candle_generated_v2(self.api, message, self.dict_queue_add)
-        commission_changed(self.api, message)
-        socket_option_opened(self.api, message)
-        api_option_init_all_result(self.api, message)
-        initialization_data(self.api, message)
-        underlying_list(self.api, message)
-        instruments(self.api, message)
-        financial_information(self.api, message)
-        position_changed(self.api, message)
-        option_opened(self.api, message)
-        option_closed(self.api, message)
-        top_assets_updated(self.api, message)
-        strike_list(self.api, message)
-        api_game_betinfo_result(self.api, message)
-        traders_mood_changed(self.api, message)
-         # ------for forex&cfd&crypto..
-        order_placed_temp(self.api, message)
-        order(self.api, message)
-        position(self.api, message)
-        positions(self.api, message)
-        order_placed_temp(self.api, message)
-        deferred_orders(self.api, message)
-        history_positions(self.api, message)
-        available_leverages(self.api, message)
-        order_canceled(self.api, message)
-        position_closed(self.api, message)
-        overnight_fee(self.api, message)
-        api_game_getoptions_result(self.api, message)
-        sold_options(self.api, message)
-        tpsl_changed(self.api, message)
-        auto_margin_call_changed(self.api, message)
-        digital_option_placed(self.api, message, self.api_dict_clean)
-        result(self.api, message)
-        instrument_quotes_generated(self.api, message)
-        training_balance_reset(self.api, message)
-        socket_option_closed(self.api, message)
-        live_deal_binary_option_placed(self.api, message)
-        live_deal_digital_option(self.api, message)
-        leaderboard_deals_client(self.api, message)
-        live_deal(self.api, message)
-        user_profile_client(self.api, message)
-        leaderboard_userinfo_deals_client(self.api, message)
-        users_availability(self.api, message)
-        client_price_generated(self.api, message)
-
-        global_value.ssl_Mutual_exclusion = False
-
-    @staticmethod
-    def on_error(wss, error):  # pylint: disable=unused-argument
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(message)
+
+        if self.prefilter:
+            if isinstance(message, bytes):
+                message = message.decode("utf-8")
+            name = frame_name(message)
+            if name is not None and not self.handlers.get(name):
+                # nobody listens to this frame type, skip the decode
+                return
+
+        message = self.decode(message)
+
+        for handler in self.handlers.get(message.get("name"), ()):
+            handler(self.api, message)
+
+    def on_error(self, error):  # pylint: disable=unused-argument
         """Method to process websocket errors."""
         logger = logging.getLogger(__name__)
         logger.error(error)
-        global_value.websocket_error_reason = str(error)
-        global_value.check_websocket_if_error = True
+        self.api.websocket_error_reason = str(error)
+        self.api.check_websocket_if_error = True
 
-    @staticmethod
-    def on_open(wss):  # pylint: disable=unused-argument
+    def on_open(self):  # pylint: disable=unused-argument
         """Method to process websocket open."""
         logger = logging.getLogger(__name__)
         logger.debug("Websocket client connected.")
-        global_value.check_websocket_if_connect = 1
+        self.api.check_websocket_if_connect = 1
 
-    @staticmethod
-    def on_close(wss):  # pylint: disable=unused-argument
+    def on_close(self):  # pylint: disable=unused-argument
         """Method to process websocket close."""
         logger = logging.getLogger(__name__)
         logger.debug("Websocket connection closed.")
-        global_value.check_websocket_if_connect = 0
+        self.api.check_websocket_if_connect = 0
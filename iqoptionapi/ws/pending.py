@@ -0,0 +1,146 @@
+"""Module for IQ option websocket request/response correlation."""
+
+import threading
+from collections import OrderedDict
+
+
+class RequestFuture(object):
+    """Class for the pending reply of one websocket request."""
+
+    def __init__(self, request_id, expect=None):
+        """
+        :param str request_id: The request_id the request was sent with.
+        :param tuple expect: (optional) The reply names that complete the
+            request when it is answered by several frames, e.g.
+            ("option", "result"). None completes on the first reply.
+        """
+        self.request_id = request_id
+        self.expect = tuple(expect) if expect else None
+        # the reply, the one of expect[0] when several are expected
+        self.result = None
+        self.replies = {}
+        self.__event = threading.Event()
+        self.__lock = threading.Lock()
+        self.__callbacks = []
+
+    def done(self):
+        """Check if the reply has arrived."""
+        return self.__event.is_set()
+
+    def expects(self, name):
+        """Check if a reply with this name is one the request waits for."""
+        return self.expect is not None and name in self.expect
+
+    def set_result(self, result, final=False):
+        """Method to complete the request, called from ws/received handlers.
+
+        :param result: The reply message.
+        :param bool final: (optional) Complete the request even if other
+            expected replies are missing, e.g. on an error reply.
+        """
+        with self.__lock:
+            if self.__event.is_set():
+                return
+            name = result.get("name") if isinstance(result, dict) else None
+            self.replies[name] = result
+            if self.expect is None:
+                self.result = result
+            else:
+                self.result = self.replies.get(self.expect[0], result)
+                if not final and not all(name in self.replies for name in self.expect):
+                    return
+            self.__event.set()
+            callbacks, self.__callbacks = self.__callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+    def add_done_callback(self, callback):
+        """Call callback(future) once the reply arrives, at once if it already did.
+
+        The callback runs on the websocket thread, it must not block.
+        """
+        with self.__lock:
+            if not self.__event.is_set():
+                self.__callbacks.append(callback)
+                return
+        callback(self)
+
+    def wait(self, timeout=None):
+        """Block until the reply arrives.
+
+        :param timeout: (optional) Max seconds to wait, None waits forever.
+
+        :returns: True if the reply arrived, False on timeout.
+        """
+        return self.__event.wait(timeout)
+
+
+class PendingRequests(object):
+    """Class for websocket requests waiting for a reply, keyed by request_id."""
+
+    # same bound as WebsocketClient.api_dict_clean, replies nobody waits
+    # for (subscribes, unhandled names) are dropped oldest first
+    maxsize = 5000
+
+    def __init__(self):
+        self.__lock = threading.Lock()
+        self.__futures = OrderedDict()
+
+    def register(self, request_id, expect=None):
+        """Create the future for a request about to be sent.
+
+        :param request_id: The request_id of the websocket request.
+        :param tuple expect: (optional) The reply names that complete it,
+            see :class:`RequestFuture`.
+
+        :returns: The instance of :class:`RequestFuture
+            <iqoptionapi.ws.pending.RequestFuture>`.
+        """
+        future = RequestFuture(str(request_id), expect)
+        with self.__lock:
+            self.__futures[future.request_id] = future
+            while len(self.__futures) > self.maxsize:
+                self.__futures.popitem(last=False)
+        return future
+
+    def get(self, request_id):
+        """Get the future of a request, None if unknown or already dropped."""
+        with self.__lock:
+            return self.__futures.get(str(request_id))
+
+    def complete(self, request_id, result, final=False):
+        """Complete the future of a request with its reply.
+
+        :param final: (optional) See :meth:`RequestFuture.set_result`.
+
+        :returns: True if a future was waiting for this request_id.
+        """
+        if request_id is None or request_id == "":
+            return False
+        future = self.get(request_id)
+        if future is None:
+            return False
+        future.set_result(result, final)
+        return True
+
+    def discard(self, request_id):
+        """Forget a request once its caller is done with it."""
+        with self.__lock:
+            self.__futures.pop(str(request_id), None)
+
+    def wait(self, future, timeout=None):
+        """Block on a future and forget it afterwards.
+
+        :param future: The :class:`RequestFuture` or its request_id.
+        :param timeout: (optional) Max seconds to wait, None waits forever.
+
+        :returns: True if the reply arrived, False on timeout.
+        """
+        if not isinstance(future, RequestFuture):
+            future = self.get(future)
+        if future is None:
+            return False
+        try:
+            return future.wait(timeout)
+        finally:
+            self.discard(future.request_id)
@@ -6,4 +6,5 @@ def api_game_betinfo_result(api, message):
             api.game_betinfo.isSuccessful = message["msg"]["isSuccessful"]
             api.game_betinfo.dict = message["msg"]
         except:
-            pass
\ No newline at end of file
+            pass
+        api.pending_requests.complete(message.get("request_id"), message)
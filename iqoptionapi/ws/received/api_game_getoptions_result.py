@@ -2,4 +2,5 @@
 
 def api_game_getoptions_result(api, message):
     if message["name"] == "api_game_getoptions_result":
-        api.api_game_getoptions_result = message
\ No newline at end of file
+        api.api_game_getoptions_result = message
+        api.pending_requests.complete(message.get("request_id"), message)
@@ -2,4 +2,5 @@
 
 def balances(api, message):
     if message["name"] == "balances":
-        api.balances_raw = message
\ No newline at end of file
+        api.balances_raw = message
+        api.pending_requests.complete(message.get("request_id"), message)
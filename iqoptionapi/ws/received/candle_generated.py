@@ -1,11 +1,20 @@
 """Module for IQ option websocket."""
 import iqoptionapi.constants as OP_code
-import iqoptionapi.global_value as global_value
+
+def notify_candle(api, active, size, previous, candle):
+    """Run the on_candle/on_candle_close callbacks of (active, size)."""
+    # "from" rolled over, the previous candle is closed
+    if previous is not None and candle["from"] > previous["from"]:
+        for callback in api.candle_close_callbacks.get((active, size), ()):
+            api.callback_executor.submit(active, callback, active, size, previous)
+    for callback in api.candle_callbacks.get((active, size), ()):
+        api.callback_executor.submit(active, callback, active, size, candle)
 
 def candle_generated_realtime(api, message, dict_queue_add):
     if message["name"] == "candle-generated":
-        Active_name = list(OP_code.ACTIVES.keys())[list(
-            OP_code.ACTIVES.values()).index(message["msg"]["active_id"])]
+        Active_name = OP_code.get_active_name(message["msg"]["active_id"])
+        if Active_name is None:
+            return
 
         active = str(Active_name)
         size = int(message["msg"]["size"])
@@ -13,6 +22,8 @@ def candle_generated_realtime(api, message, dict_queue_add):
         msg = message["msg"]
         maxdict = api.real_time_candles_maxdict_table[Active_name][size]
 
+        previous = api.real_time_candles[active][size].last()
         dict_queue_add(api.real_time_candles,
                             maxdict, active, size, from_, msg)
+        notify_candle(api, active, size, previous, msg)
         api.candle_generated_check[active][size] = True
\ No newline at end of file
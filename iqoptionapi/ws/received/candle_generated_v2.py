@@ -1,9 +1,11 @@
 import iqoptionapi.constants as OP_code
+from iqoptionapi.ws.received.candle_generated import notify_candle
 
 def candle_generated_v2(api, message, dict_queue_add):
     if message["name"] == "candles-generated":
-        Active_name = list(OP_code.ACTIVES.keys())[list(
-                OP_code.ACTIVES.values()).index(message["msg"]["active_id"])]
+        Active_name = OP_code.get_active_name(message["msg"]["active_id"])
+        if Active_name is None:
+            return
         active = str(Active_name)
         for k, v in message["msg"]["candles"].items():
             v["active_id"] = message["msg"]["active_id"]
@@ -16,6 +18,8 @@ def candle_generated_v2(api, message, dict_queue_add):
             from_ = int(v["from"])
             maxdict = api.real_time_candles_maxdict_table[Active_name][size]
             msg = v
+            previous = api.real_time_candles[active][size].last()
             dict_queue_add(api.real_time_candles, maxdict, active, size, from_, msg)
+            notify_candle(api, active, size, previous, msg)
 
         api.candle_generated_all_size_check[active] = True
\ No newline at end of file
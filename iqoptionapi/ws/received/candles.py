@@ -5,4 +5,5 @@ def candles(api, message):
         try:
             api.candles.candles_data = message["msg"]["candles"]
         except:
-            pass
\ No newline at end of file
+            pass
+        api.pending_requests.complete(message.get("request_id"), message)
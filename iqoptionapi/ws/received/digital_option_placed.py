@@ -10,4 +10,5 @@ def digital_option_placed(api, message, api_dict_clean):
             api.digital_option_placed_id[message["request_id"]] = {
                 "code": "error_place_digital_order",
                 "message": message["msg"]["message"]
-            }
\ No newline at end of file
+            }
+        api.pending_requests.complete(message.get("request_id"), message)
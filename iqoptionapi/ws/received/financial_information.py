@@ -2,4 +2,5 @@
 
 def financial_information(api, message):
     if message["name"] == "financial-information":
-            api.financial_information = message
\ No newline at end of file
+            api.financial_information = message
+            api.pending_requests.complete(message.get("request_id"), message)
@@ -4,7 +4,9 @@ import iqoptionapi.constants as OP_code
 def instrument_quotes_generated(api, message):
     if message["name"] == "instrument-quotes-generated":
 
-        Active_name = list(OP_code.ACTIVES.keys())[list(OP_code.ACTIVES.values()).index(message["msg"]["active"])]
+        Active_name = OP_code.get_active_name(message["msg"]["active"])
+        if Active_name is None:
+            return
         period = message["msg"]["expiration"]["period"]
         ans = {}
         for data in message["msg"]["quotes"]:
@@ -32,4 +34,6 @@ def instrument_quotes_generated(api, message):
             period] = message["msg"]["expiration"]["timestamp"]
         api.instrument_quites_generated_data[Active_name][period] = ans
 
-        api.instrument_quotes_generated_raw_data[Active_name][period] = message
\ No newline at end of file
+        api.instrument_quotes_generated_raw_data[Active_name][period] = message
+        with api.pushed_event:
+            api.pushed_event.notify_all()
\ No newline at end of file
@@ -2,4 +2,5 @@
 
 def leaderboard_deals_client(api, message):
     if message["name"] == "leaderboard-deals-client":
-        api.leaderboard_deals_client = message["msg"]
\ No newline at end of file
+        api.leaderboard_deals_client = message["msg"]
+        api.pending_requests.complete(message.get("request_id"), message)
@@ -1,13 +1,13 @@
 """Module for IQ option websocket."""
 import iqoptionapi.constants as OP_code
-from threading import Thread
 
 def live_deal(api, message): 
     if message["name"] == "live-deal":
         # name = message["name"]
         active_id = message["msg"]["instrument_active_id"]
-        active = list(OP_code.ACTIVES.keys())[
-            list(OP_code.ACTIVES.values()).index(active_id)]
+        active = OP_code.get_active_name(active_id)
+        if active is None:
+            return
         _type = message["msg"]["instrument_type"]
         try:
             # api.live_deal_data[name][active][_type].appendleft(
@@ -17,9 +17,7 @@ def live_deal(api, message):
                     "active": active,
                     **message["msg"]
                 }
-                livedeal = Thread(target=api.live_deal_cb,
-                                kwargs=(cb_data))
-                livedeal.daemon = True
-                livedeal.start()
+                # ordered per active on the bounded callback pool
+                api.callback_executor.submit(active, api.live_deal_cb, **cb_data)
         except:
             pass
\ No newline at end of file
@@ -2,4 +2,7 @@
 
 def option(api, message):
     if message["name"] == "option":
-        api.buy_multi_option[str(message["request_id"])] = message["msg"]
\ No newline at end of file
+        api.buy_multi_option[str(message["request_id"])] = message["msg"]
+        # a rejected order gets no "result", do not wait for it
+        api.pending_requests.complete(message.get("request_id"), message,
+                                      final="message" in message["msg"])
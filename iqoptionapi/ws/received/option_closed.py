@@ -4,4 +4,6 @@ def option_closed(api, message):
     if message["name"] == "option-closed":
         api.order_async[int(message["msg"]["option_id"])][message["name"]] = message
         if message["microserviceName"] == "binary-options":
-            api.order_binary[message["msg"]["option_id"]] = message['msg']
\ No newline at end of file
+            api.order_binary[message["msg"]["option_id"]] = message['msg']
+            with api.pushed_event:
+                api.pushed_event.notify_all()
\ No newline at end of file
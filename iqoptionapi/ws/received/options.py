@@ -1,5 +1,6 @@
 """Module for IQ option websocket."""
 
-def option(api, message):
+def options(api, message):
     if message["name"] == "options":
-        api.get_options_v2_data = message
\ No newline at end of file
+        api.get_options_v2_data = message
+        api.pending_requests.complete(message.get("request_id"), message)
@@ -2,4 +2,5 @@
 
 def order_canceled(api, message):
     if message["name"] == "order-canceled":
-        api.order_canceled = message
\ No newline at end of file
+        api.order_canceled = message
+        api.pending_requests.complete(message.get("request_id"), message)
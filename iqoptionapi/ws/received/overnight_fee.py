@@ -2,4 +2,5 @@
 
 def overnight_fee(api, message):
     if message["name"] == "overnight-fee":
-        api.overnight_fee = message
\ No newline at end of file
+        api.overnight_fee = message
+        api.pending_requests.complete(message.get("request_id"), message)
@@ -3,3 +3,4 @@
 def position(api, message):
     if message["name"] == "position":
         api.position = message
+        api.pending_requests.complete(message.get("request_id"), message)
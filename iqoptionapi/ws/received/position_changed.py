@@ -3,8 +3,12 @@
 def position_changed(api, message):
     if message["name"] == "position-changed":
         if message["microserviceName"] == "portfolio" and (message["msg"]["source"] == "digital-options") or message["msg"]["source"] == "trading":
-            api.order_async[int(message["msg"]["raw_event"]["order_ids"][0])][message["name"]] = message
+            order_id = int(message["msg"]["raw_event"]["order_ids"][0])
+            api.order_async[order_id][message["name"]] = message
+            api.order_latency.position_changed(order_id)
         elif message["microserviceName"] == "portfolio" and message["msg"]["source"] == "binary-options":
-            api.order_async[int(message["msg"]["external_id"])][message["name"]] = message
+            order_id = int(message["msg"]["external_id"])
+            api.order_async[order_id][message["name"]] = message
+            api.order_latency.position_changed(order_id)
         else:
             api.position_changed = message
\ No newline at end of file
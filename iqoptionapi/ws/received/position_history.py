@@ -2,4 +2,5 @@
 
 def position_history(api, message):
     if message["name"] == "position-history":
-        api.position_history = message
\ No newline at end of file
+        api.position_history = message
+        api.pending_requests.complete(message.get("request_id"), message)
@@ -2,4 +2,9 @@
 
 def result(api, message):
     if message["name"] == "result":
-        api.result = message["msg"]["success"]
\ No newline at end of file
+        api.result = message["msg"]["success"]
+        # only requests waiting for a "result" frame, others complete on
+        # their own reply (see RequestFuture.expect)
+        future = api.pending_requests.get(message.get("request_id"))
+        if future is not None and future.expects("result"):
+            future.set_result(message)
\ No newline at end of file
@@ -2,4 +2,5 @@
 
 def sold_options(api, message):
     if message["name"] == "sold-options":
-        api.sold_options_respond = message
\ No newline at end of file
+        api.sold_options_respond = message
+        api.pending_requests.complete(message.get("request_id"), message)
@@ -9,4 +9,5 @@ def technical_indicators(api, message, api_dict_clean):
             api.technical_indicators[message["request_id"]] = {
                 "code": "no_technical_indicator_available",
                 "message": message["msg"]["message"]
-            }
\ No newline at end of file
+            }
+        api.pending_requests.complete(message.get("request_id"), message)
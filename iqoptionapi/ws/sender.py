@@ -0,0 +1,112 @@
+"""Module for the IQ option websocket outbound queue."""
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+
+
+class WebsocketSender(object):
+    """Class for the single writer of a websocket connection.
+
+    Senders only enqueue frames, one thread writes them to the socket, so
+    a frame is never written while another one is half sent and sending
+    from a ws/received handler can not block the reader.
+    """
+
+    # frames written per wake up of the writer
+    batch_size = 64
+    # send latency samples kept for latency_percentiles
+    samples = 10000
+
+    def __init__(self, websocket):
+        """
+        :param websocket: The instance of :class:`WebSocketApp
+            <websocket.WebSocketApp>` to write to.
+        """
+        self.websocket = websocket
+        self.error = None
+        self.__queue = queue.Queue()
+        self.__lock = threading.Lock()
+        # coalesce subject -> (kind, token) of its last frame still queued
+        self.__queued_keys = {}
+        self.__latency = deque(maxlen=self.samples)
+        self.__thread = threading.Thread(target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def send(self, data, key=None, on_sent=None):
+        """Queue a frame for the writer.
+
+        :param str data: The frame.
+        :param tuple key: (optional) Coalesce key (subject, kind), e.g. (stream,
+            "subscribeMessage"). The frame is dropped while the last frame
+            queued for the subject is of the same kind, so a subscribe
+            queued after an unsubscribe of the same stream is still sent.
+        :param on_sent: (optional) Called by the writer once the frame is written.
+
+        :returns: False if the frame was coalesced, True otherwise.
+        """
+        if self.error is not None:
+            # a broken connection is reported to the callers, as before
+            raise self.error
+        with self.__lock:
+            if key is not None:
+                subject, kind = key
+                last = self.__queued_keys.get(subject)
+                if last is not None and last[0] == kind:
+                    return False
+                key = self.__queued_keys[subject] = (kind, object())
+                key = (subject, key)
+            self.__queue.put((data, key, on_sent, time.time()))
+        return True
+
+    def stop(self):
+        """Stop the writer once the frames queued before are written."""
+        self.__queue.put(None)
+
+    def latency_percentiles(self, percentiles=(50, 99, 99.9)):
+        """Get the queue to socket latency of the last sent frames.
+
+        :returns: dict percentile -> seconds, None values before any send.
+        """
+        latency = sorted(self.__latency)
+        result = {}
+        for percentile in percentiles:
+            if not latency:
+                result[percentile] = None
+                continue
+            rank = int(round(percentile / 100.0 * (len(latency) - 1)))
+            result[percentile] = latency[rank]
+        return result
+
+    def __run(self):
+        logger = logging.getLogger(__name__)
+        while True:
+            frames = [self.__queue.get()]
+            while len(frames) < self.batch_size:
+                try:
+                    frames.append(self.__queue.get_nowait())
+                except queue.Empty:
+                    break
+            for frame in frames:
+                if frame is None:
+                    return
+                data, key, on_sent, queued_at = frame
+                if key is not None:
+                    subject, entry = key
+                    with self.__lock:
+                        # a later frame of the subject may be queued already
+                        if self.__queued_keys.get(subject) is entry:
+                            del self.__queued_keys[subject]
+                try:
+                    self.websocket.send(data)
+                except Exception as error:
+                    logger.error(error)
+                    self.error = error
+                    continue
+                self.__latency.append(time.time() - queued_at)
+                if on_sent is not None:
+                    on_sent()
+                logger.debug(data)
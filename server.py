@@ -1,8 +1,15 @@
 from flask import Flask, request, jsonify
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, Float
+from sqlalchemy import create_engine, insert, update, delete, Column, Integer, String, Boolean, Float
 from sqlalchemy.orm import sessionmaker, declarative_base
 from os import environ
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+from collections import Counter, OrderedDict
+import base64
+import csv
 import hashlib
+import json
+import secrets
+import threading
 import time
 
 app = Flask(__name__)
@@ -11,6 +18,11 @@ DATABASE_URL = environ.get('DATABASE_URL')
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL não configurada. Certifique-se de que o banco de dados está conectado ao seu serviço no Render.")
 
+# Chave privada Ed25519 (32 bytes em base64) que assina os tokens offline; sem ela a ativação não emite token
+LICENSE_SIGNING_KEY = environ.get('LICENSE_SIGNING_KEY')
+LICENSE_TOKEN_TTL = int(environ.get('LICENSE_TOKEN_TTL', 7 * 24 * 3600))
+signing_key = Ed25519PrivateKey.from_private_bytes(base64.b64decode(LICENSE_SIGNING_KEY)) if LICENSE_SIGNING_KEY else None
+
 engine = create_engine(DATABASE_URL)
 Session = sessionmaker(bind=engine)
 Base = declarative_base()
@@ -26,6 +38,97 @@ class License(Base):
 
 Base.metadata.create_all(engine)
 
+class LicenseCache:
+    # LRU com TTL de key -> (status, device_id, revoked), por processo: cada worker do gunicorn tem o seu,
+    # por isso o TTL curto limita por quanto tempo outro worker ainda vê uma licença revogada
+    def __init__(self, maxsize, ttl):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, verdict):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, verdict)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"size": len(self._entries), "maxsize": self.maxsize, "ttl": self.ttl, "hits": self.hits,
+                    "misses": self.misses, "hit_rate": self.hits / total if total else None}
+
+license_cache = LicenseCache(int(environ.get('LICENSE_CACHE_SIZE', 10000)), float(environ.get('LICENSE_CACHE_TTL', 60)))
+
+def get_license_verdict(session, license_key, fresh=False):
+    # (status, device_id, revoked) do cache ou do índice único de key; chaves inexistentes não são guardadas.
+    # fresh=True ignora o cache (que pode estar velho neste worker) e o atualiza, usado antes de assinar um token
+    verdict = None if fresh else license_cache.get(license_key)
+    if verdict is None:
+        verdict = session.query(License.status, License.device_id, License.revoked).filter_by(key=license_key).first()
+        if verdict is not None:
+            verdict = tuple(verdict)
+            license_cache.put(license_key, verdict)
+    return verdict
+
+class RevokedListCache:
+    # Hashes das chaves revogadas e seu ETag, por processo: invalidado por quem muda revoked ou apaga/importa licenças
+    # neste worker, e com o mesmo TTL do cache de licenças para as mudanças feitas em outros workers
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entry = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def get(self, session):
+        with self._lock:
+            entry, generation = self._entry, self._generation
+        if entry is not None and entry[0] >= time.monotonic():
+            return entry[1], entry[2]
+        revoked = sorted(hashlib.sha256(row.key.encode()).hexdigest() for row in session.query(License.key).filter_by(revoked=True))
+        etag = hashlib.sha256(''.join(revoked).encode()).hexdigest()
+        with self._lock:
+            # uma invalidação durante a consulta pode ter tornado esta lista velha: não guarda
+            if generation == self._generation:
+                self._entry = (time.monotonic() + self.ttl, revoked, etag)
+        return revoked, etag
+
+    def invalidate(self):
+        with self._lock:
+            self._entry = None
+            self._generation += 1
+
+revoked_list = RevokedListCache(license_cache.ttl)
+
+def issue_license_token(license_key, device_id):
+    # Token "payload.assinatura" (base64url) preso ao dispositivo, verificado pelo cliente sem rede até expirar
+    if signing_key is None:
+        return None
+    now = int(time.time())
+    payload = json.dumps({"key": license_key, "device_id": device_id, "iat": now, "exp": now + LICENSE_TOKEN_TTL}, separators=(',', ':')).encode()
+    signature = signing_key.sign(payload)
+    return base64.urlsafe_b64encode(payload).decode().rstrip('=') + '.' + base64.urlsafe_b64encode(signature).decode().rstrip('=')
+
 @app.route('/api/v1/activate', methods=['POST'])
 def activate_license():
     data = request.get_json()
@@ -35,26 +138,80 @@ def activate_license():
         return jsonify({"success": False, "message": "Dados incompletos."}), 400
     session = Session()
     try:
-        license_record = session.query(License).filter_by(key=license_key).first()
-        if not license_record:
+        # Lido do banco: toda resposta de sucesso assina um token offline
+        verdict = get_license_verdict(session, license_key, fresh=True)
+        if verdict and verdict[0] == 'inactive' and not verdict[2]:
+            # Outro worker pode ativar a mesma chave ao mesmo tempo: o UPDATE só ativa se a linha ainda estiver inativa e não revogada
+            activated = session.query(License).filter_by(key=license_key, status='inactive', revoked=False).update(
+                {License.status: 'active', License.device_id: device_id, License.activated_at: time.time()}, synchronize_session=False)
+            session.commit()
+            license_cache.invalidate(license_key)
+            if activated:
+                return jsonify({"success": True, "message": "Licença ativada com sucesso.", "token": issue_license_token(license_key, device_id)}), 200
+            verdict = get_license_verdict(session, license_key, fresh=True)
+        if not verdict:
             return jsonify({"success": False, "message": "Chave de licença inválida."}), 401
-        if license_record.revoked:
+        status, active_device_id, revoked = verdict
+        if revoked:
             return jsonify({"success": False, "message": "Esta licença foi revogada."}), 403
-        if license_record.status == 'active' and license_record.device_id != device_id:
+        if status == 'active' and active_device_id != device_id:
             return jsonify({"success": False, "message": "Esta chave já está em uso em outro computador."}), 403
-        if license_record.status == 'inactive':
-            license_record.status = 'active'
-            license_record.device_id = device_id
-            license_record.activated_at = time.time()
-            session.commit()
-            return jsonify({"success": True, "message": "Licença ativada com sucesso."}), 200
-        return jsonify({"success": True, "message": "Licença já está ativa neste computador."}), 200
+        if status == 'inactive':
+            return jsonify({"success": False, "message": "A licença mudou durante a ativação, tente novamente."}), 409
+        return jsonify({"success": True, "message": "Licença já está ativa neste computador.", "token": issue_license_token(license_key, device_id)}), 200
     except Exception as e:
         session.rollback()
         return jsonify({"success": False, "message": f"Erro interno no servidor: {e}"}), 500
     finally:
         session.close()
 
+@app.route('/api/v1/validate', methods=['POST'])
+def validate_license():
+    data = request.get_json()
+    license_key = data.get('license_key')
+    device_id = data.get('device_id')
+    if not license_key or not device_id:
+        return jsonify({"success": False, "message": "Dados incompletos."}), 400
+    session = Session()
+    try:
+        # Com chave de assinatura a resposta leva um token offline novo (instalações ativadas antes dos tokens
+        # passam a tê-lo), então o veredito vem do banco e não do cache
+        verdict = get_license_verdict(session, license_key, fresh=signing_key is not None)
+        if not verdict:
+            return jsonify({"success": False, "message": "Chave de licença não encontrada."}), 401
+        status, active_device_id, revoked = verdict
+        if revoked:
+            return jsonify({"success": False, "message": "Esta licença foi revogada."}), 403
+        if status != 'active' or active_device_id != device_id:
+            return jsonify({"success": False, "message": "Licença inativa ou ativa em outro dispositivo."}), 403
+        return jsonify({"success": True, "message": "Licença válida.", "token": issue_license_token(license_key, device_id)}), 200
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Erro interno no servidor: {e}"}), 500
+    finally:
+        session.close()
+
+@app.route('/api/v1/revoked', methods=['GET'])
+def get_revoked_licenses():
+    # Lista de revogação dos tokens offline: hashes das chaves, com ETag para o cliente receber 304 sem corpo
+    session = Session()
+    try:
+        revoked, etag = revoked_list.get(session)
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+            response.set_etag(etag)
+            return response
+        response = jsonify({"success": True, "revoked": revoked})
+        response.set_etag(etag)
+        return response
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Erro interno no servidor: {e}"}), 500
+    finally:
+        session.close()
+
+@app.route('/api/v1/cache_stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify({"success": True, "cache": license_cache.stats()}), 200
+
 @app.route('/api/v1/revoke', methods=['POST'])
 def revoke_license():
     data = request.get_json()
@@ -69,6 +226,8 @@ def revoke_license():
         if not license_record.revoked:
             license_record.revoked = True
             session.commit()
+            license_cache.invalidate(license_key)
+            revoked_list.invalidate()
             return jsonify({"success": True, "message": "Licença revogada com sucesso."}), 200
         return jsonify({"success": False, "message": "A licença já está revogada."}), 200
     except Exception as e:
@@ -86,6 +245,8 @@ def delete_license(license_key):
             return jsonify({"success": False, "message": "Chave de licença não encontrada."}), 404
         session.delete(license_record)
         session.commit()
+        license_cache.invalidate(license_key)
+        revoked_list.invalidate()
         return jsonify({"success": True, "message": "Licença deletada com sucesso."}), 200
     except Exception as e:
         session.rollback()
@@ -93,9 +254,16 @@ def delete_license(license_key):
     finally:
         session.close()
 
+GENERATE_KEYS_MAX = 100000
+GENERATE_KEYS_BATCH = 1000
+
+def new_license_key():
+    # 256 bits aleatórios em hex, o mesmo formato das chaves antigas (sha256 do horário)
+    return secrets.token_hex(32)
+
 @app.route('/api/v1/generate_key', methods=['POST'])
 def generate_key():
-    new_key = hashlib.sha256(str(time.time()).encode()).hexdigest()
+    new_key = new_license_key()
     session = Session()
     try:
         new_license = License(key=new_key)
@@ -108,19 +276,262 @@ def generate_key():
     finally:
         session.close()
 
+@app.route('/api/v1/generate_keys', methods=['POST'])
+def generate_keys():
+    try:
+        count = int(request.args.get('count', 0))
+    except ValueError:
+        count = 0
+    if not 0 < count <= GENERATE_KEYS_MAX:
+        return jsonify({"success": False, "message": f"count deve estar entre 1 e {GENERATE_KEYS_MAX}."}), 400
+
+    # Um INSERT em lote por bloco (executemany, que o psycopg2 agrupa em execute_values) e um commit por bloco;
+    # cada bloco é enviado logo após o commit, então só chaves gravadas chegam ao cliente
+    def generate():
+        session = Session()
+        try:
+            for start in range(0, count, GENERATE_KEYS_BATCH):
+                keys = [new_license_key() for _ in range(min(GENERATE_KEYS_BATCH, count - start))]
+                session.execute(insert(License), [{"key": key} for key in keys])
+                session.commit()
+                yield '\n'.join(keys) + '\n'
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+    response = app.response_class(generate(), mimetype='text/plain')
+    response.headers['Content-Disposition'] = f'attachment; filename=licencas_{int(time.time())}.txt'
+    return response
+
+BULK_MAX_KEYS = 100000
+BULK_CHUNK = 1000
+
+def parse_bool(value):
+    return value if isinstance(value, bool) else str(value).strip().lower() in ('true', '1', 'sim')
+
+def read_license_records():
+    # Lê as licenças do lote: JSON {"license_keys": [...]} ou {"licenses": [{...}]}, ou um upload/corpo CSV ou NDJSON.
+    # CSV sem cabeçalho usa a primeira coluna como chave; levanta ValueError com a mensagem do 400
+    if request.files:
+        upload = next(iter(request.files.values()))
+        try:
+            text = upload.read().decode('utf-8-sig')
+        except UnicodeDecodeError:
+            raise ValueError("O arquivo enviado deve estar em UTF-8.")
+        kind = 'csv' if (upload.filename or '').lower().endswith('.csv') else 'ndjson'
+    elif request.is_json:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            raise ValueError("O corpo JSON deve ser um objeto com license_keys ou licenses.")
+        if data.get('licenses') is not None:
+            records = data['licenses']
+            if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+                raise ValueError("licenses deve ser uma lista de objetos.")
+        else:
+            keys = data.get('license_keys', [])
+            if not isinstance(keys, list) or not all(isinstance(key, str) for key in keys):
+                raise ValueError("license_keys deve ser uma lista de chaves.")
+            records = [{'key': key} for key in keys]
+        kind = None
+    else:
+        text = request.get_data(as_text=True)
+        kind = 'csv' if request.mimetype == 'text/csv' else 'ndjson'
+    if kind == 'csv':
+        try:
+            rows = [row for row in csv.reader(text.splitlines()) if row]
+        except csv.Error as e:
+            raise ValueError(f"CSV inválido: {e}")
+        if rows and rows[0][0].strip().lower() in ('key', 'license_key'):
+            header = [column.strip().lower() for column in rows[0]]
+            records = [dict(zip(header, row)) for row in rows[1:]]
+        else:
+            records = [{'key': row[0]} for row in rows]
+    elif kind == 'ndjson':
+        try:
+            records = [json.loads(line) for line in text.splitlines() if line.strip()]
+        except ValueError as e:
+            raise ValueError(f"NDJSON inválido: {e}")
+    normalized = {}
+    for record in records:
+        if isinstance(record, str):
+            record = {'key': record}
+        if not isinstance(record, dict):
+            raise ValueError("Cada licença deve ser uma chave ou um objeto.")
+        record = dict(record)
+        key = record.pop('license_key', None) or record.get('key') or ''
+        if not isinstance(key, str) or '\x00' in key:
+            raise ValueError("A chave de licença deve ser texto.")
+        key = key.strip()
+        if not key:
+            raise ValueError("Licença sem chave no lote.")
+        record['key'] = key
+        normalized.setdefault(key, record) # chaves repetidas contam uma vez
+    if not normalized:
+        raise ValueError("Nenhuma chave de licença enviada.")
+    if len(normalized) > BULK_MAX_KEYS:
+        raise ValueError(f"Máximo de {BULK_MAX_KEYS} licenças por lote.")
+    return list(normalized.values())
+
+def apply_in_chunks(records, apply_chunk):
+    # Uma transação por bloco de chaves; um bloco com erro é desfeito e suas chaves marcadas com o erro, os outros seguem
+    results = {}
+    session = Session()
+    try:
+        for start in range(0, len(records), BULK_CHUNK):
+            chunk = records[start:start + BULK_CHUNK]
+            try:
+                chunk_results = apply_chunk(session, chunk)
+                session.commit()
+            except Exception as e:
+                session.rollback()
+                chunk_results = {record['key']: f"erro: {e}" for record in chunk}
+            for key in chunk_results:
+                license_cache.invalidate(key)
+            results.update(chunk_results)
+    finally:
+        session.close()
+        revoked_list.invalidate()
+    return jsonify({"success": True, "summary": Counter(results.values()), "results": results}), 200
+
+def revoke_chunk(session, chunk):
+    keys = [record['key'] for record in chunk]
+    existing = dict(session.query(License.key, License.revoked).filter(License.key.in_(keys)))
+    session.execute(update(License).where(License.key.in_(keys), License.revoked.is_(False)).values(revoked=True).execution_options(synchronize_session=False))
+    return {key: 'not_found' if key not in existing else 'already_revoked' if existing[key] else 'revoked' for key in keys}
+
+def delete_chunk(session, chunk):
+    keys = [record['key'] for record in chunk]
+    existing = {row.key for row in session.query(License.key).filter(License.key.in_(keys))}
+    session.execute(delete(License).where(License.key.in_(keys)).execution_options(synchronize_session=False))
+    return {key: 'deleted' if key in existing else 'not_found' for key in keys}
+
+def import_chunk(session, chunk):
+    keys = [record['key'] for record in chunk]
+    existing = {row.key for row in session.query(License.key).filter(License.key.in_(keys))}
+    rows = [{
+        'key': record['key'],
+        'status': record.get('status') or 'inactive',
+        'device_id': record.get('device_id') or None,
+        'activated_at': float(record['activated_at']) if record.get('activated_at') not in (None, '') else None,
+        'revoked': parse_bool(record.get('revoked', False))
+    } for record in chunk if record['key'] not in existing]
+    if rows:
+        session.execute(insert(License), rows)
+    return {key: 'exists' if key in existing else 'imported' for key in keys}
+
+@app.route('/api/v1/revoke_batch', methods=['POST'])
+def revoke_licenses_batch():
+    try:
+        records = read_license_records()
+    except ValueError as e:
+        return jsonify({"success": False, "message": f"Lote inválido. {e}"}), 400
+    return apply_in_chunks(records, revoke_chunk)
+
+@app.route('/api/v1/delete_batch', methods=['POST'])
+def delete_licenses_batch():
+    try:
+        records = read_license_records()
+    except ValueError as e:
+        return jsonify({"success": False, "message": f"Lote inválido. {e}"}), 400
+    return apply_in_chunks(records, delete_chunk)
+
+LICENSE_STATUSES = ('active', 'inactive')
+
+def check_import_records(records):
+    # status e activated_at só importam na importação; um valor inválido recusa o lote inteiro com 400
+    for record in records:
+        if record.get('status') not in (None, '') + LICENSE_STATUSES:
+            raise ValueError(f"Status inválido na licença {record['key']}: use {' ou '.join(LICENSE_STATUSES)}.")
+        if record.get('activated_at') not in (None, ''):
+            try:
+                float(record['activated_at'])
+            except (TypeError, ValueError):
+                raise ValueError(f"activated_at inválido na licença {record['key']}.")
+
+@app.route('/api/v1/import', methods=['POST'])
+def import_licenses():
+    try:
+        records = read_license_records()
+        check_import_records(records)
+    except ValueError as e:
+        return jsonify({"success": False, "message": f"Lote inválido. {e}"}), 400
+    return apply_in_chunks(records, import_chunk)
+
+LICENSE_FIELDS = {
+    'id': License.id,
+    'key': License.key,
+    'status': License.status,
+    'device_id': License.device_id,
+    'activated_at': License.activated_at,
+    'revoked': License.revoked
+}
+LICENSES_PAGE_LIMIT = 1000
+LICENSES_MAX_LIMIT = 10000
+# Sem nenhum destes parâmetros a listagem responde como antes: a lista inteira, sem envelope nem paginação
+LICENSES_PAGING_ARGS = ('limit', 'after', 'fields', 'format')
+LICENSES_LEGACY_FIELDS = ['key', 'status', 'device_id', 'activated_at', 'revoked']
+
+def parse_license_listing(args):
+    # Valida os parâmetros da listagem; levanta ValueError com a mensagem do 400
+    fields = args.get('fields')
+    fields = fields.split(',') if fields else list(LICENSE_FIELDS)
+    if any(field not in LICENSE_FIELDS for field in fields):
+        raise ValueError(f"Campos válidos: {', '.join(LICENSE_FIELDS)}.")
+    filters = []
+    if args.get('status'):
+        filters.append(License.status == args['status'])
+    if args.get('device_id'):
+        filters.append(License.device_id == args['device_id'])
+    if args.get('revoked'):
+        if args['revoked'].lower() not in ('true', 'false', '1', '0'):
+            raise ValueError("revoked deve ser true ou false.")
+        filters.append(License.revoked == (args['revoked'].lower() in ('true', '1')))
+    try:
+        after = int(args.get('after', 0))
+        limit = int(args['limit']) if args.get('limit') else None
+    except ValueError:
+        raise ValueError("after e limit devem ser inteiros.")
+    if limit is not None and not 0 < limit <= LICENSES_MAX_LIMIT:
+        raise ValueError(f"limit deve estar entre 1 e {LICENSES_MAX_LIMIT}.")
+    return fields, filters, after, limit
+
+def query_licenses(session, fields, filters, after, limit):
+    # Paginação por chave (id > after) no índice da chave primária, só com as colunas pedidas e sem objetos ORM
+    query = session.query(License.id, *[LICENSE_FIELDS[field] for field in fields]).filter(License.id > after, *filters).order_by(License.id)
+    if limit is not None:
+        query = query.limit(limit)
+    return query.yield_per(1000)
+
 @app.route('/api/v1/licenses', methods=['GET'])
 def get_all_licenses():
+    try:
+        fields, filters, after, limit = parse_license_listing(request.args)
+    except ValueError as e:
+        return jsonify({"success": False, "message": f"Parâmetros inválidos. {e}"}), 400
+
+    if request.args.get('format') == 'ndjson':
+        # Uma licença por linha, lida do cursor do servidor enquanto é enviada
+        def generate():
+            session = Session()
+            try:
+                for row in query_licenses(session, fields, filters, after, limit):
+                    yield json.dumps(dict(zip(fields, row[1:]))) + '\n'
+            finally:
+                session.close()
+        return app.response_class(generate(), mimetype='application/x-ndjson')
+
     session = Session()
     try:
-        licenses = session.query(License).all()
-        licenses_list = [{
-            'key': lic.key,
-            'status': lic.status,
-            'device_id': lic.device_id,
-            'activated_at': lic.activated_at,
-            'revoked': lic.revoked
-        } for lic in licenses]
-        return jsonify(licenses_list), 200
+        if not any(arg in request.args for arg in LICENSES_PAGING_ARGS):
+            # Clientes antigos percorrem a resposta como lista (for lic in licenses: lic['key'])
+            rows = query_licenses(session, LICENSES_LEGACY_FIELDS, filters, 0, None)
+            return jsonify([dict(zip(LICENSES_LEGACY_FIELDS, row[1:])) for row in rows]), 200
+        limit = limit or LICENSES_PAGE_LIMIT
+        rows = list(query_licenses(session, fields, filters, after, limit + 1))
+        next_after = rows[limit - 1][0] if len(rows) > limit else None
+        licenses_list = [dict(zip(fields, row[1:])) for row in rows[:limit]]
+        return jsonify({"success": True, "licenses": licenses_list, "next_after": next_after}), 200
     except Exception as e:
         return jsonify({"success": False, "message": f"Erro interno no servidor: {e}"}), 500
     finally:
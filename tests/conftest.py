@@ -0,0 +1,37 @@
+import pytest
+
+from fake_iqoption import FakeIQOption
+
+
+@pytest.fixture
+def fake_server():
+    with FakeIQOption() as server:
+        yield server
+
+
+@pytest.fixture
+def local_api(fake_server, monkeypatch):
+    """Make IQ_Option.connect open its connections on the fake server."""
+    import iqoptionapi.stable_api
+    from iqoptionapi.api import IQOptionAPI
+
+    class LocalAPI(IQOptionAPI):
+        def __init__(self, *args, **kwargs):
+            super(LocalAPI, self).__init__(*args, **kwargs)
+            self.wss_url = fake_server.url
+            self.SSID = "ssid-local"
+
+    monkeypatch.setattr(iqoptionapi.stable_api, "IQOptionAPI", LocalAPI)
+    return LocalAPI
+
+
+@pytest.fixture
+def iq(local_api):
+    """IQ_Option connected to the fake server."""
+    from iqoptionapi.stable_api import IQ_Option
+
+    iq = IQ_Option("user", "password")
+    check, reason = iq.connect()
+    assert check, reason
+    yield iq
+    iq.api.close()
@@ -0,0 +1,220 @@
+"""Local fake of the IQ Option websocket server for the tests.
+
+Speaks just enough of RFC 6455 (text frames, close, ping) and of the IQ
+Option protocol for IQOptionAPI.connect and the candle streams: the ssid
+is answered with a profile whose balance id is derived from the ssid,
+get-candles is answered with candles (none inside the closures), and
+candle-generated frames are pushed to each connection for the actives it
+subscribed to.
+"""
+
+import base64
+import hashlib
+import json
+import socket
+import struct
+import threading
+import time
+
+GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+def balance_id(ssid):
+    return int(hashlib.sha1(ssid.encode()).hexdigest()[:6], 16)
+
+
+class Connection(object):
+
+    def __init__(self, server, sock, number):
+        self.server = server
+        self.sock = sock
+        self.number = number
+        self.subscriptions = set()
+        self.closed = False
+        self.__lock = threading.Lock()
+
+    def send(self, frame):
+        data = json.dumps(frame).encode()
+        if len(data) < 126:
+            header = struct.pack("!BB", 0x81, len(data))
+        elif len(data) < 65536:
+            header = struct.pack("!BBH", 0x81, 126, len(data))
+        else:
+            header = struct.pack("!BBQ", 0x81, 127, len(data))
+        with self.__lock:
+            if self.closed:
+                return
+            try:
+                self.sock.sendall(header + data)
+            except OSError:
+                self.closed = True
+
+    def close(self):
+        with self.__lock:
+            if self.closed:
+                return
+            self.closed = True
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+    def serve(self):
+        try:
+            self.handshake()
+            # pushes start once the handshake is answered
+            self.server.opened(self)
+            while True:
+                opcode, payload = self.read_frame()
+                if opcode == 0x8:
+                    break
+                if opcode == 0x9:
+                    continue
+                self.server.handle(self, json.loads(payload.decode()))
+        except (OSError, ConnectionError, ValueError):
+            pass
+        finally:
+            self.close()
+
+    def handshake(self):
+        request = b""
+        while b"\r\n\r\n" not in request:
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                raise ConnectionError("closed during handshake")
+            request += chunk
+        headers = {}
+        for line in request.decode().split("\r\n")[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        accept = base64.b64encode(hashlib.sha1(
+            (headers["sec-websocket-key"] + GUID).encode()).digest()).decode()
+        self.sock.sendall((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            "Sec-WebSocket-Accept: %s\r\n\r\n" % accept).encode())
+
+    def read_exact(self, size):
+        data = b""
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("closed")
+            data += chunk
+        return data
+
+    def read_frame(self):
+        first, second = self.read_exact(2)
+        length = second & 0x7f
+        if length == 126:
+            length = struct.unpack("!H", self.read_exact(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", self.read_exact(8))[0]
+        mask = self.read_exact(4) if second & 0x80 else b"\0\0\0\0"
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(self.read_exact(length)))
+        return first & 0x0f, payload
+
+
+class FakeIQOption(object):
+    """Fake server on 127.0.0.1, use as a context manager."""
+
+    # seconds between two pushes of timeSync and candle-generated
+    interval = 0.05
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(16)
+        self.url = "ws://127.0.0.1:%d/echo/websocket" % self.sock.getsockname()[1]
+        self.connections = []
+        self.received = []
+        # (start, end) candle "from" ranges without candles, as a market closure
+        self.closures = []
+        self.__lock = threading.Lock()
+        self.__stopped = threading.Event()
+
+    def __enter__(self):
+        for target in (self.__accept, self.__push):
+            thread = threading.Thread(target=target)
+            thread.daemon = True
+            thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.__stopped.set()
+        self.sock.close()
+        self.drop()
+
+    def drop(self):
+        """Close every open connection, as a network drop would."""
+        with self.__lock:
+            connections = list(self.connections)
+        for connection in connections:
+            connection.close()
+
+    def opened(self, connection):
+        with self.__lock:
+            self.connections.append(connection)
+
+    def open_connections(self):
+        with self.__lock:
+            return [connection for connection in self.connections if not connection.closed]
+
+    def handle(self, connection, message):
+        with self.__lock:
+            self.received.append((connection.number, message))
+        name, msg = message.get("name"), message.get("msg")
+        if name == "ssid":
+            bid = balance_id(msg)
+            connection.send({"name": "profile", "msg": {
+                "balance": 10000, "balance_id": bid, "balance_type": 4,
+                "balances": [{"id": bid, "type": 4, "amount": 10000}]}})
+            connection.send({"name": "timeSync", "msg": int(time.time() * 1000)})
+        elif name == "sendMessage" and msg.get("name") == "get-candles":
+            body = msg["body"]
+            # the last count candles up to "to", closures skipped
+            start = body["to"] - body["to"] % body["size"]
+            candles = []
+            while len(candles) < body["count"]:
+                if not any(first <= start <= last for first, last in self.closures):
+                    candles.insert(0, self.candle(body["active_id"], body["size"], start, connection))
+                start -= body["size"]
+            connection.send({"name": "candles", "request_id": message["request_id"],
+                             "msg": {"candles": candles}})
+        elif name == "subscribeMessage" and msg.get("name") == "candle-generated":
+            filters = msg["params"]["routingFilters"]
+            connection.subscriptions.add((int(filters["active_id"]), int(filters["size"])))
+        elif name == "unsubscribeMessage" and msg.get("name") == "candle-generated":
+            filters = msg["params"]["routingFilters"]
+            connection.subscriptions.discard((int(filters["active_id"]), int(filters["size"])))
+
+    @staticmethod
+    def candle(active_id, size, start, connection):
+        return {"active_id": int(active_id), "size": int(size), "from": int(start),
+                "to": int(start) + int(size), "open": 1.0, "close": 1.0 + connection.number / 1000.0,
+                "min": 1.0, "max": 1.1, "volume": 0, "connection": connection.number}
+
+    def __accept(self):
+        number = 0
+        while not self.__stopped.is_set():
+            try:
+                sock, _ = self.sock.accept()
+            except OSError:
+                return
+            connection = Connection(self, sock, number)
+            number += 1
+            thread = threading.Thread(target=connection.serve)
+            thread.daemon = True
+            thread.start()
+
+    def __push(self):
+        while not self.__stopped.wait(self.interval):
+            now = int(time.time())
+            for connection in self.open_connections():
+                connection.send({"name": "timeSync", "msg": int(time.time() * 1000)})
+                for active_id, size in list(connection.subscriptions):
+                    connection.send({"name": "candle-generated",
+                                     "msg": self.candle(active_id, size, now - now % size, connection)})
@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("websocket")
+
+from iqoptionapi.async_api import AsyncIQOption
+
+
+@pytest.fixture
+def async_iq(local_api):
+    iq = AsyncIQOption("user", "password")
+    iq.iq.suspend = 0.01
+    yield iq
+    iq.api.close()
+
+
+def test_candles_stream_keeps_yielding_after_reconnect(fake_server, async_iq):
+    async def run():
+        check, reason = await async_iq.connect()
+        assert check, reason
+        stream = async_iq.candles_stream("EURUSD", 60)
+        try:
+            first = await asyncio.wait_for(stream.__anext__(), 10)
+            old_api = async_iq.api
+
+            fake_server.drop()
+            check, reason = await async_iq.connect()
+            assert check, reason
+            assert async_iq.api is not old_api
+
+            while True:
+                candle = await asyncio.wait_for(stream.__anext__(), 10)
+                if candle["connection"] != first["connection"]:
+                    return candle
+        finally:
+            await stream.aclose()
+
+    candle = asyncio.run(run())
+    assert candle["active_id"] == 1
+    assert async_iq.api.extra_handlers == {"candle-generated": []}
+
+
+def test_wait_request_of_an_unsent_request(fake_server, async_iq):
+    async def run():
+        check, reason = await async_iq.connect()
+        assert check, reason
+        with pytest.raises(ConnectionError, match="get_candles request was not sent"):
+            await async_iq.wait_request(None, "get_candles")
+
+    asyncio.run(run())
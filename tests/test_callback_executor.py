@@ -0,0 +1,31 @@
+import threading
+
+from iqoptionapi.callback_executor import CallbackExecutor
+
+
+def test_blocked_submit_is_dropped_by_shutdown():
+    executor = CallbackExecutor(workers=1, queue_size=1, overflow=CallbackExecutor.BLOCK)
+    started, release = threading.Event(), threading.Event()
+    ran = []
+
+    def first():
+        started.set()
+        release.wait(10)
+
+    executor.submit("EURUSD", first)
+    assert started.wait(10)
+    assert executor.submit("EURUSD", ran.append, "second")
+    # the queue is full: this producer waits for the worker
+    results = []
+    producer = threading.Thread(target=lambda: results.append(executor.submit("EURUSD", ran.append, "third")))
+    producer.start()
+    producer.join(0.2)
+    assert producer.is_alive()
+
+    executor.shutdown(wait=False)
+    producer.join(10)
+    assert results == [False]
+    release.set()
+    executor.shutdown()
+    assert ran == ["second"]
+    assert executor.stats()["dropped"] == 1
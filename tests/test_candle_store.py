@@ -0,0 +1,32 @@
+import pytest
+
+pytest.importorskip("websocket")
+
+
+@pytest.fixture
+def store_iq(iq, tmp_path):
+    iq.set_candle_store(str(tmp_path / "candles.db"))
+    yield iq
+    iq.set_candle_store(None)
+
+
+def candle_requests(server):
+    return sum(1 for _, message in server.received
+               if message.get("name") == "sendMessage" and message["msg"].get("name") == "get-candles")
+
+
+def test_store_returns_the_last_count_candles_across_a_closure(fake_server, store_iq):
+    endtime = int(store_iq.get_server_timestamp()) - 3600
+    last = endtime - endtime % 60
+    # 5 of the 10 minutes before endtime are closed, and a longer gap before
+    fake_server.closures = [(last - 7 * 60, last - 3 * 60), (last - 40 * 60, last - 12 * 60)]
+
+    from_server = store_iq.get_candles("EURUSD", 60, 10, endtime)
+    from_store = store_iq.get_candles("EURUSD", 60, 10, endtime, from_store=True)
+    assert len(from_server) == 10
+    assert [candle["from"] for candle in from_store] == [candle["from"] for candle in from_server]
+
+    requests = candle_requests(fake_server)
+    again = store_iq.get_candles("EURUSD", 60, 10, endtime, from_store=True)
+    assert [candle["from"] for candle in again] == [candle["from"] for candle in from_store]
+    assert candle_requests(fake_server) == requests
@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+pytest.importorskip("websocket")
+
+from iqoptionapi.api import IQOptionAPI
+from fake_iqoption import balance_id
+
+
+def wait_until(check, timeout=5):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if check():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def connect_api(server, ssid):
+    api = IQOptionAPI("iqoption.com", "user", "password")
+    api.wss_url = server.url
+    api.SSID = ssid
+    check, reason = api.connect()
+    assert check, reason
+    return api
+
+
+def test_instances_keep_their_own_state(fake_server):
+    actives = [1, 5, 6]
+    apis = [connect_api(fake_server, "ssid-%d" % i) for i in range(len(actives))]
+    try:
+        for api, active_id in zip(apis, actives):
+            api.subscribe(active_id, 60)
+
+        for i, api in enumerate(apis):
+            assert api.SSID == "ssid-%d" % i
+            assert api.balance_id == balance_id("ssid-%d" % i)
+            assert api.check_websocket_if_connect == 1
+            assert wait_until(lambda: api.candle_generated_check)
+
+        names = {1: "EURUSD", 5: "GBPUSD", 6: "USDJPY"}
+        for api, active_id in zip(apis, actives):
+            # each connection only got the stream it subscribed to
+            assert set(api.real_time_candles) == {names[active_id]}
+        for name in ("real_time_candles", "pending_requests", "profile", "timesync"):
+            assert len({id(getattr(api, name)) for api in apis}) == len(apis)
+    finally:
+        for api in apis:
+            api.close()
+
+
+def test_closing_one_instance_leaves_the_others_connected(fake_server):
+    first = connect_api(fake_server, "ssid-a")
+    second = connect_api(fake_server, "ssid-b")
+    try:
+        first.close()
+        assert wait_until(lambda: first.check_websocket_if_connect == 0)
+        assert second.check_websocket_if_connect == 1
+        second.subscribe(1, 60)
+        assert wait_until(lambda: second.candle_generated_check)
+        assert not first.candle_generated_check
+    finally:
+        second.close()
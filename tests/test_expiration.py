@@ -0,0 +1,62 @@
+import os
+import random
+import time
+
+import pytest
+
+import expiration_reference as reference
+from iqoptionapi import expiration
+
+pytestmark = pytest.mark.skipif(not hasattr(time, "tzset"), reason="needs time.tzset")
+
+ZONES = ["UTC", "America/Sao_Paulo", "America/New_York", "Europe/London",
+         "Asia/Kolkata", "Asia/Kathmandu", "Australia/Adelaide"]
+YEAR = (1767225600, 1798761600)  # 2026 in UTC
+SAMPLES = 150
+# the old walk looks up to 50 quarters (12.5 hours) ahead of the timestamp
+HORIZON = 13 * 3600
+
+
+@pytest.fixture
+def local_zone():
+    saved = os.environ.get("TZ")
+
+    def set_zone(zone):
+        os.environ["TZ"] = zone
+        time.tzset()
+    yield set_zone
+    if saved is None:
+        os.environ.pop("TZ", None)
+    else:
+        os.environ["TZ"] = saved
+    time.tzset()
+
+
+def crosses_dst(timestamp):
+    # mktime is ambiguous around a transition, the old code is wrong there
+    return time.localtime(timestamp).tm_gmtoff != time.localtime(timestamp + HORIZON).tm_gmtoff
+
+
+def timestamps(seed):
+    random.seed(seed)
+    step = (YEAR[1] - YEAR[0]) // SAMPLES
+    for start in range(YEAR[0], YEAR[1], step):
+        timestamp = start + random.uniform(0, step)
+        if not crosses_dst(timestamp):
+            yield timestamp
+
+
+@pytest.mark.parametrize("zone", ZONES)
+def test_matches_the_previous_implementation(zone, local_zone, monkeypatch):
+    local_zone(zone)
+    checked = 0
+    for timestamp in timestamps(zone):
+        # the choice of expiration is relative to the wall clock
+        now = int(timestamp) + random.randint(0, 5)
+        monkeypatch.setattr(time, "time", lambda: now)
+        assert expiration.get_remaning_time(timestamp) == reference.get_remaning_time(timestamp)
+        duration = random.choice([1, 2, 3, 5, 15, 30, 60, 240, 720])
+        assert (expiration.get_expiration_time(timestamp, duration) ==
+                reference.get_expiration_time(timestamp, duration)), (timestamp, duration)
+        checked += 1
+    assert checked > SAMPLES * 0.9
@@ -0,0 +1,33 @@
+from types import SimpleNamespace
+
+import iqoptionapi.constants as OP_code
+from iqoptionapi.ws.received.live_deal import live_deal
+
+
+class InlineExecutor:
+    def submit(self, key, fn, *args, **kwargs):
+        fn(*args, **kwargs)
+        return True
+
+
+def test_active_name_follows_actives_updates(monkeypatch):
+    monkeypatch.setattr(OP_code, "ACTIVES", dict(OP_code.ACTIVES, NEWACTIVE=987654))
+    assert OP_code.get_active_name(987654) is None
+    OP_code.update_actives_name()
+    assert OP_code.get_active_name(987654) == "NEWACTIVE"
+    monkeypatch.undo()
+    OP_code.update_actives_name()
+
+
+def test_live_deal_skips_unknown_actives():
+    deals = []
+    api = SimpleNamespace(live_deal_cb=lambda **deal: deals.append(deal),
+                          callback_executor=InlineExecutor())
+
+    def message(active_id):
+        return {"name": "live-deal",
+                "msg": {"instrument_active_id": active_id, "instrument_type": "turbo"}}
+
+    live_deal(api, message(987654))
+    live_deal(api, message(OP_code.ACTIVES["EURUSD"]))
+    assert [deal["active"] for deal in deals] == ["EURUSD"]
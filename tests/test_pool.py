@@ -0,0 +1,39 @@
+import pytest
+
+pytest.importorskip("websocket")
+
+from iqoptionapi.pool import IQ_OptionPool
+
+
+def test_account_settings_reach_every_connection(tmp_path, monkeypatch):
+    pool = IQ_OptionPool("user", "password", connections=3)
+    balances = []
+    for shard in pool.shards:
+        monkeypatch.setattr(shard, "change_balance", lambda mode, shard=shard: balances.append((shard, mode)))
+
+    pool.set_session({"User-Agent": "test"}, {"lang": "en"})
+    pool.set_candle_store(str(tmp_path / "candles.db"))
+    pool.change_balance("REAL")
+    try:
+        assert all(shard.SESSION_HEADER == {"User-Agent": "test"} for shard in pool.shards)
+        assert all(shard.candle_store is not None for shard in pool.shards)
+        assert balances == [(shard, "REAL") for shard in pool.shards]
+    finally:
+        pool.set_candle_store(None)
+    assert all(shard.candle_store is None for shard in pool.shards)
+
+
+def test_callback_executor_of_every_connection(local_api):
+    pool = IQ_OptionPool("user", "password", connections=2)
+    check, reason = pool.connect()
+    assert check, reason
+    try:
+        old = [shard.api.callback_executor for shard in pool.shards]
+        pool.set_callback_executor(workers=1)
+        assert all(shard.api.callback_executor is not executor
+                   for shard, executor in zip(pool.shards, old))
+        assert pool.get_callback_stats()["submitted"] == sum(
+            shard.get_callback_stats()["submitted"] for shard in pool.shards)
+    finally:
+        for shard in pool.shards:
+            shard.api.close()
@@ -0,0 +1,247 @@
+import base64
+import hashlib
+import io
+import json
+import os
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("cryptography")
+
+# server.py connects on import: always an in-memory database here
+os.environ["DATABASE_URL"] = "sqlite://"
+
+import server
+from server import License
+from cryptography.hazmat.primitives.asymmetric.ed25519 import Ed25519PrivateKey
+
+
+@pytest.fixture
+def client(monkeypatch):
+    if server.engine.url.render_as_string() != "sqlite://":
+        pytest.skip("server was imported with another DATABASE_URL")
+    session = server.Session()
+    session.query(License).delete()
+    session.commit()
+    session.close()
+    monkeypatch.setattr(server, "license_cache", server.LicenseCache(100, 60))
+    monkeypatch.setattr(server, "revoked_list", server.RevokedListCache(60))
+    return server.app.test_client()
+
+
+def add_license(key, **columns):
+    session = server.Session()
+    session.add(License(key=key, **columns))
+    session.commit()
+    session.close()
+
+
+def license_row(key):
+    session = server.Session()
+    try:
+        row = session.query(License.status, License.device_id, License.revoked).filter_by(key=key).first()
+        return tuple(row) if row is not None else None
+    finally:
+        session.close()
+
+
+def validate(client, key, device_id="A"):
+    return client.post("/api/v1/validate", json={"license_key": key, "device_id": device_id})
+
+
+def test_validate(client):
+    add_license("active", status="active", device_id="A")
+    add_license("inactive")
+    add_license("revoked", status="active", device_id="A", revoked=True)
+
+    assert validate(client, "active").status_code == 200
+    assert validate(client, "active", "B").status_code == 403
+    assert validate(client, "inactive").status_code == 403
+    assert validate(client, "revoked").status_code == 403
+    assert validate(client, "unknown").status_code == 401
+    assert client.post("/api/v1/validate", json={"license_key": "active"}).status_code == 400
+
+
+def test_validate_returns_a_signed_token(client, monkeypatch):
+    signing_key = Ed25519PrivateKey.generate()
+    monkeypatch.setattr(server, "signing_key", signing_key)
+    add_license("active", status="active", device_id="A")
+
+    token = validate(client, "active").get_json()["token"]
+    payload, signature = [base64.urlsafe_b64decode(part + "=" * (-len(part) % 4)) for part in token.split(".")]
+    signing_key.public_key().verify(signature, payload)
+    assert json.loads(payload)["key"] == "active"
+    assert json.loads(payload)["device_id"] == "A"
+    assert "token" not in validate(client, "active", "B").get_json()
+
+
+def test_revoked_list_etag(client):
+    add_license("a")
+    add_license("b")
+    first = client.get("/api/v1/revoked")
+    assert first.status_code == 200
+    assert first.get_json()["revoked"] == []
+    etag = first.headers["ETag"]
+
+    unchanged = client.get("/api/v1/revoked", headers={"If-None-Match": etag})
+    assert unchanged.status_code == 304
+    assert unchanged.data == b""
+
+    client.post("/api/v1/revoke", json={"license_key": "b"})
+    changed = client.get("/api/v1/revoked", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.get_json()["revoked"] == [hashlib.sha256(b"b").hexdigest()]
+    assert changed.headers["ETag"] != etag
+
+    client.delete("/api/v1/licenses/b")
+    assert client.get("/api/v1/revoked").get_json()["revoked"] == []
+
+
+def test_licenses_without_paging_arguments_is_a_bare_list(client):
+    add_license("a")
+    add_license("b", status="active", device_id="A")
+
+    licenses = client.get("/api/v1/licenses").get_json()
+    assert isinstance(licenses, list)
+    assert [(lic["key"], lic["status"]) for lic in licenses] == [("a", "inactive"), ("b", "active")]
+    assert set(licenses[0]) == {"key", "status", "device_id", "activated_at", "revoked"}
+
+
+def test_licenses_keyset_pagination(client):
+    for i in range(5):
+        add_license("key-%d" % i, revoked=i % 2 == 1)
+
+    keys, after = [], 0
+    while after is not None:
+        page = client.get("/api/v1/licenses?limit=2&fields=key&after=%d" % after).get_json()
+        assert page["success"]
+        assert all(set(lic) == {"key"} for lic in page["licenses"])
+        keys.extend(lic["key"] for lic in page["licenses"])
+        after = page["next_after"]
+    assert keys == ["key-%d" % i for i in range(5)]
+
+    revoked = client.get("/api/v1/licenses?revoked=true&fields=key&limit=10").get_json()
+    assert [lic["key"] for lic in revoked["licenses"]] == ["key-1", "key-3"]
+    assert client.get("/api/v1/licenses?limit=0").status_code == 400
+    assert client.get("/api/v1/licenses?fields=password").status_code == 400
+
+
+def test_licenses_ndjson(client):
+    for i in range(3):
+        add_license("key-%d" % i)
+
+    response = client.get("/api/v1/licenses?format=ndjson&fields=key,status")
+    assert response.mimetype == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert lines == [{"key": "key-%d" % i, "status": "inactive"} for i in range(3)]
+
+
+def activate(client, key, device_id):
+    return client.post("/api/v1/activate", json={"license_key": key, "device_id": device_id})
+
+
+def test_activate_ignores_a_stale_cache(client, monkeypatch):
+    monkeypatch.setattr(server, "signing_key", Ed25519PrivateKey.generate())
+    add_license("taken")
+    add_license("revoked", status="active", device_id="A")
+    # this worker cached both before another worker changed them
+    validate(client, "taken")
+    validate(client, "revoked")
+    session = server.Session()
+    session.query(License).filter_by(key="taken").update({"status": "active", "device_id": "A"})
+    session.query(License).filter_by(key="revoked").update({"revoked": True})
+    session.commit()
+    session.close()
+
+    assert activate(client, "taken", "B").status_code == 403
+    assert license_row("taken") == ("active", "A", False)
+    response = activate(client, "revoked", "A")
+    assert response.status_code == 403
+    assert "token" not in response.get_json()
+
+
+def test_activate_and_cache_stats(client):
+    add_license("new")
+    assert activate(client, "new", "A").status_code == 200
+    assert license_row("new") == ("active", "A", False)
+    assert activate(client, "new", "A").status_code == 200
+    assert activate(client, "new", "B").status_code == 403
+
+    validate(client, "new")
+    validate(client, "new")
+    stats = client.get("/api/v1/cache_stats").get_json()["cache"]
+    assert stats["size"] == 1
+    assert stats["hits"] >= 1
+
+
+def test_generate_keys(client, monkeypatch):
+    monkeypatch.setattr(server, "GENERATE_KEYS_BATCH", 3)
+    response = client.post("/api/v1/generate_keys?count=7")
+    assert response.status_code == 200
+    assert "attachment" in response.headers["Content-Disposition"]
+    keys = response.get_data(as_text=True).split()
+    assert len(set(keys)) == 7
+    assert all(len(key) == 64 and int(key, 16) >= 0 for key in keys)
+    assert all(license_row(key) == ("inactive", None, False) for key in keys)
+
+    assert client.post("/api/v1/generate_keys?count=0").status_code == 400
+    assert client.post("/api/v1/generate_keys?count=abc").status_code == 400
+    assert client.post("/api/v1/generate_keys?count=%d" % (server.GENERATE_KEYS_MAX + 1)).status_code == 400
+
+
+def test_revoke_and_delete_batch(client):
+    add_license("a")
+    add_license("b", revoked=True)
+    add_license("c")
+
+    response = client.post("/api/v1/revoke_batch", json={"license_keys": ["a", "b", "missing", "a"]})
+    assert response.status_code == 200
+    assert response.get_json()["results"] == {"a": "revoked", "b": "already_revoked", "missing": "not_found"}
+    assert license_row("a")[2] is True
+
+    response = client.post("/api/v1/delete_batch", data={"file": (io.BytesIO(b"a\nc\nmissing\n"), "keys.csv")})
+    assert response.get_json()["results"] == {"a": "deleted", "c": "deleted", "missing": "not_found"}
+    assert license_row("a") is None and license_row("b") is not None
+
+
+def test_import(client):
+    add_license("exists")
+    csv_body = b"key,status,device_id,activated_at,revoked\nnew,active,A,12.5,false\nexists,inactive,,,\n"
+    response = client.post("/api/v1/import", data={"file": (io.BytesIO(csv_body), "licenses.csv")})
+    assert response.get_json()["results"] == {"new": "imported", "exists": "exists"}
+    assert license_row("new") == ("active", "A", False)
+
+    ndjson = '{"key": "other", "revoked": true}\n"plain"\n'
+    response = client.post("/api/v1/import", data=ndjson, content_type="application/x-ndjson")
+    assert response.get_json()["results"] == {"other": "imported", "plain": "imported"}
+    assert license_row("other") == ("inactive", None, True)
+
+
+@pytest.mark.parametrize("kwargs", [
+    {"json": 5},
+    {"json": ["a", "b"]},
+    {"data": "{", "content_type": "application/json"},
+    {"json": {"license_keys": "abc"}},
+    {"json": {"license_keys": ["a", 1]}},
+    {"json": {"licenses": "a"}},
+    {"json": {"licenses": [{"key": {"a": 1}}]}},
+    {"json": {"license_keys": []}},
+    {"data": {"file": (io.BytesIO("é\n".encode("latin-1")), "keys.csv")}},
+    {"data": {"file": (io.BytesIO(b"{x\n"), "keys.ndjson")}},
+])
+def test_malformed_batches_are_rejected(client, kwargs):
+    response = client.post("/api/v1/revoke_batch", **kwargs)
+    assert response.status_code == 400
+    assert response.get_json()["success"] is False
+
+
+@pytest.mark.parametrize("record", [
+    {"key": "a", "status": "Active"},
+    {"key": "a", "status": "foo"},
+    {"key": "a", "activated_at": "yesterday"},
+])
+def test_import_rejects_bad_records(client, record):
+    assert client.post("/api/v1/import", json={"licenses": [record]}).status_code == 400
+    assert license_row("a") is None
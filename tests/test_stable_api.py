@@ -0,0 +1,24 @@
+import pytest
+
+pytest.importorskip("websocket")
+
+
+def test_get_candles_many_asks_again_after_a_reconnect(iq, monkeypatch):
+    api_class = type(iq.api)
+    chanel = api_class.getcandles
+    calls = []
+
+    def getcandles(api):
+        calls.append(api)
+        if len(calls) == 2:
+            raise ConnectionError("socket is already closed")
+        return chanel.fget(api)
+    monkeypatch.setattr(api_class, "getcandles", property(getcandles))
+
+    old_api = iq.api
+    actives = ["EURUSD", "GBPUSD", "USDJPY"]
+    candles = iq.get_candles_many(actives, 60, 5, iq.get_server_timestamp())
+    assert iq.api is not old_api
+    # every active asked again on the new connection
+    assert calls[2:] == [iq.api] * 3
+    assert all(len(candles[active]) == 5 for active in actives)